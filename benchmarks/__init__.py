@@ -0,0 +1,12 @@
+"""Micro-benchmarks for the Pusher Push Notifications Python server SDK
+
+Run a benchmark module from the repository root, e.g.::
+
+    python -m benchmarks.bench_tokens
+
+or run all of them, and save or compare against a baseline, with::
+
+    python -m benchmarks run|save|compare
+
+(see benchmarks/suite.py)
+"""
@@ -0,0 +1,90 @@
+"""Benchmarks for publishing to a local FakeBeamsServer
+
+Unlike the other benchmarks, these include real HTTP over the loopback
+interface, so they measure the throughput of the whole client. The server
+runs in its own process, so that its threads do not compete with the
+client's for the GIL.
+"""
+
+import subprocess
+import sys
+
+from pusher_push_notifications import PushNotifications
+
+from benchmarks import harness
+from benchmarks.bench_request_overhead import PUBLISH_BODY
+
+USER_IDS = ['user-' + str(i) for i in range(0, 10000)]
+INTERESTS = ['interest-' + str(i) for i in range(0, 1000)]
+
+
+def make_client():
+    """Start a fake server process, returning (client, teardown)"""
+    server = subprocess.Popen(
+        [
+            sys.executable, '-u', '-m', 'pusher_push_notifications.fake_server',
+            '--port', '0',
+        ],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    # The server prints 'Fake Beams server listening on <endpoint>'
+    line = server.stdout.readline()
+    if not line:
+        server.wait()
+        raise RuntimeError('The fake server exited with status {}'.format(
+            server.returncode,
+        ))
+    pn_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        endpoint=line.split()[-1],
+    )
+
+    def teardown():
+        pn_client.close()
+        server.terminate()
+        server.wait()
+        server.stdout.close()
+
+    return pn_client, teardown
+
+
+def setup_publish_to_users():
+    pn_client, teardown = make_client()
+    return (
+        lambda: pn_client.publish_to_users(['user-0001'], PUBLISH_BODY),
+        teardown,
+    )
+
+
+def setup_publish_to_users_bulk():
+    pn_client, teardown = make_client()
+    return (
+        lambda: pn_client.publish_to_users_bulk(USER_IDS, PUBLISH_BODY),
+        teardown,
+    )
+
+
+def setup_publish_to_interests_bulk():
+    pn_client, teardown = make_client()
+    return (
+        lambda: pn_client.publish_to_interests_bulk(INTERESTS, PUBLISH_BODY),
+        teardown,
+    )
+
+
+def setup_delete_users():
+    pn_client, teardown = make_client()
+    return lambda: pn_client.delete_users(USER_IDS[:1000]), teardown
+
+
+BENCHMARKS = [
+    ('fake server: publish_to_users (1 user)', setup_publish_to_users),
+    ('fake server: publish_to_users_bulk (10k users)', setup_publish_to_users_bulk),
+    ('fake server: publish_to_interests_bulk (1k)', setup_publish_to_interests_bulk),
+    ('fake server: delete_users (1k users)', setup_delete_users),
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
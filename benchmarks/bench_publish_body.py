@@ -0,0 +1,72 @@
+"""Benchmarks for preparing publish request bodies"""
+
+import copy
+import json
+
+from pusher_push_notifications import _with_audience
+
+from benchmarks import harness
+
+
+def make_publish_body(data_items=200):
+    """A large publish body with APNs, FCM and web payloads carrying custom
+    data"""
+    data = {
+        'item-{}'.format(i): {
+            'id': i,
+            'title': 'Item {}'.format(i),
+            'tags': ['tag-a', 'tag-b', 'tag-c'],
+            'price': {'amount': i * 100, 'currency': 'GBP'},
+        }
+        for i in range(0, data_items)
+    }
+    return {
+        'apns': {
+            'aps': {'alert': {'title': 'Hello', 'body': 'Hello, World!'}},
+            'data': data,
+        },
+        'fcm': {
+            'notification': {'title': 'Hello', 'body': 'Hello, World!'},
+            'data': {'payload': json.dumps(data)},
+        },
+        'web': {
+            'notification': {
+                'title': 'Hello',
+                'body': 'Hello, World!',
+                'deep_link': 'https://example.com/items',
+            },
+            'data': data,
+        },
+    }
+
+
+USER_IDS = ['user-' + str(i) for i in range(0, 1000)]
+
+
+def setup_deepcopy():
+    publish_body = make_publish_body()
+
+    def prepare():
+        body = copy.deepcopy(publish_body)
+        body['users'] = USER_IDS
+    return prepare
+
+
+def setup_with_audience():
+    publish_body = make_publish_body()
+    return lambda: _with_audience(publish_body, 'users', USER_IDS)
+
+
+def setup_json_encode():
+    body = _with_audience(make_publish_body(), 'users', USER_IDS)
+    return lambda: json.dumps(body)
+
+
+BENCHMARKS = [
+    ('body: copy.deepcopy (large body)', setup_deepcopy),
+    ('body: _with_audience (large body)', setup_with_audience),
+    ('body: json.dumps (large body)', setup_json_encode),
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
@@ -0,0 +1,27 @@
+"""Benchmarks for encoding one publish body for many chunks of users"""
+
+import json
+
+from pusher_push_notifications import PublishTemplate, _with_audience
+
+from benchmarks import harness
+from benchmarks.bench_publish_body import USER_IDS, make_publish_body
+
+
+def setup_encode_dict():
+    publish_body = make_publish_body()
+    return lambda: json.dumps(_with_audience(publish_body, 'users', USER_IDS))
+
+
+def setup_encode_template():
+    template = PublishTemplate(make_publish_body())
+    return lambda: template.encode('users', USER_IDS)
+
+
+BENCHMARKS = [
+    ('template: encode dict per chunk', setup_encode_dict),
+    ('template: PublishTemplate.encode per chunk', setup_encode_template),
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
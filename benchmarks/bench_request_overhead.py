@@ -0,0 +1,128 @@
+"""Benchmarks for the client side overhead of a single request
+
+Requests are sent to a stub adapter that answers immediately, so only the
+time spent in the SDK and requests is measured.
+"""
+
+import requests
+
+from pusher_push_notifications import (
+    InMemoryTransport,
+    MetricsCollector,
+    PushNotifications,
+    RequestHooks,
+    SDK_VERSION,
+)
+
+from benchmarks import harness
+
+PUBLISH_BODY = {
+    'apns': {'aps': {'alert': 'Hello!'}},
+    'fcm': {'notification': {'title': 'Hello', 'body': 'Hello, World!'}},
+}
+
+
+class StubAdapter(requests.adapters.BaseAdapter):
+    """Adapter that answers every request with a canned publish response"""
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"publishId":"pubid-1234"}'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client():
+    pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+    pn_client.session.mount('https://', StubAdapter())
+    return pn_client
+
+
+def setup_request_prepare():
+    """How requests were built before request scaffolding was cached"""
+    session = make_client().session
+    body = dict(PUBLISH_BODY, users=['user-0001'])
+
+    def send():
+        request = requests.Request(
+            'POST',
+            'https://instance_id.pushnotifications.pusher.com'
+            '/publish_api/v1/instances/INSTANCE_ID/publishes/users',
+            json=body,
+            headers={
+                'host': 'instance_id.pushnotifications.pusher.com',
+                'authorization': 'Bearer SECRET_KEY',
+                'x-pusher-library': 'pusher-push-notifications-python {}'.format(
+                    SDK_VERSION,
+                ),
+            },
+        )
+        session.send(request.prepare()).json()
+    return send
+
+
+def setup_publish_to_users():
+    pn_client = make_client()
+    return lambda: pn_client.publish_to_users(['user-0001'], PUBLISH_BODY)
+
+
+def setup_publish_to_interests():
+    pn_client = make_client()
+    return lambda: pn_client.publish_to_interests(['donuts'], PUBLISH_BODY)
+
+
+def setup_publish_to_users_in_memory():
+    """The SDK's own overhead, without requests"""
+    pn_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        transport=InMemoryTransport(),
+    )
+    return lambda: pn_client.publish_to_users(['user-0001'], PUBLISH_BODY)
+
+
+def setup_publish_to_users_hooks():
+    """The overhead of calling a hook that does nothing"""
+    pn_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        transport=InMemoryTransport(),
+        hooks=[RequestHooks()],
+    )
+    return lambda: pn_client.publish_to_users(['user-0001'], PUBLISH_BODY)
+
+
+def setup_publish_to_users_metrics():
+    pn_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        transport=InMemoryTransport(),
+        hooks=[MetricsCollector()],
+    )
+    return lambda: pn_client.publish_to_users(['user-0001'], PUBLISH_BODY)
+
+
+def setup_delete_user():
+    pn_client = make_client()
+    return lambda: pn_client.delete_user('user-0001')
+
+
+BENCHMARKS = [
+    ('request: requests.Request.prepare + send', setup_request_prepare),
+    ('request: publish_to_users (1 user)', setup_publish_to_users),
+    ('request: publish_to_interests (1 interest)', setup_publish_to_interests),
+    ('request: delete_user', setup_delete_user),
+    ('request: publish_to_users (in memory)', setup_publish_to_users_in_memory),
+    ('request: publish_to_users (in memory, hooks)',
+     setup_publish_to_users_hooks),
+    ('request: publish_to_users (in memory, metrics)',
+     setup_publish_to_users_metrics),
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
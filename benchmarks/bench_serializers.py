@@ -0,0 +1,53 @@
+"""Benchmarks for encoding large publish bodies and decoding responses with
+each serializer"""
+
+from pusher_push_notifications import JSONSerializer, OrjsonSerializer
+
+from benchmarks import harness
+from benchmarks.bench_publish_body import USER_IDS, make_publish_body
+
+
+def _serializers():
+    serializers = [('json', JSONSerializer)]
+    try:
+        OrjsonSerializer()
+    except ImportError:
+        pass
+    else:
+        serializers.append(('orjson', OrjsonSerializer))
+    return serializers
+
+
+def make_setup_dumps(serializer_class):
+    def setup():
+        serializer = serializer_class()
+        publish_body = dict(make_publish_body(), users=USER_IDS)
+        return lambda: serializer.dumps(publish_body)
+    return setup
+
+
+def make_setup_loads(serializer_class):
+    def setup():
+        serializer = serializer_class()
+        data = JSONSerializer().dumps(make_publish_body())
+        return lambda: serializer.loads(data)
+    return setup
+
+
+BENCHMARKS = [
+    (name, setup)
+    for serializer_name, serializer_class in _serializers()
+    for name, setup in [
+        (
+            'serializers: {} dumps publish body'.format(serializer_name),
+            make_setup_dumps(serializer_class),
+        ),
+        (
+            'serializers: {} loads publish body'.format(serializer_name),
+            make_setup_loads(serializer_class),
+        ),
+    ]
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
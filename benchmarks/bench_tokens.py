@@ -0,0 +1,58 @@
+"""Benchmarks for generating auth tokens"""
+
+import jwt
+
+from pusher_push_notifications import PushNotifications
+from pusher_push_notifications.tokens import HS256Signer
+
+from benchmarks import harness
+
+INSTANCE_ID = 'c2fd4da4-a1f6-4d1e-9b9b-3e1d2a0e0f1c'
+SECRET_KEY = 'F8AC0B756E50DF235F642D6F0DC2CDE0328CD9184B3874C5E91AB2189BB722FE'
+ISSUER = 'https://{}.pushnotifications.pusher.com'.format(INSTANCE_ID)
+EXPIRY = 1700000000
+BATCH_SIZE = 20000
+
+
+def setup_pyjwt_encode():
+    def encode():
+        jwt.encode(
+            {'iss': ISSUER, 'sub': 'user-0001', 'exp': EXPIRY},
+            SECRET_KEY,
+            algorithm='HS256',
+        )
+    return encode
+
+
+def setup_hs256_signer():
+    signer = HS256Signer(SECRET_KEY, ISSUER)
+    return lambda: signer.sign('user-0001', EXPIRY)
+
+
+def setup_generate_token():
+    pn_client = PushNotifications(INSTANCE_ID, SECRET_KEY)
+    return lambda: pn_client.generate_token('user-0001')
+
+
+def setup_generate_tokens(workers):
+    def setup():
+        pn_client = PushNotifications(INSTANCE_ID, SECRET_KEY)
+        user_ids = ['user-' + str(i) for i in range(0, BATCH_SIZE)]
+
+        def generate():
+            for _ in pn_client.generate_tokens(user_ids, workers=workers):
+                pass
+        return generate
+    return setup
+
+
+BENCHMARKS = [
+    ('tokens: pyjwt encode', setup_pyjwt_encode),
+    ('tokens: HS256Signer.sign', setup_hs256_signer),
+    ('tokens: generate_token', setup_generate_token),
+    ('tokens: generate_tokens x20000', setup_generate_tokens(None)),
+    ('tokens: generate_tokens x20000, 4 workers', setup_generate_tokens(4)),
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
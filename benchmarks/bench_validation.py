@@ -0,0 +1,28 @@
+"""Benchmarks for validating interests and user ids"""
+
+from pusher_push_notifications import (
+    _validate_each_interest,
+    _validate_each_user_id,
+    _validate_interests,
+    _validate_user_ids,
+)
+
+from benchmarks import harness
+
+INTERESTS = ['topic-{}.news;region=eu@v1'.format(i) for i in range(0, 100)]
+USER_IDS = ['user-{:08d}@example.com'.format(i) for i in range(0, 1000)]
+
+
+BENCHMARKS = [
+    ('validation: 100 interests, per item',
+     lambda: lambda: _validate_each_interest(INTERESTS)),
+    ('validation: 100 interests, batch',
+     lambda: lambda: _validate_interests(INTERESTS)),
+    ('validation: 1000 user ids, per item',
+     lambda: lambda: _validate_each_user_id(USER_IDS)),
+    ('validation: 1000 user ids, batch',
+     lambda: lambda: _validate_user_ids(USER_IDS)),
+]
+
+if __name__ == '__main__':
+    harness.main(BENCHMARKS)
@@ -0,0 +1,68 @@
+"""Minimal timing harness shared by the benchmark modules
+
+Each benchmark module defines BENCHMARKS, a list of (name, setup) pairs, where
+setup() returns the zero argument callable to be timed, or a (callable,
+teardown) pair if something (e.g. a server) must be stopped afterwards.
+"""
+
+from __future__ import print_function
+
+import timeit
+
+MIN_RUN_TIME = 0.2
+REPEAT = 5
+
+
+def measure(func, min_run_time=MIN_RUN_TIME, repeat=REPEAT):
+    """Time func, returning the best and median seconds per call"""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_run_time:
+            break
+        number *= 2
+    timings = sorted(t / number for t in timer.repeat(repeat, number))
+    return {
+        'best': timings[0],
+        'median': timings[len(timings) // 2],
+        'number': number,
+    }
+
+
+def measure_setup(setup, min_run_time=MIN_RUN_TIME):
+    """Time the callable returned by setup, then tear it down"""
+    func = setup()
+    teardown = None
+    if isinstance(func, tuple):
+        func, teardown = func
+    try:
+        return measure(func, min_run_time=min_run_time)
+    finally:
+        if teardown is not None:
+            teardown()
+
+
+def run(benchmarks):
+    """Run the given benchmarks, returning {name: measurement}"""
+    results = {}
+    for name, setup in benchmarks:
+        results[name] = measure_setup(setup)
+    return results
+
+
+def format_results(benchmarks, results):
+    """Format results as a table, in the order of benchmarks"""
+    lines = ['{:<48} {:>12} {:>12}'.format('benchmark', 'best', 'median')]
+    for name, _ in benchmarks:
+        result = results[name]
+        lines.append('{:<48} {:>10.2f}us {:>10.2f}us'.format(
+            name,
+            result['best'] * 1e6,
+            result['median'] * 1e6,
+        ))
+    return '\n'.join(lines)
+
+
+def main(benchmarks):
+    """Entry point for running a single benchmark module"""
+    print(format_results(benchmarks, run(benchmarks)))
@@ -0,0 +1,216 @@
+"""Runs every benchmark module, saving results as a baseline or comparing them
+against one
+
+    python -m benchmarks run                 # print results
+    python -m benchmarks save                # save a new baseline
+    python -m benchmarks compare             # compare with the baseline
+
+Timings are only comparable on the same machine and Python version, so
+baselines record both, and compare warns when they differ. compare exits
+with status 1 if any benchmark is slower than the baseline by more than the
+threshold, so it can be used as a check before upgrading, and with status 2
+if there is no baseline to compare with.
+"""
+
+from __future__ import print_function
+
+import argparse
+import datetime
+import errno
+import fnmatch
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import sys
+
+import benchmarks
+from benchmarks import harness
+
+from pusher_push_notifications import SDK_VERSION
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'baseline.json',
+)
+DEFAULT_THRESHOLD = 0.10
+
+
+def discover():
+    """Returns [(module name, BENCHMARKS)] for every bench_* module"""
+    found = []
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        name = module_info[1]
+        if name.startswith('bench_'):
+            module = importlib.import_module('benchmarks.' + name)
+            found.append((name, module.BENCHMARKS))
+    return sorted(found)
+
+
+def select(modules, patterns):
+    """The benchmarks whose names match any of the glob patterns (all of
+    them if there are no patterns)"""
+    selected = []
+    for _, module_benchmarks in modules:
+        for name, setup in module_benchmarks:
+            if not patterns or any(
+                    fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                selected.append((name, setup))
+    return selected
+
+
+def environment():
+    """Details of the machine the benchmarks run on"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'sdk_version': SDK_VERSION,
+    }
+
+
+def run_all(selected, min_run_time):
+    results = {}
+    for name, setup in selected:
+        print('running {}'.format(name), file=sys.stderr)
+        results[name] = harness.measure_setup(setup, min_run_time=min_run_time)
+    return results
+
+
+def save(path, results):
+    baseline = {
+        'created': datetime.datetime.utcnow().isoformat() + 'Z',
+        'environment': environment(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(selected, baseline, results, threshold, metric):
+    """Returns (report lines, names of regressed benchmarks)"""
+    lines = ['{:<48} {:>12} {:>12} {:>8}'.format(
+        'benchmark', 'baseline', 'current', 'change',
+    )]
+    regressions = []
+    for name, _ in selected:
+        current = results[name][metric]
+        previous = baseline['results'].get(name)
+        if previous is None:
+            lines.append('{:<48} {:>12} {:>10.2f}us {:>8}'.format(
+                name, '-', current * 1e6, 'new',
+            ))
+            continue
+        change = current / previous[metric] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  SLOWER'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  faster'
+        lines.append('{:<48} {:>10.2f}us {:>10.2f}us {:>+7.1f}%{}'.format(
+            name,
+            previous[metric] * 1e6,
+            current * 1e6,
+            change * 100,
+            flag,
+        ))
+    return lines, regressions
+
+
+def environment_warnings(baseline):
+    current = environment()
+    return [
+        'warning: baseline {} was {}, now {}'.format(
+            key, baseline['environment'].get(key), value,
+        )
+        for key, value in sorted(current.items())
+        if key != 'sdk_version' and baseline['environment'].get(key) != value
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Run the SDK benchmarks',
+    )
+    parser.add_argument('command', choices=['run', 'save', 'compare'])
+    parser.add_argument(
+        '-k', dest='patterns', action='append', default=[],
+        help="only run benchmarks matching a glob, e.g. 'tokens:*' "
+        "(may be repeated)",
+    )
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='relative slowdown reported as a regression (default 0.10)',
+    )
+    parser.add_argument(
+        '--metric', choices=['best', 'median'], default='best',
+        help='timing compared with the baseline (default best, which is '
+        'the least affected by noise)',
+    )
+    parser.add_argument(
+        '--min-run-time', type=float, default=harness.MIN_RUN_TIME,
+        help='minimum seconds per timing repeat',
+    )
+    args = parser.parse_args(argv)
+
+    selected = select(discover(), args.patterns)
+    if not selected:
+        parser.error('no benchmarks match')
+
+    baseline = None
+    if args.command == 'compare':
+        try:
+            baseline = load(args.baseline)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            print(
+                'no baseline at {}; run `python -m benchmarks save` first'
+                .format(args.baseline),
+                file=sys.stderr,
+            )
+            return 2
+
+    results = run_all(selected, args.min_run_time)
+
+    if args.command == 'run':
+        print(harness.format_results(selected, results))
+        return 0
+
+    if args.command == 'save':
+        if os.path.exists(args.baseline) and args.patterns:
+            # Keep the results of the benchmarks that were not run
+            previous = load(args.baseline)['results']
+            previous.update(results)
+            results = previous
+        save(args.baseline, results)
+        print(harness.format_results(selected, results))
+        print('saved baseline to {}'.format(args.baseline))
+        return 0
+
+    for warning in environment_warnings(baseline):
+        print(warning)
+    lines, regressions = compare(
+        selected,
+        baseline,
+        results,
+        args.threshold,
+        args.metric,
+    )
+    print('\n'.join(lines))
+    if regressions:
+        print('{} benchmark(s) slower than the baseline by more than {:.0%}'
+              .format(len(regressions), args.threshold))
+        return 1
+    return 0
@@ -1,27 +1,57 @@
 """Pusher Push Notifications Python server SDK"""
+# The client, its errors and the validation and encoding helpers it shares
+# with the asyncio client are kept in one module
+# pylint: disable=too-many-lines
 
-import copy
+from concurrent import futures
+import calendar
+import collections
 import datetime
-import json
-import os
 import re
 import time
 import warnings
 
-import jwt
 import requests
 import six
 from six.moves import urllib
 
+from ._compat import monotonic
+from .hooks import RequestHooks, RequestInfo
+from .metrics import MetricsCollector
+from .profiling import StageProfiler
+from .rate_limit import FileTokenBucket, TokenBucket
+from .retry import RetryPolicy
+from .serializers import DEFAULT_SERIALIZER, JSONSerializer, OrjsonSerializer
+from .tokens import HS256Signer, TokenCache, sign_tokens
+from .transport import (
+    InMemoryTransport,
+    Request,
+    RequestsTransport,
+    Response,
+    Transport,
+)
+
 SDK_VERSION = '2.0.2'
 
 INTEREST_MAX_LENGTH = 164
 INTEREST_REGEX = re.compile('^(_|-|=|@|,|\\.|;|[A-Z]|[a-z]|[0-9])*$')
 MAX_NUMBER_OF_INTERESTS = 100
+# Used to validate a whole list of interests in one regex match
+_SEPARATOR = '\x00'
+_INTERESTS_JOINED_REGEX = re.compile('[A-Za-z0-9_=@,.;\\-\x00]*\\Z')
 
 USER_ID_MAX_LENGTH = 164
 AUTH_TOKEN_DURATION = datetime.timedelta(days=1)
 MAX_NUMBER_OF_USER_IDS = 1000
+DEFAULT_TOKEN_REFRESH_THRESHOLD = AUTH_TOKEN_DURATION // 2
+DEFAULT_TOKEN_CHUNK_SIZE = 1000
+
+DEFAULT_BULK_CONCURRENCY = 10
+DEFAULT_POOL_CONNECTIONS = requests.adapters.DEFAULT_POOLSIZE
+DEFAULT_POOL_MAXSIZE = requests.adapters.DEFAULT_POOLSIZE
+
+PUBLISH_API_PREFIX = '/publish_api/'
+CUSTOMER_API_PREFIX = '/customer_api/'
 
 
 class PusherError(Exception):
@@ -32,6 +62,12 @@ class PusherValidationError(PusherError, ValueError):
     """Error thrown when the Push Notifications publish body is invalid"""
 
 
+class PusherTooManyRequestsError(PusherValidationError):
+    """Error thrown when the Push Notifications service is rate limiting
+    requests (HTTP 429)
+    """
+
+
 class PusherAuthError(PusherError, ValueError):
     """Error thrown when the Push Notifications secret key is incorrect"""
 
@@ -51,6 +87,184 @@ class PusherBadResponseError(PusherError, Exception):
     """
 
 
+class PusherQueueFullError(PusherError):
+    """Error thrown when a publish cannot be added to a full PublishQueue"""
+
+
+class PublishChunkResult(object):
+    """Result of publishing to a single chunk of a bulk publish
+
+    Attributes:
+        targets (list): The interests or user ids in this chunk
+        response (dict): The publish response, or None if the publish failed
+        error (Exception): The error raised by the publish, or None if it
+            succeeded
+    """
+
+    def __init__(self, targets, response=None, error=None):
+        self.targets = targets
+        self.response = response
+        self.error = error
+
+    @property
+    def publish_id(self):
+        """The publishId returned for this chunk (None if it failed)"""
+        if self.response is None:
+            return None
+        return self.response.get('publishId')
+
+    def __repr__(self):
+        return 'PublishChunkResult(targets={}, publish_id={!r}, error={!r})'.format(
+            len(self.targets),
+            self.publish_id,
+            self.error,
+        )
+
+
+class BulkPublishResult(object):
+    """Aggregated result of a bulk publish
+
+    Attributes:
+        chunks (list): One PublishChunkResult per chunk, in the order in which
+            the chunks were split from the original targets
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    @property
+    def publish_ids(self):
+        """List of the publishIds of all chunks that succeeded"""
+        return [chunk.publish_id for chunk in self.chunks if chunk.error is None]
+
+    @property
+    def failures(self):
+        """List of the PublishChunkResults of all chunks that failed"""
+        return [chunk for chunk in self.chunks if chunk.error is not None]
+
+    @property
+    def ok(self):
+        """True if every chunk was published successfully"""
+        return not self.failures
+
+    def __repr__(self):
+        return 'BulkPublishResult(chunks={}, failures={})'.format(
+            len(self.chunks),
+            len(self.failures),
+        )
+
+
+class DeleteUsersResult(object):
+    """Result of deleting many users with delete_users
+
+    Attributes:
+        succeeded (list): ids of the users that were deleted
+        not_found (list): ids of the users whose delete returned a 404
+        failed (dict): the error raised for each user id that could not be
+            deleted, by user id
+    """
+
+    def __init__(self, succeeded=None, not_found=None, failed=None):
+        self.succeeded = succeeded if succeeded is not None else []
+        self.not_found = not_found if not_found is not None else []
+        self.failed = failed if failed is not None else collections.OrderedDict()
+
+    @property
+    def ok(self):
+        """True if no delete failed (users that were not found count as
+        deleted)"""
+        return not self.failed
+
+    def __repr__(self):
+        return 'DeleteUsersResult(succeeded={}, not_found={}, failed={})'.format(
+            len(self.succeeded),
+            len(self.not_found),
+            len(self.failed),
+        )
+
+
+class PublishTemplate(object):
+    """A publish body that is encoded to JSON once and can then be published
+    to many audiences
+
+    Publishing the same body to many chunks of users or interests normally
+    re-encodes the whole body for every request. A PublishTemplate encodes it
+    once, and only the audience is encoded for each request. Templates can be
+    passed as the publish_body of any publish method, and the bulk publish
+    methods use one automatically.
+
+    Any "interests" or "users" key in the body is ignored, as the audience is
+    given when publishing.
+
+    Args:
+        publish_body (dict): Dict containing the body of the push
+            notification publish request.
+            (see https://pusher.com/docs/beams/)
+        serializer (JSONSerializer): serializer used to encode the body
+            (defaults to the standard library json module)
+
+    Raises:
+        TypeError: if publish_body is not a dict
+        ValueError: if publish_body cannot be encoded as a JSON object
+    """
+
+    def __init__(self, publish_body, serializer=DEFAULT_SERIALIZER):
+        if not isinstance(publish_body, dict):
+            raise TypeError('publish_body must be a dictionary')
+        _validate_serializer(serializer)
+        self._serializer = serializer
+        body = {
+            key: value
+            for key, value in publish_body.items()
+            if key not in ('interests', 'users')
+        }
+        encoded_body = serializer.dumps(body).rstrip()
+        if not encoded_body.endswith(b'}'):
+            raise ValueError(
+                'serializer must encode the publish_body as a JSON object',
+            )
+        # Drop the closing brace, so the audience can be appended
+        self._prefix = encoded_body[:-1]
+        if body:
+            self._prefix += b', '
+
+    def encode(self, key, targets):
+        """Encode the publish body with the given audience added
+
+        Args:
+            key (string): "interests" or "users"
+            targets (list, InterestSet or UserAudience): the interests or
+                user ids to publish to
+
+        Returns:
+            The encoded body (bytes)
+        """
+        if isinstance(targets, _Audience):
+            encoded_targets = targets._encode()  # pylint: disable=protected-access
+        else:
+            encoded_targets = self._serializer.dumps(targets)
+        return b''.join([
+            self._prefix,
+            self._serializer.dumps(key),
+            b': ',
+            encoded_targets,
+            b'}',
+        ])
+
+    # Templates that encode to the same body are interchangeable
+    def __eq__(self, other):
+        return (
+            isinstance(other, PublishTemplate)
+            and self._prefix == other._prefix
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._prefix)
+
+
 def _handle_http_error(response_body, status_code):
     error_string = '{}: {}'.format(
         response_body.get('error', 'Unknown error'),
@@ -60,6 +274,8 @@ def _handle_http_error(response_body, status_code):
         raise PusherAuthError(error_string)
     if status_code == 404:
         raise PusherMissingInstanceError(error_string)
+    if status_code == 429:
+        raise PusherTooManyRequestsError(error_string)
     if 400 <= status_code < 500:
         raise PusherValidationError(error_string)
     if 500 <= status_code < 600:
@@ -77,91 +293,808 @@ def _make_url(scheme, host, path):
     ])
 
 
-def _get_proxies_from_env():
+class _Audience(object):
+    """Base class for immutable, pre-validated lists of publish targets"""
+
+    __slots__ = ('_targets', '_encoded')
+
+    # Set by subclasses
+    _key = None
+    _chunk_size = None
+    _empty_message = None
+    _not_list_message = None
+
+    def __init__(self, targets):
+        if isinstance(targets, six.string_types) or not _is_iterable(targets):
+            raise TypeError(self._not_list_message)
+        targets = list(targets)
+        if not targets:
+            raise ValueError(self._empty_message)
+        for chunk in _split_into_chunks(targets, self._chunk_size):
+            self._validate_chunk(chunk)
+        self._targets = tuple(collections.OrderedDict.fromkeys(targets))
+        self._encoded = None
+
+    @staticmethod
+    def _validate_chunk(chunk):
+        raise NotImplementedError()
+
+    @classmethod
+    def _from_validated(cls, targets):
+        audience = cls.__new__(cls)
+        audience._targets = tuple(targets)
+        audience._encoded = None
+        return audience
+
+    @property
+    def targets(self):
+        """Tuple of the targets, in their original order"""
+        return self._targets
+
+    def chunks(self, size=None):
+        """Iterate over the audience in chunks small enough for a single
+        publish. The chunks are themselves audiences, so they are not
+        validated again.
+
+        Args:
+            size (int): maximum chunk size (defaults to the maximum number
+                of targets of a single publish)
+
+        Raises:
+            TypeError: if size is not an integer
+            ValueError: if size is less than 1 or more than the maximum
+                number of targets of a single publish
+        """
+        if size is None:
+            size = self._chunk_size
+        elif not isinstance(size, six.integer_types):
+            raise TypeError('size must be an integer')
+        elif not 1 <= size <= self._chunk_size:
+            raise ValueError(
+                'size must be between 1 and {}'.format(self._chunk_size),
+            )
+        return self._chunks(size)
+
+    def _chunks(self, size):
+        if len(self._targets) <= size:
+            yield self
+            return
+        for i in six.moves.range(0, len(self._targets), size):
+            yield self._from_validated(self._targets[i:i + size])
+
+    def _encode(self):
+        """The targets encoded as a JSON array, computed once"""
+        if self._encoded is None:
+            self._encoded = _encode_json(self._targets)
+        return self._encoded
+
+    def __len__(self):
+        return len(self._targets)
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __contains__(self, target):
+        return target in self._targets
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._targets == other._targets
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), self._targets))
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, list(self._targets))
+
+
+class InterestSet(_Audience):
+    """An immutable, hashable set of interests that is validated once, when
+    it is created, rather than every time it is published to
+
+    Duplicate interests are removed, keeping the order in which the
+    interests were first given.
+
+    Args:
+        interests (iterable): interests in the set
+
+    Raises:
+        TypeError: if interests is not iterable
+        TypeError: if any interest is not a string
+        ValueError: if there are no interests
+        ValueError: if any interest length is greater than the max
+        ValueError: if any interest contains a forbidden character
+    """
+
+    __slots__ = ()
+
+    _key = 'interests'
+    _chunk_size = MAX_NUMBER_OF_INTERESTS
+    _empty_message = 'Publishes must target at least one interest'
+    _not_list_message = 'interests must be a list'
+
+    @staticmethod
+    def _validate_chunk(chunk):
+        _validate_interests(chunk)
+
+
+class UserAudience(_Audience):
+    """An immutable, hashable set of user ids that is validated once, when
+    it is created, rather than every time it is published to
+
+    Duplicate user ids are removed, keeping the order in which the user ids
+    were first given.
+
+    Args:
+        user_ids (iterable): ids of the users in the audience
+
+    Raises:
+        TypeError: if user_ids is not iterable
+        TypeError: if any user id is not a string
+        ValueError: if there are no user ids
+        ValueError: if any user id length is greater than the max
+    """
+
+    __slots__ = ()
+
+    _key = 'users'
+    _chunk_size = MAX_NUMBER_OF_USER_IDS
+    _empty_message = 'Publishes must target at least one user'
+    _not_list_message = 'user_ids must be a list'
+
+    @staticmethod
+    def _validate_chunk(chunk):
+        _validate_user_ids(chunk)
+
+
+def _validate_client_params(instance_id, secret_key, endpoint):
+    if not isinstance(instance_id, six.string_types):
+        raise TypeError('instance_id must be a string')
+    if instance_id == '':
+        raise ValueError('instance_id cannot be the empty string')
+
+    if not isinstance(secret_key, six.string_types):
+        raise TypeError('secret_key must be a string')
+    if secret_key == '':
+        raise ValueError('secret_key cannot be the empty string')
+
+    if (endpoint is not None
+            and not isinstance(endpoint, six.string_types)):
+        raise TypeError('endpoint must be a string')
+
+
+def _validate_publish_body(publish_body):
+    if not isinstance(publish_body, (dict, PublishTemplate)):
+        raise TypeError('publish_body must be a dictionary')
+
+
+def _is_iterable(value):
+    try:
+        iter(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _validate_interest_targets(interests):
+    """Validates the interests of a single publish, which can be a list or
+    an (already validated) InterestSet"""
+    if not isinstance(interests, InterestSet):
+        _validate_interests(interests)
+    elif len(interests) > MAX_NUMBER_OF_INTERESTS:
+        raise ValueError(
+            'Number of interests ({}) exceeds maximum of {}'.format(
+                len(interests),
+                MAX_NUMBER_OF_INTERESTS,
+            ),
+        )
+
+
+def _validate_user_targets(user_ids):
+    """Validates the user ids of a single publish, which can be a list or
+    an (already validated) UserAudience"""
+    if not isinstance(user_ids, UserAudience):
+        _validate_user_ids(user_ids)
+    elif len(user_ids) > MAX_NUMBER_OF_USER_IDS:
+        raise ValueError(
+            'Number of user ids ({}) exceeds maximum of {}'.format(
+                len(user_ids),
+                MAX_NUMBER_OF_USER_IDS,
+            ),
+        )
+
+
+def _join_strings(items):
+    """Joins items with _SEPARATOR, or returns None if any item is not a
+    string"""
+    try:
+        return _SEPARATOR.join(items)
+    except (TypeError, ValueError):
+        return None
+
+
+def _validate_interests(interests):
+    if not isinstance(interests, list):
+        raise TypeError('interests must be a list')
+    if not interests:
+        raise ValueError('Publishes must target at least one interest')
+    if len(interests) > MAX_NUMBER_OF_INTERESTS:
+        raise ValueError(
+            'Number of interests ({}) exceeds maximum of {}'.format(
+                len(interests),
+                MAX_NUMBER_OF_INTERESTS,
+            ),
+        )
+    if not _are_valid_interests(interests):
+        _validate_each_interest(interests)
+
+
+def _are_valid_interests(interests):
+    """Checks a whole list of interests at once, using only operations that
+    run in C. Never accepts an interest that _validate_each_interest would
+    reject, but may reject some that it accepts."""
+    joined = _join_strings(interests)
+    if joined is None:
+        return False
+    if max(map(len, interests)) > INTEREST_MAX_LENGTH:
+        return False
+    # The separator is allowed by the regex, so also check that no interest
+    # contains it.
+    return (
+        joined.count(_SEPARATOR) == len(interests) - 1
+        and _INTERESTS_JOINED_REGEX.match(joined) is not None
+    )
+
+
+def _validate_each_interest(interests):
+    for interest in interests:
+        if not isinstance(interest, six.string_types):
+            raise TypeError(
+                'Interest {} is not a string'.format(interest)
+            )
+        if len(interest) > INTEREST_MAX_LENGTH:
+            raise ValueError(
+                'Interest "{}" is longer than the maximum of {} chars'.format(
+                    interest,
+                    INTEREST_MAX_LENGTH,
+                )
+            )
+        if not INTEREST_REGEX.match(interest):
+            raise ValueError(
+                'Interest "{}" contains a forbidden character. '.format(
+                    interest,
+                )
+                + 'Allowed characters are: ASCII upper/lower-case letters, '
+                + 'numbers or one of _=@,.;-'
+            )
+
+
+def _validate_user_ids(user_ids):
+    if not isinstance(user_ids, list):
+        raise TypeError('user_ids must be a list')
+    if not user_ids:
+        raise ValueError('Publishes must target at least one user')
+    if len(user_ids) > MAX_NUMBER_OF_USER_IDS:
+        raise ValueError(
+            'Number of user ids ({}) exceeds maximum of {}'.format(
+                len(user_ids),
+                MAX_NUMBER_OF_USER_IDS,
+            ),
+        )
+    if not _are_valid_user_ids(user_ids):
+        _validate_each_user_id(user_ids)
+
+
+def _are_valid_user_ids(user_ids):
+    """Checks a whole list of user ids at once, using only operations that
+    run in C. Never accepts a user id that _validate_each_user_id would
+    reject, but may reject some that it accepts."""
+    return (
+        _join_strings(user_ids) is not None
+        and max(map(len, user_ids)) <= USER_ID_MAX_LENGTH
+    )
+
+
+def _validate_each_user_id(user_ids):
+    for user_id in user_ids:
+        if not isinstance(user_id, six.string_types):
+            raise TypeError(
+                'User id {} is not a string'.format(user_id)
+            )
+        if len(user_id) > USER_ID_MAX_LENGTH:
+            raise ValueError(
+                'User id "{}" is longer than the maximum of {} chars'.format(
+                    user_id,
+                    USER_ID_MAX_LENGTH,
+                )
+            )
+
+
+def _validate_user_id(user_id):
+    if not isinstance(user_id, six.string_types):
+        raise TypeError('user_id must be a string')
+    if len(user_id) > USER_ID_MAX_LENGTH:
+        raise ValueError('user_id longer than the maximum of 164 chars')
+
+
+def _validate_concurrency(concurrency, name='concurrency'):
+    if not isinstance(concurrency, six.integer_types):
+        raise TypeError('{} must be an integer'.format(name))
+    if concurrency < 1:
+        raise ValueError('{} must be at least 1'.format(name))
+
+
+def _validate_rate_limiter(name, rate_limiter):
+    if rate_limiter is not None and not isinstance(rate_limiter, TokenBucket):
+        raise TypeError('{} must be a TokenBucket'.format(name))
+
+
+def _validate_serializer(serializer):
+    if not (callable(getattr(serializer, 'dumps', None))
+            and callable(getattr(serializer, 'loads', None))):
+        raise TypeError('serializer must have dumps and loads methods')
+
+
+def _validate_hooks(hooks):
+    if isinstance(hooks, RequestHooks):
+        return [hooks]
+    if not _is_iterable(hooks):
+        raise TypeError('hooks must be a RequestHooks or a list of them')
+    hooks = list(hooks)
+    for hook in hooks:
+        if not isinstance(hook, RequestHooks):
+            raise TypeError('hooks must be a RequestHooks or a list of them')
+    return hooks
+
+
+def _split_into_chunks(items, chunk_size):
+    return [
+        items[i:i + chunk_size]
+        for i in six.moves.range(0, len(items), chunk_size)
+    ]
+
+
+def _token_expiry_timestamp():
+    now = datetime.datetime.utcnow()
+    expiry_datetime = now + AUTH_TOKEN_DURATION
+    # timegm, unlike mktime, treats the time tuple as UTC
+    return calendar.timegm(expiry_datetime.timetuple())
+
+
+def _token_issuer(instance_id):
+    return 'https://{}.pushnotifications.pusher.com'.format(instance_id)
+
+
+def _with_audience(publish_body, key, targets):
+    if isinstance(publish_body, PublishTemplate):
+        return publish_body.encode(key, targets)
+    if isinstance(targets, _Audience):
+        targets = list(targets.targets)
+    # Only the top level of the body is copied: nested values are shared with
+    # the caller's dict but never modified, so a deep copy is not needed.
+    body = dict(publish_body)
+    body[key] = targets
+    return body
+
+
+def _encode_json(value):
+    return DEFAULT_SERIALIZER.dumps(value)
+
+
+def _encode_body(body, serializer=DEFAULT_SERIALIZER):
+    """Encode a request body as JSON, unless it is already encoded"""
+    if body is None or isinstance(body, bytes):
+        return body
+    return serializer.dumps(body)
+
+
+def _default_endpoint(instance_id):
+    return '{}.pushnotifications.pusher.com'.format(instance_id).lower()
+
+
+def _split_endpoint(endpoint):
+    """Returns (scheme, host) for an endpoint, which may start with a scheme
+    (e.g. 'http://localhost:8080'). The scheme defaults to https."""
+    if '://' in endpoint:
+        scheme, host = endpoint.split('://', 1)
+        return scheme.lower(), host
+    return 'https', endpoint
+
+
+def _make_headers(host, secret_key):
     return {
-        'http': os.environ.get('HTTP_PROXY') or os.environ.get('http_proxy'),
-        'https': os.environ.get('HTTPS_PROXY') or os.environ.get('https_proxy'),
+        'host': host,
+        'authorization': 'Bearer {}'.format(secret_key),
+        'x-pusher-library': 'pusher-push-notifications-python {}'.format(
+            SDK_VERSION,
+        )
+    }
+
+
+def _quote_path(path, path_params):
+    path_params = {
+        name: urllib.parse.quote(value)
+        for name, value in path_params.items()
     }
+    return path.format(**path_params)
 
 
-class PushNotifications(object):
+def _build_request(method, url, base_headers, body, serializer):
+    """Build the Request for an API call. Shared by the clients, which only
+    differ in how requests are sent."""
+    headers = dict(base_headers)
+    data = _encode_body(body, serializer)
+    if data is not None:
+        headers['content-type'] = 'application/json'
+        headers['content-length'] = str(len(data))
+    else:
+        headers['content-length'] = '0'
+    return Request(method, url, headers, data)
+
+
+def _parse_response(status_code, body, serializer):
+    """Decode the body of a response to an API call, raising the matching
+    error if the call failed"""
+    try:
+        response_body = serializer.loads(body)
+    except ValueError:
+        response_body = None
+
+    if status_code != 200:
+        if not isinstance(response_body, dict):
+            response_body = {}
+        _handle_http_error(response_body, status_code)
+
+    return response_body
+
+
+class PushNotifications(object):  # pylint: disable=too-many-instance-attributes
     """Pusher Push Notifications API client
     This client class can be used to publish notifications to the Pusher
-    Push Notifications service"""
+    Push Notifications service
+
+    A single client can safely be shared between threads: with the default
+    transport each thread gets its own requests session, and all of them share
+    one connection pool.
+
+    Args:
+        instance_id (string): id of the Beams instance
+        secret_key (string): secret key of the Beams instance
+        endpoint (string): override for the Pusher API host. May start with
+            a scheme, e.g. 'http://localhost:8080' for a local server (the
+            default scheme is https).
+        pool_connections (int): number of per-host connection pools to cache
+        pool_maxsize (int): maximum number of connections kept open to each
+            host. Should be at least the number of threads (or bulk
+            publish concurrency) making requests at the same time.
+        pool_block (bool): if True, requests wait for a free connection when
+            the pool is exhausted, instead of opening a connection that is
+            thrown away afterwards
+        keep_alive (bool): if False, connections are closed after every
+            request
+        http2 (bool): if True, requests are sent over HTTP/2 (which requires
+            httpx, see pusher_push_notifications.http2), so concurrent
+            requests share a single connection. pool_connections and
+            pool_block are not used, and keep_alive is ignored.
+        retry_policy (RetryPolicy): policy for retrying requests that fail
+            with a connection error or a retryable status (by default
+            requests are not retried)
+        publish_rate_limiter (TokenBucket): rate limiter for requests to the
+            publish API (publish_to_interests, publish_to_users)
+        customer_rate_limiter (TokenBucket): rate limiter for requests to the
+            customer API (delete_user)
+        token_cache_size (int): if set, generate_token caches up to this many
+            tokens (one per user id) and returns the cached token instead of
+            generating a new one
+        token_refresh_threshold (datetime.timedelta): cached tokens are only
+            returned while they have at least this much lifetime remaining
+        serializer (JSONSerializer): serializer used to encode request
+            bodies and decode responses, e.g. OrjsonSerializer() for large
+            publish bodies (defaults to the standard library json module)
+        transport (Transport): transport used to send requests (defaults to
+            a RequestsTransport). When set, the pool and http2 options are
+            not used.
+        hooks (list): RequestHooks called as each request is sent, e.g. to
+            measure latency (see pusher_push_notifications.hooks)
+        profiler (StageProfiler): if set, the time spent in each stage of
+            every call (validation, encoding, the network...) is recorded
+            (see pusher_push_notifications.profiling). Can also be set or
+            cleared later with the profiler attribute.
+    """
 
-    def __init__(self, instance_id, secret_key, endpoint=None):
-        if not isinstance(instance_id, six.string_types):
-            raise TypeError('instance_id must be a string')
-        if instance_id == '':
-            raise ValueError('instance_id cannot be the empty string')
+    def __init__(  # pylint: disable=too-many-arguments,too-many-locals
+            self,
+            instance_id,
+            secret_key,
+            endpoint=None,
+            pool_connections=DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=DEFAULT_POOL_MAXSIZE,
+            pool_block=False,
+            keep_alive=True,
+            http2=False,
+            retry_policy=None,
+            publish_rate_limiter=None,
+            customer_rate_limiter=None,
+            token_cache_size=None,
+            token_refresh_threshold=DEFAULT_TOKEN_REFRESH_THRESHOLD,
+            serializer=DEFAULT_SERIALIZER,
+            transport=None,
+            hooks=(),
+            profiler=None,
+    ):
+        _validate_client_params(instance_id, secret_key, endpoint)
+        if (retry_policy is not None
+                and not isinstance(retry_policy, RetryPolicy)):
+            raise TypeError('retry_policy must be a RetryPolicy')
+        _validate_rate_limiter('publish_rate_limiter', publish_rate_limiter)
+        _validate_rate_limiter('customer_rate_limiter', customer_rate_limiter)
+        if (token_cache_size is not None
+                and not isinstance(token_cache_size, six.integer_types)):
+            raise TypeError('token_cache_size must be an integer')
+        if not isinstance(token_refresh_threshold, datetime.timedelta):
+            raise TypeError('token_refresh_threshold must be a timedelta')
+        if not (datetime.timedelta(0)
+                <= token_refresh_threshold
+                <= AUTH_TOKEN_DURATION):
+            raise ValueError(
+                'token_refresh_threshold must be between 0 and the token '
+                'lifetime',
+            )
+        _validate_concurrency(pool_connections, 'pool_connections')
+        _validate_concurrency(pool_maxsize, 'pool_maxsize')
+        _validate_serializer(serializer)
+        if transport is not None and not isinstance(transport, Transport):
+            raise TypeError('transport must be a Transport')
+        hooks = _validate_hooks(hooks)
+        if profiler is not None and not isinstance(profiler, StageProfiler):
+            raise TypeError('profiler must be a StageProfiler')
+
+        self._instance_id = instance_id
+        self._secret_key = secret_key
+        self._endpoint = endpoint
+        self._keep_alive = keep_alive
+        self.retry_policy = retry_policy
+        self.serializer = serializer
+        self.hooks = hooks
+        self.profiler = profiler
+        self._rate_limiters = {
+            PUBLISH_API_PREFIX: publish_rate_limiter,
+            CUSTOMER_API_PREFIX: customer_rate_limiter,
+        }
+        self._token_cache = None
+        if token_cache_size is not None:
+            self._token_cache = TokenCache(
+                maxsize=token_cache_size,
+                refresh_threshold=token_refresh_threshold.total_seconds(),
+            )
+        self._configure_tokens()
+
+        if transport is None:
+            if http2:
+                from .http2 import HTTP2Adapter  # pylint: disable=import-outside-toplevel
+                adapter = HTTP2Adapter(max_connections=pool_maxsize)
+            else:
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    pool_block=bool(pool_block),
+                )
+            transport = RequestsTransport(adapter)
+        self.transport = transport
+        self._configure_requests()
+
+    def _configure_requests(self):
+        """Compute everything about a request that does not depend on its
+        parameters once, rather than for every request. Called again when the
+        instance id, secret key or endpoint change."""
+        self._scheme, self._host = _split_endpoint(self.endpoint)
+        base_headers = _make_headers(self._host, self._secret_key)
+        if not self._keep_alive:
+            base_headers['connection'] = 'close'
+        self._base_headers = base_headers
+        self._request_templates = {}
+
+    def _configure_tokens(self):
+        """Build the token signer for the current secret key and instance id,
+        discarding any tokens signed with the previous ones"""
+        self._token_signer = HS256Signer(
+            self._secret_key,
+            issuer=_token_issuer(self._instance_id),
+        )
+        if self._token_cache is not None:
+            self._token_cache.clear()
+
+    @property
+    def instance_id(self):
+        """The id of the Beams instance the client publishes to"""
+        return self._instance_id
 
-        if not isinstance(secret_key, six.string_types):
-            raise TypeError('secret_key must be a string')
-        if secret_key == '':
-            raise ValueError('secret_key cannot be the empty string')
+    @instance_id.setter
+    def instance_id(self, instance_id):
+        _validate_client_params(instance_id, self._secret_key, self._endpoint)
+        self._instance_id = instance_id
+        self._configure_requests()
+        self._configure_tokens()
 
-        if (endpoint is not None
-                and not isinstance(endpoint, six.string_types)):
-            raise TypeError('endpoint must be a string')
+    @property
+    def secret_key(self):
+        """The secret key used to authenticate requests"""
+        return self._secret_key
 
-        self.instance_id = instance_id
-        self.secret_key = secret_key
-        self._endpoint = endpoint
+    @secret_key.setter
+    def secret_key(self, secret_key):
+        _validate_client_params(self._instance_id, secret_key, self._endpoint)
+        self._secret_key = secret_key
+        self._configure_requests()
+        self._configure_tokens()
+
+    @property
+    def session(self):
+        """The requests session used by the current thread (only available
+        with a RequestsTransport)
 
-        session = requests.Session()
-        # We've had multiple support requests about this library not working
-        # on PythonAnywhere (a popular python deployment platform)
-        # They require that proxy servers be loaded from the environment when
-        # making requests (on their free plan).
-        # This reintroduces the proxy support that is the default in requests
-        # anyway.
-        session.proxies = _get_proxies_from_env()
-        self.session = session
+        Changes to the session (e.g. mounting an adapter) only affect the
+        current thread. To customise the session for every thread, assign a
+        session instead, which is then shared by all threads.
+        """
+        return self.transport.session
+
+    @session.setter
+    def session(self, session):
+        self.transport.session = session
 
+    def close(self):
+        """Close all pooled connections held by this client"""
+        self.transport.close()
 
     @property
     def endpoint(self):
         """Property method to calculate the correct Pusher API host"""
-        default_endpoint = '{}.pushnotifications.pusher.com'.format(
-            self.instance_id,
-        ).lower()
-        return self._endpoint or default_endpoint
-
-    def _make_request(self, method, path, path_params, body=None):
-        path_params = {
-            name: urllib.parse.quote(value)
-            for name, value in path_params.items()
-        }
-        path = path.format(**path_params)
-        url = _make_url(scheme='https', host=self.endpoint, path=path)
+        return self._endpoint or _default_endpoint(self.instance_id)
 
-        request = requests.Request(
-            method,
-            url,
-            json=body,
-            headers={
-                'host': self.endpoint,
-                'authorization': 'Bearer {}'.format(self.secret_key),
-                'x-pusher-library': 'pusher-push-notifications-python {}'.format(
-                    SDK_VERSION,
+    @endpoint.setter
+    def endpoint(self, endpoint):
+        _validate_client_params(self._instance_id, self._secret_key, endpoint)
+        self._endpoint = endpoint
+        self._configure_requests()
+
+    def _request_template(self, path):
+        """Returns (url template, rate limiter) for a path template. The url
+        template has the instance id filled in, and the other path parameters
+        left as format fields."""
+        template = self._request_templates.get(path)
+        if template is None:
+            url = _make_url(
+                scheme=self._scheme,
+                host=self._host,
+                path=path.replace(
+                    '{instance_id}',
+                    urllib.parse.quote(self.instance_id),
+                ),
+            )
+            template = (url, self._rate_limiter_for(path))
+            self._request_templates[path] = template
+        return template
+
+    def _rate_limiter_for(self, path):
+        for prefix, rate_limiter in self._rate_limiters.items():
+            if path.startswith(prefix):
+                return rate_limiter
+        return None
+
+    def _start_stopwatch(self, operation):
+        if self.profiler is None:
+            return None
+        return self.profiler.start(operation)
+
+    def _call_hooks(self, event, *args):
+        for hook in self.hooks:
+            try:
+                getattr(hook, event)(*args)
+            except Exception as e:  # pylint: disable=broad-except
+                # A broken hook should not break publishing
+                warnings.warn(
+                    '{} hook {!r} raised {!r}'.format(event, hook, e),
+                    RuntimeWarning,
                 )
-            },
-        )
-
-        response = self.session.send(request.prepare())
 
-        if response.status_code != 200:
+    def _send_once(self, request, rate_limiter, info=None):
+        queue_wait = 0.0
+        if rate_limiter is not None:
+            queue_wait = rate_limiter.acquire()
+        if info is None:
+            return self.transport.send(request)
+
+        # pylint: disable=protected-access
+        info._start_attempt(queue_wait)
+        self._call_hooks('on_request_start', info)
+        started = monotonic()
+        try:
+            response = self.transport.send(request)
+        except Exception as e:
+            info._finish_attempt(started, error=e)
+            raise
+        info._finish_attempt(started, response=response)
+        self._call_hooks('on_response', info)
+        return response
+
+    def _send(self, request, rate_limiter, info=None):
+        if self.retry_policy is None:
+            return self._send_once(request, rate_limiter, info)
+
+        retry_state = self.retry_policy.new_call()
+        while True:
             try:
-                error_body = response.json()
-            except ValueError:
-                error_body = {}
-            _handle_http_error(error_body, response.status_code)
-
+                response = self._send_once(request, rate_limiter, info)
+            except self.transport.retryable_errors:
+                delay = retry_state.delay_after()
+                if delay is None:
+                    raise
+            else:
+                delay = retry_state.delay_after(response)
+                if delay is None:
+                    return response
+            if info is not None:
+                self._call_hooks('on_retry', info, delay)
+            time.sleep(delay)
+
+    def _make_request(  # pylint: disable=too-many-arguments
+            self,
+            method,
+            path,
+            path_params,
+            body=None,
+            targets=None,
+            stopwatch=None,
+    ):
+        url, rate_limiter = self._request_template(path)
+        if len(path_params) > 1:
+            url = _quote_path(url, {
+                name: value
+                for name, value in path_params.items()
+                if name != 'instance_id'
+            })
+
+        if stopwatch is not None:
+            # Encoded separately so it can be timed apart from building
+            body = _encode_body(body, self.serializer)
+            stopwatch.lap('encode')
+        request = _build_request(
+            method,
+            url,
+            self._base_headers,
+            body,
+            self.serializer,
+        )
+        if stopwatch is not None:
+            stopwatch.lap('build')
+
+        info = None
+        if self.hooks:
+            info = RequestInfo(
+                method,
+                path,
+                url,
+                len(request.body or b''),
+                targets,
+            )
         try:
-            response_body = response.json()
-        except ValueError:
-            response_body = None
-
+            response = self._send(request, rate_limiter, info)
+            if stopwatch is not None:
+                stopwatch.lap('network')
+            response_body = _parse_response(
+                response.status_code,
+                response.body,
+                self.serializer,
+            )
+        except Exception as e:
+            if info is not None:
+                self._call_hooks('on_error', info, e)
+            raise
+        if stopwatch is not None:
+            stopwatch.lap('decode')
         return response_body
 
     def publish(self, interests, publish_body):
@@ -206,10 +1139,10 @@ class PushNotifications(object):
         """Publish the given publish_body to the specified interests.
 
         Args:
-            interests (list): List of interests that the publish body should
-                be sent to.
-            publish_body (dict): Dict containing the body of the push
-                notification publish request.
+            interests (list or InterestSet): List of interests that the
+                publish body should be sent to.
+            publish_body (dict or PublishTemplate): Dict containing the body
+                of the push notification publish request.
                 (see https://pusher.com/docs/beams/)
 
         Returns:
@@ -232,42 +1165,15 @@ class PushNotifications(object):
             ValueError: if any interest contains a forbidden character
 
         """
-        if not isinstance(interests, list):
-            raise TypeError('interests must be a list')
-        if not isinstance(publish_body, dict):
-            raise TypeError('publish_body must be a dictionary')
-        if not interests:
-            raise ValueError('Publishes must target at least one interest')
-        if len(interests) > MAX_NUMBER_OF_INTERESTS:
-            raise ValueError(
-                'Number of interests ({}) exceeds maximum of {}'.format(
-                    len(interests),
-                    MAX_NUMBER_OF_INTERESTS,
-                ),
-            )
-        for interest in interests:
-            if not isinstance(interest, six.string_types):
-                raise TypeError(
-                    'Interest {} is not a string'.format(interest)
-                )
-            if len(interest) > INTEREST_MAX_LENGTH:
-                raise ValueError(
-                    'Interest "{}" is longer than the maximum of {} chars'.format(
-                        interest,
-                        INTEREST_MAX_LENGTH,
-                    )
-                )
-            if not INTEREST_REGEX.match(interest):
-                raise ValueError(
-                    'Interest "{}" contains a forbidden character. '.format(
-                        interest,
-                    )
-                    + 'Allowed characters are: ASCII upper/lower-case letters, '
-                    + 'numbers or one of _=@,.;-'
-                )
+        stopwatch = self._start_stopwatch('publish_to_interests')
+        _validate_interest_targets(interests)
+        _validate_publish_body(publish_body)
+        if stopwatch is not None:
+            stopwatch.lap('validate')
 
-        publish_body = copy.deepcopy(publish_body)
-        publish_body['interests'] = interests
+        publish_body = _with_audience(publish_body, 'interests', interests)
+        if stopwatch is not None:
+            stopwatch.lap('copy')
 
         response_body = self._make_request(
             method='POST',
@@ -276,6 +1182,8 @@ class PushNotifications(object):
                 'instance_id': self.instance_id,
             },
             body=publish_body,
+            targets=len(interests),
+            stopwatch=stopwatch,
         )
 
         if response_body is None:
@@ -283,16 +1191,18 @@ class PushNotifications(object):
                 'The server returned a malformed response',
             )
 
+        if stopwatch is not None:
+            stopwatch.stop()
         return response_body
 
     def publish_to_users(self, user_ids, publish_body):
         """Publish the given publish_body to the specified users.
 
         Args:
-            user_ids (list): List of ids of users that the publish body should
-                be sent to.
-            publish_body (dict): Dict containing the body of the push
-                notification publish request.
+            user_ids (list or UserAudience): List of ids of users that the
+                publish body should be sent to.
+            publish_body (dict or PublishTemplate): Dict containing the body
+                of the push notification publish request.
                 (see https://pusher.com/docs/beams/)
 
         Returns:
@@ -314,34 +1224,15 @@ class PushNotifications(object):
             ValueError: if any user id length is greater than the max
 
         """
-        if not isinstance(user_ids, list):
-            raise TypeError('user_ids must be a list')
-        if not isinstance(publish_body, dict):
-            raise TypeError('publish_body must be a dictionary')
-        if not user_ids:
-            raise ValueError('Publishes must target at least one user')
-        if len(user_ids) > MAX_NUMBER_OF_USER_IDS:
-            raise ValueError(
-                'Number of user ids ({}) exceeds maximum of {}'.format(
-                    len(user_ids),
-                    MAX_NUMBER_OF_USER_IDS,
-                ),
-            )
-        for user_id in user_ids:
-            if not isinstance(user_id, six.string_types):
-                raise TypeError(
-                    'User id {} is not a string'.format(user_id)
-                )
-            if len(user_id) > USER_ID_MAX_LENGTH:
-                raise ValueError(
-                    'User id "{}" is longer than the maximum of {} chars'.format(
-                        user_id,
-                        USER_ID_MAX_LENGTH,
-                    )
-                )
+        stopwatch = self._start_stopwatch('publish_to_users')
+        _validate_user_targets(user_ids)
+        _validate_publish_body(publish_body)
+        if stopwatch is not None:
+            stopwatch.lap('validate')
 
-        publish_body = copy.deepcopy(publish_body)
-        publish_body['users'] = user_ids
+        publish_body = _with_audience(publish_body, 'users', user_ids)
+        if stopwatch is not None:
+            stopwatch.lap('copy')
 
         response_body = self._make_request(
             method='POST',
@@ -350,6 +1241,8 @@ class PushNotifications(object):
                 'instance_id': self.instance_id,
             },
             body=publish_body,
+            targets=len(user_ids),
+            stopwatch=stopwatch,
         )
 
         if response_body is None:
@@ -357,12 +1250,154 @@ class PushNotifications(object):
                 'The server returned a malformed response',
             )
 
+        if stopwatch is not None:
+            stopwatch.stop()
         return response_body
 
+    def publish_to_interests_bulk(
+            self,
+            interests,
+            publish_body,
+            concurrency=DEFAULT_BULK_CONCURRENCY,
+    ):
+        """Publish the given publish_body to any number of interests.
+
+        Duplicate interests are removed, then the interests are split into
+        chunks of at most 100 (the limit for a single publish_to_interests
+        request) which are published in parallel. A failed chunk does not stop
+        the other chunks from being published.
+
+        Note that each chunk is a separate publish, so a device subscribed to
+        interests in more than one chunk will receive the notification once
+        per chunk.
+
+        Args:
+            interests (list or InterestSet): List of interests that the
+                publish body should be sent to.
+            publish_body (dict or PublishTemplate): Dict containing the body
+                of the push notification publish request.
+                (see https://pusher.com/docs/beams/)
+            concurrency (int): Maximum number of chunks to publish at once.
+                Connections are only reused if this is no greater than the
+                client's pool_maxsize.
+
+        Returns:
+            A BulkPublishResult with the publishId or error of each chunk.
+
+        Raises:
+            TypeError: if interests is not a list
+            TypeError: if publish_body is not a dict
+            TypeError: if any interest is not a string
+            TypeError: if concurrency is not an integer
+            ValueError: if len(interests) < 1
+            ValueError: if any interest length is greater than the max
+            ValueError: if any interest contains a forbidden character
+            ValueError: if concurrency < 1
+
+        """
+        if not isinstance(interests, InterestSet):
+            if not isinstance(interests, list):
+                raise TypeError('interests must be a list')
+            interests = InterestSet(interests)
+        _validate_publish_body(publish_body)
+        _validate_concurrency(concurrency)
+        if not isinstance(publish_body, PublishTemplate):
+            publish_body = PublishTemplate(publish_body, self.serializer)
+
+        return self._publish_chunks(
+            self.publish_to_interests,
+            list(interests.chunks()),
+            publish_body,
+            concurrency,
+        )
+
+    def publish_to_users_bulk(
+            self,
+            user_ids,
+            publish_body,
+            concurrency=DEFAULT_BULK_CONCURRENCY,
+    ):
+        """Publish the given publish_body to any number of users.
+
+        The user ids are split into chunks of at most 1000 (the limit for a
+        single publish_to_users request) which are published in parallel.
+        A failed chunk does not stop the other chunks from being published.
+
+        Args:
+            user_ids (list or UserAudience): List of ids of users that the
+                publish body should be sent to.
+            publish_body (dict or PublishTemplate): Dict containing the body
+                of the push notification publish request.
+                (see https://pusher.com/docs/beams/)
+            concurrency (int): Maximum number of chunks to publish at once.
+                Connections are only reused if this is no greater than the
+                client's pool_maxsize.
+
+        Returns:
+            A BulkPublishResult with the publishId or error of each chunk.
+
+        Raises:
+            TypeError: if user_ids is not a list
+            TypeError: if publish_body is not a dict
+            TypeError: if any user id is not a string
+            TypeError: if concurrency is not an integer
+            ValueError: if len(user_ids) < 1
+            ValueError: if any user id length is greater than the max
+            ValueError: if concurrency < 1
+
+        """
+        if isinstance(user_ids, UserAudience):
+            chunks = list(user_ids.chunks())
+        else:
+            if not isinstance(user_ids, list):
+                raise TypeError('user_ids must be a list')
+            if not user_ids:
+                raise ValueError('Publishes must target at least one user')
+            chunks = _split_into_chunks(user_ids, MAX_NUMBER_OF_USER_IDS)
+            for chunk in chunks:
+                _validate_user_ids(chunk)
+            # Unlike a UserAudience, duplicate user ids are kept
+            chunks = [
+                UserAudience._from_validated(chunk)  # pylint: disable=protected-access
+                for chunk in chunks
+            ]
+        _validate_publish_body(publish_body)
+        _validate_concurrency(concurrency)
+        if not isinstance(publish_body, PublishTemplate):
+            publish_body = PublishTemplate(publish_body, self.serializer)
+
+        return self._publish_chunks(
+            self.publish_to_users,
+            chunks,
+            publish_body,
+            concurrency,
+        )
+
+    def _publish_chunks(self, publish_method, chunks, publish_body, concurrency):
+        def publish_chunk(chunk):
+            try:
+                response = publish_method(chunk, publish_body)
+            # Transports may raise any exception, and one failed chunk must
+            # not lose the publishIds of the others
+            except Exception as e:  # pylint: disable=broad-except
+                return PublishChunkResult(list(chunk), error=e)
+            return PublishChunkResult(list(chunk), response=response)
+
+        if concurrency == 1 or len(chunks) == 1:
+            return BulkPublishResult([publish_chunk(chunk) for chunk in chunks])
+
+        max_workers = min(concurrency, len(chunks))
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return BulkPublishResult(list(executor.map(publish_chunk, chunks)))
+
     def generate_token(self, user_id):
         """Generate an auth token which will allow devices to associate
         themselves with the given user id
 
+        If the client was created with a token_cache_size, a previously
+        generated token for the user is returned while it has at least
+        token_refresh_threshold of its lifetime remaining.
+
         Args:
             user_id (string): user id for which the token will be valid
 
@@ -374,32 +1409,114 @@ class PushNotifications(object):
             ValueError: is user_id is longer than the maximum of 164 chars
 
         """
-        if not isinstance(user_id, six.string_types):
-            raise TypeError('user_id must be a string')
-        if len(user_id) > USER_ID_MAX_LENGTH:
-            raise ValueError('user_id longer than the maximum of 164 chars')
+        _validate_user_id(user_id)
 
-        issuer = 'https://{}.pushnotifications.pusher.com'.format(self.instance_id)
+        if self._token_cache is not None:
+            token = self._token_cache.get(user_id)
+            if token is not None:
+                return {
+                    'token': token,
+                }
 
-        now = datetime.datetime.utcnow()
-        expiry_datetime = now + AUTH_TOKEN_DURATION
-        expiry_timestamp = int(time.mktime(expiry_datetime.timetuple()))
+        expiry = _token_expiry_timestamp()
+        token = self._token_signer.sign(user_id, expiry)
 
-        token = jwt.encode(
-            {
-                'iss': issuer,
-                'sub': user_id,
-                'exp': expiry_timestamp,
-            },
-            self.secret_key,
-            algorithm='HS256',
-        )
-        token = six.ensure_text(token)
+        if self._token_cache is not None:
+            self._token_cache.put(user_id, token, expiry)
 
         return {
             'token': token,
         }
 
+    def generate_tokens(
+            self,
+            user_ids,
+            workers=None,
+            chunk_size=DEFAULT_TOKEN_CHUNK_SIZE,
+    ):
+        """Generate auth tokens for many user ids, optionally signing them in
+        parallel in a pool of worker processes
+
+        Tokens are yielded as they are generated, in the same order as
+        user_ids, so user_ids can be a generator and the tokens never all
+        need to be held in memory. Each chunk of user ids is validated before
+        any of its tokens are generated, so an invalid user id raises only
+        after the tokens of earlier chunks have been yielded.
+
+        Tokens generated by this method bypass the token cache.
+
+        Args:
+            user_ids (iterable): user ids for which tokens should be generated
+            workers (int): number of worker processes. If None (the default)
+                the tokens are generated in the current process.
+            chunk_size (int): number of tokens each worker signs at a time
+
+        Returns:
+            A generator of (user_id, token) tuples
+
+        Raises:
+            TypeError: if any user_id is not a string
+            TypeError: if workers or chunk_size is not an integer
+            ValueError: if any user_id is longer than the maximum of 164 chars
+            ValueError: if workers or chunk_size < 1
+
+        """
+        if workers is not None:
+            _validate_concurrency(workers, name='workers')
+        _validate_concurrency(chunk_size, name='chunk_size')
+
+        return self._generate_tokens(
+            self._validated_user_id_chunks(user_ids, chunk_size),
+            workers,
+        )
+
+    def _generate_tokens(self, chunks, workers):
+        if workers is None:
+            for chunk in chunks:
+                expiry_timestamp = _token_expiry_timestamp()
+                for user_id in chunk:
+                    yield user_id, self._token_signer.sign(
+                        user_id,
+                        expiry_timestamp,
+                    )
+            return
+
+        issuer = _token_issuer(self.instance_id)
+
+        # Only keep a couple of chunks per worker in flight, so results never
+        # pile up faster than the caller consumes them.
+        max_pending = workers * 2
+        pending = collections.deque()
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(
+                    sign_tokens,
+                    self.secret_key,
+                    issuer,
+                    _token_expiry_timestamp(),
+                    chunk,
+                )))
+                if len(pending) >= max_pending:
+                    chunk, future = pending.popleft()
+                    for user_id_token in zip(chunk, future.result()):
+                        yield user_id_token
+            while pending:
+                chunk, future = pending.popleft()
+                for user_id_token in zip(chunk, future.result()):
+                    yield user_id_token
+
+    @staticmethod
+    def _validated_user_id_chunks(user_ids, chunk_size):
+        chunk = []
+        for user_id in user_ids:
+            _validate_user_id(user_id)
+            chunk.append(user_id)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     def delete_user(self, user_id):
         """Remove the user with the given ID (and all of their devices) from
         the Pusher Beams database. The user will no longer receive any
@@ -416,10 +1533,10 @@ class PushNotifications(object):
             ValueError: is user_id is longer than the maximum of 164 chars
 
         """
-        if not isinstance(user_id, six.string_types):
-            raise TypeError('user_id must be a string')
-        if len(user_id) > USER_ID_MAX_LENGTH:
-            raise ValueError('user_id longer than the maximum of 164 chars')
+        stopwatch = self._start_stopwatch('delete_user')
+        _validate_user_id(user_id)
+        if stopwatch is not None:
+            stopwatch.lap('validate')
 
         self._make_request(
             method='DELETE',
@@ -428,4 +1545,74 @@ class PushNotifications(object):
                 'instance_id': self.instance_id,
                 'user_id': user_id,
             },
+            stopwatch=stopwatch,
         )
+        if stopwatch is not None:
+            stopwatch.stop()
+
+    def delete_users(self, user_ids, concurrency=DEFAULT_BULK_CONCURRENCY):
+        """Remove many users (and all of their devices) from the Pusher
+        Beams database, like delete_user. This action cannot be undone.
+
+        Every user id is validated before anything is deleted. Duplicate ids
+        are only deleted once. The deletes are made in parallel, with the
+        client's retry policy and rate limiter, and a failed delete does not
+        stop the others.
+
+        The service also answers with a 404 when the instance does not exist,
+        so if every user is reported as not found, check the instance_id.
+
+        Args:
+            user_ids (list): ids of the users to be deleted
+            concurrency (int): Maximum number of deletes to make at once.
+                Connections are only reused if this is no greater than the
+                client's pool_maxsize.
+
+        Returns:
+            A DeleteUsersResult with the ids that were deleted, were not
+            found, or failed (with their error).
+
+        Raises:
+            TypeError: if user_ids is not a list
+            TypeError: if any user id is not a string
+            TypeError: if concurrency is not an integer
+            ValueError: if any user id is longer than the maximum of 164
+                chars
+            ValueError: if concurrency < 1
+
+        """
+        if not isinstance(user_ids, list):
+            raise TypeError('user_ids must be a list')
+        for user_id in user_ids:
+            _validate_user_id(user_id)
+        _validate_concurrency(concurrency)
+        user_ids = list(collections.OrderedDict.fromkeys(user_ids))
+
+        def delete_user(user_id):
+            """Returns (user id, whether it was not found, error)"""
+            try:
+                self.delete_user(user_id)
+            except PusherMissingInstanceError as e:
+                return user_id, True, e
+            # Transports may raise any exception, and one failed delete must
+            # not lose the outcome of the others
+            except Exception as e:  # pylint: disable=broad-except
+                return user_id, False, e
+            return user_id, False, None
+
+        if concurrency == 1 or len(user_ids) <= 1:
+            outcomes = [delete_user(user_id) for user_id in user_ids]
+        else:
+            max_workers = min(concurrency, len(user_ids))
+            with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                outcomes = list(executor.map(delete_user, user_ids))
+
+        result = DeleteUsersResult()
+        for user_id, not_found, error in outcomes:
+            if not_found:
+                result.not_found.append(user_id)
+            elif error is not None:
+                result.failed[user_id] = error
+            else:
+                result.succeeded.append(user_id)
+        return result
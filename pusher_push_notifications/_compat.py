@@ -0,0 +1,7 @@
+"""Helpers for supporting both Python 2 and 3"""
+
+import time
+
+# Clock for measuring intervals, which is not affected by changes to the
+# system time (Python 2 only has time.time)
+monotonic = getattr(time, 'monotonic', time.time)
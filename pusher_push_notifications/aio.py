@@ -0,0 +1,201 @@
+"""asyncio client for the Pusher Push Notifications service
+
+Requires Python 3.5+ and aiohttp (``pip install pusher_push_notifications[async]``)
+"""
+
+import asyncio
+
+import aiohttp
+
+from pusher_push_notifications import (
+    DEFAULT_SERIALIZER,
+    PusherBadResponseError,
+    RetryPolicy,
+    _build_request,
+    _default_endpoint,
+    _make_headers,
+    _make_url,
+    _parse_response,
+    _quote_path,
+    _split_endpoint,
+    _validate_client_params,
+    _validate_interest_targets,
+    _validate_publish_body,
+    _validate_serializer,
+    _validate_user_id,
+    _validate_user_targets,
+    _with_audience,
+)
+from pusher_push_notifications.transport import Response
+
+DEFAULT_CONNECTION_LIMIT = 100
+
+
+class AsyncPushNotifications(object):  # pylint: disable=too-many-instance-attributes
+    """Pusher Push Notifications asyncio API client
+    This client mirrors PushNotifications, but its request methods are
+    coroutines that share a single aiohttp connection pool, so many publishes
+    can be in flight at once without blocking the event loop.
+
+    The client should be closed when it is no longer needed, either with
+    ``await client.close()`` or by using it as an async context manager."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            instance_id,
+            secret_key,
+            endpoint=None,
+            session=None,
+            connection_limit=DEFAULT_CONNECTION_LIMIT,
+            retry_policy=None,
+            serializer=DEFAULT_SERIALIZER,
+    ):
+        _validate_client_params(instance_id, secret_key, endpoint)
+        if (retry_policy is not None
+                and not isinstance(retry_policy, RetryPolicy)):
+            raise TypeError('retry_policy must be a RetryPolicy')
+        _validate_serializer(serializer)
+
+        if not isinstance(connection_limit, int):
+            raise TypeError('connection_limit must be an integer')
+        if connection_limit < 0:
+            raise ValueError('connection_limit must not be negative')
+
+        self.instance_id = instance_id
+        self.secret_key = secret_key
+        self._endpoint = endpoint
+        self._connection_limit = connection_limit
+        self.retry_policy = retry_policy
+        self.serializer = serializer
+        self._session = session
+        # Sessions passed in by the caller may be shared with other clients,
+        # so only close the ones we created ourselves.
+        self._owns_session = session is None
+
+    @property
+    def endpoint(self):
+        """Property method to calculate the correct Pusher API host"""
+        return self._endpoint or _default_endpoint(self.instance_id)
+
+    @property
+    def session(self):
+        """The aiohttp session (and connection pool) used by this client.
+        Created lazily, as aiohttp sessions must be created inside a running
+        event loop."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._connection_limit),
+                # Load proxy servers from the environment, like the
+                # synchronous client does.
+                trust_env=True,
+            )
+        return self._session
+
+    async def close(self):
+        """Close the underlying connection pool"""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _send_once(self, request):
+        async with self.session.request(
+                request.method,
+                request.url,
+                data=request.body,
+                headers=request.headers,
+        ) as response:
+            return Response(
+                response.status,
+                response.headers,
+                await response.read(),
+            )
+
+    async def _send(self, request):
+        if self.retry_policy is None:
+            return await self._send_once(request)
+
+        retry_state = self.retry_policy.new_call()
+        while True:
+            error = None
+            try:
+                response = await self._send_once(request)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                response, error = None, e
+            delay = retry_state.delay_after(response)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+
+    async def _make_request(self, method, path, path_params, body=None):
+        path = _quote_path(path, path_params)
+        scheme, host = _split_endpoint(self.endpoint)
+        url = _make_url(scheme=scheme, host=host, path=path)
+
+        request = _build_request(
+            method,
+            url,
+            _make_headers(host, self.secret_key),
+            body,
+            self.serializer,
+        )
+        response = await self._send(request)
+        return _parse_response(
+            response.status_code,
+            response.body,
+            self.serializer,
+        )
+
+    async def _publish(self, key, targets, publish_body):
+        response_body = await self._make_request(
+            method='POST',
+            path='/publish_api/v1/instances/{instance_id}/publishes/' + key,
+            path_params={'instance_id': self.instance_id},
+            body=_with_audience(publish_body, key, targets),
+        )
+
+        if response_body is None:
+            raise PusherBadResponseError(
+                'The server returned a malformed response',
+            )
+
+        return response_body
+
+    async def publish_to_interests(self, interests, publish_body):
+        """Publish the given publish_body to the specified interests.
+
+        See :func:`PushNotifications.publish_to_interests`.
+        """
+        _validate_interest_targets(interests)
+        _validate_publish_body(publish_body)
+        return await self._publish('interests', interests, publish_body)
+
+    async def publish_to_users(self, user_ids, publish_body):
+        """Publish the given publish_body to the specified users.
+
+        See :func:`PushNotifications.publish_to_users`.
+        """
+        _validate_user_targets(user_ids)
+        _validate_publish_body(publish_body)
+        return await self._publish('users', user_ids, publish_body)
+
+    async def delete_user(self, user_id):
+        """Remove the user with the given ID (and all of their devices) from
+        the Pusher Beams database.
+
+        See :func:`PushNotifications.delete_user`.
+        """
+        _validate_user_id(user_id)
+
+        await self._make_request(
+            method='DELETE',
+            path='/customer_api/v1/instances/{instance_id}/users/{user_id}',
+            path_params={'instance_id': self.instance_id, 'user_id': user_id},
+        )
@@ -0,0 +1,390 @@
+"""Local stand-in for the Pusher Push Notifications service
+
+FakeBeamsServer implements the publish and delete user endpoints of the
+service, with configurable latency, error rates and rate limiting, so that
+code using the SDK can be load tested without sending anything to Pusher.
+Point a client at it with the endpoint option::
+
+    with FakeBeamsServer(latency=lognormal_latency(0.02, 0.5)) as server:
+        beams_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            endpoint=server.endpoint,
+        )
+
+It can also be run from the command line::
+
+    python -m pusher_push_notifications.fake_server --port 8080 \\
+        --latency lognormal:20,0.5 --error-rate 0.01
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+
+from six.moves import BaseHTTPServer, socketserver
+
+from .rate_limit import TokenBucket
+
+_PUBLISH_PATH = re.compile(
+    r'^/publish_api/v1/instances/([^/]+)/publishes/(interests|users)$',
+)
+_DELETE_USER_PATH = re.compile(
+    r'^/customer_api/v1/instances/([^/]+)/users/([^/]+)$',
+)
+
+_MAX_TARGETS = {
+    'interests': 100,
+    'users': 1000,
+}
+
+
+def fixed_latency(seconds):
+    """Every response takes the same time"""
+    return lambda rng: seconds
+
+
+def uniform_latency(low, high):
+    """Response times spread evenly between low and high seconds"""
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential_latency(mean):
+    """Response times with an exponential distribution"""
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+def lognormal_latency(median, sigma):
+    """Response times with a log-normal distribution, which has the long tail
+    typical of real services. sigma controls the length of the tail."""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+_LATENCIES = {
+    'fixed': (fixed_latency, 1),
+    'uniform': (uniform_latency, 2),
+    'exponential': (exponential_latency, 1),
+    'lognormal': (lognormal_latency, 2),
+}
+
+
+def parse_latency(spec):
+    """Parse a latency given on the command line, in milliseconds:
+    'fixed:MS', 'uniform:LOW_MS,HIGH_MS', 'exponential:MEAN_MS' or
+    'lognormal:MEDIAN_MS,SIGMA'"""
+    name, _, args = spec.partition(':')
+    if name not in _LATENCIES:
+        raise ValueError('Unknown latency distribution: {}'.format(name))
+    factory, arg_count = _LATENCIES[name]
+    try:
+        values = [float(arg) for arg in args.split(',')]
+    except ValueError:
+        values = None
+    if values is None or len(values) != arg_count:
+        raise ValueError('Invalid latency: {}'.format(spec))
+    if name == 'lognormal':
+        return factory(values[0] / 1000, values[1])
+    return factory(*[value / 1000 for value in values])
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    # Keep connections open between requests, like the real service
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, and with Nagle's algorithm the
+    # body would wait ~40ms for the client to acknowledge the headers
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Answer a publish request"""
+        self.server.beams.handle(self)
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """Answer a delete user request"""
+        self.server.beams.handle(self)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Don't log every request to stderr"""
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeBeamsServer(object):  # pylint: disable=too-many-instance-attributes
+    """Local HTTP server that behaves like the Push Notifications service
+
+    Every request first waits for a delay drawn from latency. It is then
+    rejected with a 429 if it is over the rate limit, or at random with the
+    given probabilities. Otherwise, it is validated and answered like the
+    real service would.
+
+    Args:
+        host (string): address to listen on
+        port (int): port to listen on (by default a free port is chosen)
+        instance_id (string): if set, requests for other instances get a 404
+        secret_key (string): if set, requests with another key get a 401
+        latency (callable): delay before each response, e.g.
+            lognormal_latency(0.02, 0.5). Called with a random.Random,
+            returning seconds. By default there is no delay.
+        error_rate (float): probability of answering with a 500
+        too_many_requests_rate (float): probability of answering with a 429
+        rate_limit (float): maximum requests per second (with bursts of up to
+            one second, or of one request if the rate is lower than one per
+            second), above which requests get a 429
+        retry_after (int): Retry-After header sent with 429 responses, in
+            seconds
+        seed: seed for the random number generator, to make runs repeatable
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            host='127.0.0.1',
+            port=0,
+            instance_id=None,
+            secret_key=None,
+            latency=None,
+            error_rate=0.0,
+            too_many_requests_rate=0.0,
+            rate_limit=None,
+            retry_after=1,
+            seed=None,
+    ):
+        for name, rate in [
+                ('error_rate', error_rate),
+                ('too_many_requests_rate', too_many_requests_rate),
+        ]:
+            if not 0 <= rate <= 1:
+                raise ValueError('{} must be between 0 and 1'.format(name))
+
+        self.instance_id = instance_id
+        self.secret_key = secret_key
+        self.latency = latency
+        self.error_rate = error_rate
+        self.too_many_requests_rate = too_many_requests_rate
+        self.retry_after = retry_after
+        self._rate_limiter = None
+        if rate_limit is not None:
+            # Rates below one request per second still allow single requests
+            self._rate_limiter = TokenBucket(
+                rate_limit,
+                capacity=max(1, rate_limit),
+            )
+        self._random = random.Random(seed)
+        self._publish_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stats = None
+        self.reset_stats()
+
+        self._server = _HTTPServer((host, port), _Handler)
+        self._server.beams = self
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        """Endpoint to pass to the client, e.g. 'http://127.0.0.1:8080'"""
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    @property
+    def stats(self):
+        """Counts of requests received, responses by status code, publishes
+        and publish targets (interests or users)"""
+        with self._lock:
+            return {
+                'requests': self._stats['requests'],
+                'status_codes': dict(self._stats['status_codes']),
+                'publishes': self._stats['publishes'],
+                'targets': self._stats['targets'],
+            }
+
+    def reset_stats(self):
+        """Set all counts back to zero"""
+        with self._lock:
+            self._stats = {
+                'requests': 0,
+                'status_codes': collections.Counter(),
+                'publishes': 0,
+                'targets': 0,
+            }
+
+    def start(self):
+        """Serve requests from a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            # How often shutdown requests are checked for
+            kwargs={'poll_interval': 0.05},
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests from the current thread until interrupted"""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving requests and close the listening socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _random_float(self):
+        with self._lock:
+            return self._random.random()
+
+    def _latency(self):
+        with self._lock:
+            return self.latency(self._random)
+
+    def handle(self, request):
+        """Answer a request (called by the request handler threads)"""
+        length = int(request.headers.get('content-length') or 0)
+        body = request.rfile.read(length) if length else b''
+
+        if self.latency is not None:
+            time.sleep(max(0.0, self._latency()))
+
+        status_code, response_body, targets = self._respond(
+            request.command,
+            request.path,
+            request.headers.get('authorization'),
+            body,
+        )
+
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['status_codes'][status_code] += 1
+            if targets:
+                self._stats['publishes'] += 1
+                self._stats['targets'] += targets
+
+        encoded = json.dumps(response_body).encode('utf-8')
+        request.send_response(status_code)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(encoded)))
+        if status_code == 429:
+            request.send_header('Retry-After', str(self.retry_after))
+        request.end_headers()
+        request.wfile.write(encoded)
+
+    def _respond(  # pylint: disable=too-many-return-statements
+            self,
+            method,
+            path,
+            authorization,
+            body,
+    ):
+        """Returns (status code, response body, number of targets published
+        to)"""
+        publish_match = _PUBLISH_PATH.match(path)
+        delete_match = _DELETE_USER_PATH.match(path)
+        if publish_match and method == 'POST':
+            instance_id = publish_match.group(1)
+        elif delete_match and method == 'DELETE':
+            instance_id = delete_match.group(1)
+        else:
+            return 404, _error('Not found', 'Unknown endpoint'), 0
+
+        if self.instance_id is not None and instance_id != self.instance_id:
+            return 404, _error('Instance not found', 'Unknown instance id'), 0
+        if (self.secret_key is not None
+                and authorization != 'Bearer {}'.format(self.secret_key)):
+            return 401, _error('Unauthorized', 'Incorrect secret key'), 0
+
+        if self._rate_limiter is not None and not self._rate_limiter.try_acquire():
+            return 429, _error('Too many requests', 'Rate limit exceeded'), 0
+        if self._random_float() < self.too_many_requests_rate:
+            return 429, _error('Too many requests', 'Injected 429'), 0
+        if self._random_float() < self.error_rate:
+            return 500, _error('Internal server error', 'Injected error'), 0
+
+        if delete_match:
+            return 200, '', 0
+
+        key = publish_match.group(2)
+        try:
+            publish_body = json.loads(body.decode('utf-8'))
+        except ValueError:
+            return 400, _error('Invalid request', 'Body is not valid JSON'), 0
+        targets = (
+            publish_body.get(key) if isinstance(publish_body, dict) else None
+        )
+        if not isinstance(targets, list) or not targets:
+            return 400, _error(
+                'Invalid request',
+                'Publish must target at least one of {}'.format(key),
+            ), 0
+        if len(targets) > _MAX_TARGETS[key]:
+            return 400, _error(
+                'Invalid request',
+                'Publish can target at most {} {}'.format(_MAX_TARGETS[key], key),
+            ), 0
+
+        publish_id = 'pubid-{}'.format(next(self._publish_ids))
+        return 200, {'publishId': publish_id}, len(targets)
+
+
+def _error(error, description):
+    return {'error': error, 'description': description}
+
+
+def main(argv=None):
+    """Run a FakeBeamsServer until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--instance-id')
+    parser.add_argument('--secret-key')
+    parser.add_argument(
+        '--latency',
+        type=parse_latency,
+        help="e.g. 'fixed:10', 'uniform:5,20', 'exponential:10' or "
+        "'lognormal:10,0.5' (times in milliseconds)",
+    )
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--too-many-requests-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = FakeBeamsServer(
+        host=args.host,
+        port=args.port,
+        instance_id=args.instance_id,
+        secret_key=args.secret_key,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        too_many_requests_rate=args.too_many_requests_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print('Fake Beams server listening on {}'.format(server.endpoint))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Hooks for instrumenting requests to the Pusher Push Notifications service
+
+Pass RequestHooks to PushNotifications to be called as each request is sent::
+
+    class LogSlowRequests(RequestHooks):
+        def on_response(self, info):
+            if info.total > 1:
+                logger.warning('%s %s took %.2fs', info.method, info.path,
+                               info.total)
+
+    beams_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        hooks=[LogSlowRequests()],
+    )
+"""
+
+from ._compat import monotonic
+
+
+class RequestInfo(object):  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """Details of a request, passed to every hook
+
+    The same RequestInfo is passed to the hooks for every attempt of a
+    request, so the attempt details are updated as the request is retried.
+    Timings are in seconds, and are None when they could not be measured
+    (e.g. connect and ttfb with transports that do not report them).
+
+    Attributes:
+        method (string): the HTTP method
+        path (string): the API path template, e.g.
+            '/publish_api/v1/instances/{instance_id}/publishes/users'. Unlike
+            the url, it does not contain ids, so it can be used to group
+            requests by API.
+        url (string): the full URL
+        request_bytes (int): size of the request body
+        targets (int): number of interests or users targeted by a publish
+            (None for other requests)
+        attempt (int): number of the current attempt, starting at 1
+        queue_wait (float): time this attempt waited for the rate limiter
+        connect (float): time this attempt spent opening connections (0 if a
+            pooled connection was reused)
+        ttfb (float): time from sending this attempt until the response
+            headers were received
+        total (float): time taken by this attempt, from sending the request
+            until the response body was received (or the request failed),
+            not including queue_wait
+        elapsed (float): time since the first attempt was started, including
+            rate limiting and the delays between retries
+        status_code (int): status code of the response to this attempt
+        response_bytes (int): size of the response body
+        error (Exception): exception raised by this attempt, if it failed
+            without a response
+        context (dict): free for hooks to keep state in between calls (e.g.
+            a span started in on_request_start)
+    """
+
+    __slots__ = (
+        'method',
+        'path',
+        'url',
+        'request_bytes',
+        'targets',
+        'attempt',
+        'queue_wait',
+        'connect',
+        'ttfb',
+        'total',
+        'elapsed',
+        'status_code',
+        'response_bytes',
+        'error',
+        'context',
+        '_started',
+    )
+
+    def __init__(self, method, path, url, request_bytes, targets=None):
+        self.method = method
+        self.path = path
+        self.url = url
+        self.request_bytes = request_bytes
+        self.targets = targets
+        self.attempt = 0
+        self.queue_wait = None
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+        self.elapsed = None
+        self.status_code = None
+        self.response_bytes = None
+        self.error = None
+        self.context = {}
+        self._started = monotonic()
+
+    def _start_attempt(self, queue_wait):
+        self.attempt += 1
+        self.queue_wait = queue_wait
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+        self.status_code = None
+        self.response_bytes = None
+        self.error = None
+
+    def _finish_attempt(self, attempt_started, response=None, error=None):
+        now = monotonic()
+        self.total = now - attempt_started
+        self.elapsed = now - self._started
+        if response is not None:
+            self.status_code = response.status_code
+            self.response_bytes = len(response.body or b'')
+            self.connect = response.timings.get('connect')
+            self.ttfb = response.timings.get('ttfb')
+        self.error = error
+
+    def __repr__(self):
+        return 'RequestInfo({!r}, {!r}, attempt={!r})'.format(
+            self.method,
+            self.path,
+            self.attempt,
+        )
+
+
+class RequestHooks(object):
+    """Base class for request hooks. Override the methods for the events of
+    interest.
+
+    Hooks are called from the thread making the request, so they should be
+    quick and, if the client is shared between threads, thread safe.
+    Exceptions raised by hooks are reported as warnings rather than failing
+    the request.
+    """
+
+    def on_request_start(self, info):
+        """Called before each attempt of a request is sent, after waiting for
+        the rate limiter
+
+        Args:
+            info (RequestInfo): details of the request
+        """
+
+    def on_response(self, info):
+        """Called when a response is received, whatever its status
+
+        Args:
+            info (RequestInfo): details of the request, with the status,
+                response size and timings of the attempt
+        """
+
+    def on_retry(self, info, delay):
+        """Called when an attempt failed and will be retried
+
+        Args:
+            info (RequestInfo): details of the failed attempt
+            delay (float): seconds to wait before the next attempt
+        """
+
+    def on_error(self, info, error):
+        """Called when a request fails, either because the transport raised
+        an exception (after any retries) or because the response was an
+        error
+
+        Args:
+            info (RequestInfo): details of the request
+            error (Exception): the exception raised to the caller
+        """
@@ -0,0 +1,113 @@
+"""HTTP/2 transport for the Pusher Push Notifications service
+
+Requires httpx with HTTP/2 support (``pip install pusher_push_notifications[http2]``)
+"""
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+# Connection specific headers are not allowed in HTTP/2 requests
+_HOP_BY_HOP_HEADERS = frozenset([
+    'connection',
+    'keep-alive',
+    'proxy-connection',
+    'transfer-encoding',
+    'upgrade',
+])
+
+
+def _make_timeout(timeout):
+    """Convert a requests timeout (None, seconds or a (connect, read) tuple)
+    to an httpx timeout. Like requests, there is no timeout by default."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(None, connect=connect, read=read)
+    return httpx.Timeout(timeout)
+
+
+class HTTP2Adapter(requests.adapters.BaseAdapter):
+    """requests transport adapter that sends requests over HTTP/2
+
+    Concurrent requests to the same host are multiplexed as streams over a
+    single connection, rather than each needing a connection of their own.
+    The adapter is safe to share between threads.
+
+    TLS and proxy settings are taken from the environment when the adapter
+    is created, so the verify, cert and proxies arguments of each request
+    are ignored.
+
+    Args:
+        max_connections (int): maximum number of connections per adapter.
+            With HTTP/2 one connection per host is normally enough.
+        prior_knowledge (bool): if True, HTTP/2 is used without negotiating
+            it first. This is required for plain http:// servers (e.g. a
+            local test server). By default HTTP/2 is negotiated during the
+            TLS handshake, falling back to HTTP/1.1 if the server does not
+            support it.
+    """
+
+    def __init__(self, max_connections=None, prior_knowledge=False):
+        if httpx is None:
+            raise ImportError(
+                'HTTP/2 support requires httpx '
+                '(pip install pusher_push_notifications[http2])',
+            )
+        requests.adapters.BaseAdapter.__init__(self)
+        self._client = httpx.Client(
+            http1=not prior_knowledge,
+            http2=True,
+            limits=httpx.Limits(max_connections=max_connections),
+            timeout=httpx.Timeout(None),
+            trust_env=True,
+        )
+
+    # pylint: disable=arguments-differ,too-many-arguments
+    def send(
+            self,
+            request,
+            stream=False,
+            timeout=None,
+            verify=True,
+            cert=None,
+            proxies=None,
+    ):
+        try:
+            http2_response = self._client.request(
+                request.method,
+                request.url,
+                content=request.body,
+                headers=[
+                    (name, value)
+                    for name, value in request.headers.items()
+                    if name.lower() not in _HOP_BY_HOP_HEADERS
+                ],
+                timeout=_make_timeout(timeout),
+            )
+        except httpx.TimeoutException as e:
+            if isinstance(e, httpx.ConnectTimeout):
+                raise requests.exceptions.ConnectTimeout(e, request=request)
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = http2_response.status_code
+        response.reason = http2_response.reason_phrase
+        response.headers = requests.structures.CaseInsensitiveDict(
+            http2_response.headers.items(),
+        )
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers,
+        )
+        response._content = http2_response.content  # pylint: disable=protected-access
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,261 @@
+"""Metrics for requests to the Pusher Push Notifications service
+
+MetricsCollector is a RequestHooks that counts requests, errors, retries,
+publishes, recipients and bytes, and keeps a latency histogram per API, all
+labelled by path template. They can be exported in the Prometheus text
+format::
+
+    metrics = MetricsCollector()
+    beams_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        hooks=[metrics],
+    )
+    ...
+    print(metrics.to_prometheus())
+"""
+
+import bisect
+import threading
+
+from .hooks import RequestHooks
+
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+REQUESTS = 'pusher_beams_requests_total'
+REQUEST_ERRORS = 'pusher_beams_request_errors_total'
+RETRIES = 'pusher_beams_retries_total'
+PUBLISHES = 'pusher_beams_publishes_total'
+PUBLISH_RECIPIENTS = 'pusher_beams_publish_recipients_total'
+REQUEST_BYTES = 'pusher_beams_request_bytes_total'
+RESPONSE_BYTES = 'pusher_beams_response_bytes_total'
+REQUEST_DURATION = 'pusher_beams_request_duration_seconds'
+
+_COUNTERS = [
+    (REQUESTS, 'Requests that received a response, by status code'),
+    (REQUEST_ERRORS, 'Requests that failed, by exception class'),
+    (RETRIES, 'Request attempts that were retried'),
+    (PUBLISHES, 'Successful publishes'),
+    (PUBLISH_RECIPIENTS, 'Interests or users targeted by successful publishes'),
+    (REQUEST_BYTES, 'Request body bytes sent'),
+    (RESPONSE_BYTES, 'Response body bytes received'),
+]
+
+
+class _Shard(object):  # pylint: disable=too-few-public-methods
+    """The metrics recorded by one thread"""
+
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        # {(metric name, labels): value}
+        self.counters = {}
+        # {labels: [count per bucket..., sum]}
+        self.histograms = {}
+
+    def merge(self, other):
+        """Add the metrics of another shard to this one"""
+        counters = self.counters
+        # Copying is atomic, so the other shard's thread can keep recording
+        for key, value in list(dict(other.counters).items()):
+            counters[key] = counters.get(key, 0) + value
+        histograms = self.histograms
+        for labels, histogram in list(dict(other.histograms).items()):
+            total = histograms.get(labels)
+            if total is None:
+                histograms[labels] = list(histogram)
+            else:
+                histograms[labels] = [a + b for a, b in zip(total, histogram)]
+
+
+class MetricsCollector(RequestHooks):
+    """Collects metrics about the requests made by one or more clients
+
+    Every thread records into its own set of metrics, which are only combined
+    when they are read, so recording never waits for a lock. The metrics of
+    threads that have finished (e.g. the workers of a bulk publish) are
+    folded into a single set. Latencies are the total time of each attempt
+    (see RequestInfo.total).
+
+    Args:
+        buckets (tuple): upper bounds of the latency histogram buckets, in
+            seconds
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        if not buckets:
+            raise ValueError('buckets must not be empty')
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # [(thread, shard)] for the threads that may still be recording
+        self._shards = []
+        # The combined metrics of threads that have finished
+        self._retired = _Shard()
+
+    def _retire_finished_threads(self):
+        """Fold the shards of finished threads into the retired shard, so
+        that the number of shards only grows with the number of live threads.
+        Must be called with the lock held."""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._retired.merge(shard)
+        self._shards = live
+
+    def _shard(self):
+        local = self._local
+        shard = getattr(local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            with self._lock:
+                # Checked under the lock, as reset replaces the shards
+                if local is self._local:
+                    self._retire_finished_threads()
+                    self._shards.append((threading.current_thread(), shard))
+            local.shard = shard
+        return shard
+
+    @staticmethod
+    def _add(counters, name, labels, value):
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def on_response(self, info):
+        shard = self._shard()
+        counters = shard.counters
+        path = (('path', info.path),)
+        self._add(
+            counters,
+            REQUESTS,
+            path + (('status', str(info.status_code)),),
+            1,
+        )
+        self._add(counters, REQUEST_BYTES, path, info.request_bytes)
+        self._add(counters, RESPONSE_BYTES, path, info.response_bytes)
+        if info.status_code == 200 and info.targets is not None:
+            self._add(counters, PUBLISHES, path, 1)
+            self._add(counters, PUBLISH_RECIPIENTS, path, info.targets)
+
+        histogram = shard.histograms.get(path)
+        if histogram is None:
+            histogram = shard.histograms[path] = [0] * (len(self.buckets) + 2)
+        histogram[bisect.bisect_left(self.buckets, info.total)] += 1
+        histogram[-1] += info.total
+
+    def on_retry(self, info, delay):
+        self._add(self._shard().counters, RETRIES, (('path', info.path),), 1)
+
+    def on_error(self, info, error):
+        self._add(
+            self._shard().counters,
+            REQUEST_ERRORS,
+            (('path', info.path), ('error', type(error).__name__)),
+            1,
+        )
+
+    def snapshot(self):
+        """The current value of every metric
+
+        Returns:
+            A dict of {metric name: {labels: value}}, where labels is a tuple
+            of (label name, value) pairs. Counter values are numbers.
+            Histogram values are dicts with the bucket upper bounds
+            ('buckets'), the number of observations in each bucket
+            ('counts', with one more for observations above the last bucket),
+            their 'sum' and their 'count'.
+        """
+        total = _Shard()
+        with self._lock:
+            self._retire_finished_threads()
+            total.merge(self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            total.merge(shard)
+
+        counters = dict((name, {}) for name, _ in _COUNTERS)
+        for (name, labels), value in total.counters.items():
+            counters[name][labels] = value
+        counters[REQUEST_DURATION] = dict(
+            (labels, {
+                'buckets': self.buckets,
+                'counts': histogram[:-1],
+                'sum': histogram[-1],
+                'count': sum(histogram[:-1]),
+            })
+            for labels, histogram in total.histograms.items()
+        )
+        return counters
+
+    def reset(self):
+        """Set every metric back to zero"""
+        with self._lock:
+            self._local = threading.local()
+            self._shards = []
+            self._retired = _Shard()
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format
+
+        Returns:
+            A string, e.g. to serve from a /metrics endpoint
+        """
+        metrics = self.snapshot()
+        lines = []
+        for name, description in _COUNTERS:
+            lines.append('# HELP {} {}'.format(name, description))
+            lines.append('# TYPE {} counter'.format(name))
+            for labels, value in sorted(metrics[name].items()):
+                lines.append('{}{} {}'.format(
+                    name,
+                    _format_labels(labels),
+                    _format_value(value),
+                ))
+
+        lines.append(
+            '# HELP {} Duration of request attempts'.format(REQUEST_DURATION),
+        )
+        lines.append('# TYPE {} histogram'.format(REQUEST_DURATION))
+        for labels, histogram in sorted(metrics[REQUEST_DURATION].items()):
+            cumulative = 0
+            bounds = [_format_value(bucket) for bucket in self.buckets]
+            for bound, count in zip(bounds + ['+Inf'], histogram['counts']):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(
+                    REQUEST_DURATION,
+                    _format_labels(labels + (('le', bound),)),
+                    cumulative,
+                ))
+            lines.append('{}_sum{} {}'.format(
+                REQUEST_DURATION,
+                _format_labels(labels),
+                _format_value(histogram['sum']),
+            ))
+            lines.append('{}_count{} {}'.format(
+                REQUEST_DURATION,
+                _format_labels(labels),
+                histogram['count'],
+            ))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name,
+            value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'),
+        )
+        for name, value in labels
+    ) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
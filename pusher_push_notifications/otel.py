@@ -0,0 +1,98 @@
+"""OpenTelemetry tracing for the Pusher Push Notifications client
+
+Requires the OpenTelemetry API (``pip install pusher_push_notifications[otel]``)
+and an SDK configured by the application::
+
+    from pusher_push_notifications.otel import OpenTelemetryHooks
+
+    beams_client = PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        hooks=[OpenTelemetryHooks()],
+    )
+"""
+
+from . import SDK_VERSION
+from .hooks import RequestHooks
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+_SPAN_KEY = 'opentelemetry.span'
+
+
+class OpenTelemetryHooks(RequestHooks):
+    """Records a client span for every attempt of every request
+
+    Spans are named after the method and path template (e.g. 'POST
+    /publish_api/v1/instances/{instance_id}/publishes/users'), follow the
+    OpenTelemetry HTTP client conventions, and include the queue wait,
+    connect and time to first byte timings as pusher.* attributes. They are
+    children of the span that is current when the request is made.
+
+    Args:
+        tracer_provider (TracerProvider): provider of the tracer (defaults
+            to the global tracer provider)
+    """
+
+    def __init__(self, tracer_provider=None):
+        if trace is None:
+            raise ImportError(
+                'OpenTelemetry support requires opentelemetry-api '
+                '(pip install pusher_push_notifications[otel])',
+            )
+        self._tracer = trace.get_tracer(
+            'pusher_push_notifications',
+            SDK_VERSION,
+            tracer_provider=tracer_provider,
+        )
+
+    def on_request_start(self, info):
+        attributes = {
+            'http.request.method': info.method,
+            'url.full': info.url,
+            'url.template': info.path,
+            'http.request.body.size': info.request_bytes,
+            'pusher.queue_wait': info.queue_wait,
+        }
+        if info.attempt > 1:
+            attributes['http.request.resend_count'] = info.attempt - 1
+        info.context[_SPAN_KEY] = self._tracer.start_span(
+            '{} {}'.format(info.method, info.path),
+            kind=trace.SpanKind.CLIENT,
+            attributes=attributes,
+        )
+
+    def on_response(self, info):
+        span = info.context.pop(_SPAN_KEY, None)
+        if span is None:
+            return
+        span.set_attribute('http.response.status_code', info.status_code)
+        span.set_attribute('http.response.body.size', info.response_bytes)
+        for name in ('connect', 'ttfb'):
+            value = getattr(info, name)
+            if value is not None:
+                span.set_attribute('pusher.' + name, value)
+        if info.status_code >= 400:
+            span.set_attribute('error.type', str(info.status_code))
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end()
+
+    def on_retry(self, info, delay):
+        # Attempts that failed without a response are still open
+        self._end_with_error(info, info.error)
+
+    def on_error(self, info, error):
+        self._end_with_error(info, error)
+
+    @staticmethod
+    def _end_with_error(info, error):
+        span = info.context.pop(_SPAN_KEY, None)
+        if span is None:
+            return
+        span.record_exception(error)
+        span.set_attribute('error.type', type(error).__name__)
+        span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        span.end()
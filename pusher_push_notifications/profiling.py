@@ -0,0 +1,172 @@
+"""Per stage profiling of calls to the Pusher Push Notifications client
+
+With a StageProfiler, the client times each stage of publish_to_interests,
+publish_to_users and delete_user:
+
+- validate: validating the targets and publish body
+- copy: adding the targets to the publish body (or, for a PublishTemplate,
+  encoding them into the template)
+- encode: encoding the request body
+- build: building the request (URL and headers)
+- network: sending the request and receiving the response, including any
+  rate limiting and retries
+- decode: decoding the response
+- total: the whole call
+
+A stage is only recorded if it completes, so calls that raise an exception
+record only the stages before it. Profiling can be turned on and off at
+runtime by setting the client's profiler attribute::
+
+    beams_client.profiler = StageProfiler()
+    ...
+    beams_client.profiler.dump()
+"""
+
+import collections
+import math
+import sys
+import threading
+
+from ._compat import monotonic
+
+DEFAULT_MAX_SAMPLES = 10000
+
+
+class _Stopwatch(object):
+    """Times consecutive stages of one call"""
+
+    __slots__ = ('_profiler', '_operation', '_started', '_last')
+
+    def __init__(self, profiler, operation):
+        self._profiler = profiler
+        self._operation = operation
+        self._started = self._last = monotonic()
+
+    def lap(self, stage):
+        """Record the time since the previous stage ended as stage"""
+        now = monotonic()
+        self._profiler.record(self._operation, stage, now - self._last)
+        self._last = now
+
+    def stop(self):
+        """Record the time since the call started as the total"""
+        self._profiler.record(
+            self._operation,
+            'total',
+            monotonic() - self._started,
+        )
+
+
+class _Stage(object):  # pylint: disable=too-few-public-methods
+    __slots__ = ('count', 'total', 'samples')
+
+    def __init__(self, max_samples):
+        self.count = 0
+        self.total = 0.0
+        self.samples = collections.deque(maxlen=max_samples)
+
+
+def _percentile(sorted_samples, fraction):
+    """Nearest rank percentile of a sorted, non empty list"""
+    rank = int(math.ceil(fraction * len(sorted_samples)))
+    return sorted_samples[max(rank - 1, 0)]
+
+
+class StageProfiler(object):
+    """Aggregates the time spent in each stage of client calls
+
+    Counts and means cover every call since the profiler was created or
+    reset. Percentiles are computed from the most recent max_samples timings
+    of each stage, to bound memory use.
+
+    Args:
+        max_samples (int): number of timings kept per stage for percentiles
+    """
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        if max_samples < 1:
+            raise ValueError('max_samples must be at least 1')
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._stages = collections.OrderedDict()
+
+    def start(self, operation):
+        """Start timing a call
+
+        Args:
+            operation (string): name of the call, e.g. 'publish_to_users'
+
+        Returns:
+            A stopwatch, whose lap(stage) method records the time since the
+            previous lap, and whose stop() method records the total
+        """
+        return _Stopwatch(self, operation)
+
+    def record(self, operation, stage, seconds):
+        """Record the time taken by one stage of a call
+
+        Args:
+            operation (string): name of the call, e.g. 'publish_to_users'
+            stage (string): name of the stage, e.g. 'encode'
+            seconds (float): time taken
+        """
+        key = (operation, stage)
+        with self._lock:
+            stats = self._stages.get(key)
+            if stats is None:
+                stats = self._stages[key] = _Stage(self.max_samples)
+            stats.count += 1
+            stats.total += seconds
+            stats.samples.append(seconds)
+
+    def stats(self):
+        """The aggregated timings of every stage
+
+        Returns:
+            A dict of {(operation, stage): {'count', 'mean', 'p50', 'p99'}},
+            with times in seconds, in the order the stages were first
+            recorded
+        """
+        with self._lock:
+            stages = [
+                (key, stats.count, stats.total, list(stats.samples))
+                for key, stats in self._stages.items()
+            ]
+
+        result = collections.OrderedDict()
+        for key, count, total, samples in stages:
+            samples.sort()
+            result[key] = {
+                'count': count,
+                'mean': total / count,
+                'p50': _percentile(samples, 0.5),
+                'p99': _percentile(samples, 0.99),
+            }
+        return result
+
+    def dump(self, file=None):
+        """Write a table of the aggregated timings
+
+        Args:
+            file: file to write to (defaults to sys.stdout)
+        """
+        file = file if file is not None else sys.stdout
+        lines = ['{:<36} {:>8} {:>12} {:>12} {:>12}'.format(
+            'stage', 'count', 'mean', 'p50', 'p99',
+        )]
+        for (operation, stage), stats in self.stats().items():
+            lines.append(
+                '{:<36} {:>8} {:>10.1f}us {:>10.1f}us {:>10.1f}us'.format(
+                    '{}.{}'.format(operation, stage),
+                    stats['count'],
+                    stats['mean'] * 1e6,
+                    stats['p50'] * 1e6,
+                    stats['p99'] * 1e6,
+                ),
+            )
+        file.write('\n'.join(lines) + '\n')
+
+    def reset(self):
+        """Discard all recorded timings"""
+        with self._lock:
+            self._stages = collections.OrderedDict()
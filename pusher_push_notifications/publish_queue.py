@@ -0,0 +1,489 @@
+"""Background publishing for the Pusher Push Notifications service"""
+
+from concurrent import futures
+import collections
+import threading
+
+import six
+
+from pusher_push_notifications import (
+    DEFAULT_BULK_CONCURRENCY,
+    MAX_NUMBER_OF_USER_IDS,
+    InterestSet,
+    PublishTemplate,
+    PushNotifications,
+    PusherQueueFullError,
+    UserAudience,
+    _validate_concurrency,
+    _validate_interest_targets,
+    _validate_publish_body,
+    _validate_user_targets,
+)
+from pusher_push_notifications._compat import monotonic
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_COALESCE_WINDOW = 0.01
+
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP = 'drop'
+OVERFLOW_RAISE = 'raise'
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP, OVERFLOW_RAISE)
+
+
+def _wait_for(condition, predicate, timeout):
+    """Wait on condition (which must be held) until predicate() is true, or
+    the timeout expires. Returns the final value of predicate()."""
+    deadline = None if timeout is None else monotonic() + timeout
+    while not predicate():
+        if deadline is None:
+            condition.wait()
+        else:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return False
+            condition.wait(remaining)
+    return True
+
+
+def _unique(user_ids):
+    """The user ids without duplicates, in the order they were first seen"""
+    return list(collections.OrderedDict.fromkeys(user_ids))
+
+
+class PublishQueue(object):  # pylint: disable=too-many-instance-attributes
+    """Publishes in the background, so callers do not wait for the Push
+    Notifications service
+
+    Publishes are validated and encoded when they are added to the queue, so
+    invalid publishes still raise immediately, and later changes to the
+    publish body do not affect the publish. They are then sent by a pool of
+    worker threads, and each call returns a concurrent.futures.Future for
+    the publish response.
+
+    The queue holds at most maxsize publishes that are waiting or being
+    sent. When it is full, overflow decides what happens to a new publish:
+
+    - 'block': wait for space (at most block_timeout seconds, if set) and
+      raise PusherQueueFullError if none becomes available
+    - 'drop': discard the publish and return a future that fails with
+      PusherQueueFullError
+    - 'raise': raise PusherQueueFullError
+
+    The queue should be closed when it is no longer needed, with close() or
+    by using it as a context manager. Publishes already in the queue are
+    still sent.
+
+    Args:
+        client (PushNotifications): client used to send the publishes. Its
+            pool_maxsize should be at least workers, so that every worker
+            can reuse a connection.
+        maxsize (int): maximum number of publishes waiting or being sent
+        workers (int): number of worker threads sending publishes
+        overflow (string): 'block', 'drop' or 'raise'
+        block_timeout (float): with the 'block' policy, the maximum time in
+            seconds to wait for space (by default there is no limit)
+    """
+
+    def __init__(
+            self,
+            client,
+            maxsize=DEFAULT_QUEUE_SIZE,
+            workers=DEFAULT_BULK_CONCURRENCY,
+            overflow=OVERFLOW_BLOCK,
+            block_timeout=None,
+    ):
+        if not isinstance(client, PushNotifications):
+            raise TypeError('client must be a PushNotifications')
+        if not isinstance(maxsize, six.integer_types):
+            raise TypeError('maxsize must be an integer')
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        _validate_concurrency(workers, 'workers')
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                "overflow must be one of 'block', 'drop' or 'raise'",
+            )
+        if block_timeout is not None and block_timeout < 0:
+            raise ValueError('block_timeout must not be negative')
+
+        self.client = client
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._closed = False
+
+    def __len__(self):
+        """The number of publishes waiting or being sent"""
+        return self._pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def publish_to_interests(self, interests, publish_body):
+        """Queue a publish of publish_body to the specified interests.
+
+        See :func:`PushNotifications.publish_to_interests` for the arguments
+        and validation errors.
+
+        Returns:
+            A Future for the publish response
+
+        Raises:
+            PusherQueueFullError: if the queue is full (see overflow)
+            RuntimeError: if the queue is closed
+        """
+        _validate_interest_targets(interests)
+        _validate_publish_body(publish_body)
+        if not isinstance(interests, InterestSet):
+            # pylint: disable=protected-access
+            interests = InterestSet._from_validated(interests)
+        return self._submit(
+            self.client.publish_to_interests,
+            interests,
+            publish_body,
+        )
+
+    def publish_to_users(self, user_ids, publish_body):
+        """Queue a publish of publish_body to the specified users.
+
+        See :func:`PushNotifications.publish_to_users` for the arguments and
+        validation errors.
+
+        Returns:
+            A Future for the publish response
+
+        Raises:
+            PusherQueueFullError: if the queue is full (see overflow)
+            RuntimeError: if the queue is closed
+        """
+        _validate_user_targets(user_ids)
+        _validate_publish_body(publish_body)
+        if not isinstance(user_ids, UserAudience):
+            # pylint: disable=protected-access
+            user_ids = UserAudience._from_validated(user_ids)
+        return self._submit(self.client.publish_to_users, user_ids, publish_body)
+
+    def _submit(self, publish_method, targets, publish_body):
+        if not isinstance(publish_body, PublishTemplate):
+            # Encoding now catches bodies that cannot be encoded, and takes a
+            # snapshot of the body in case the caller modifies it later.
+            publish_body = PublishTemplate(publish_body, self.client.serializer)
+
+        with self._condition:
+            if not self._reserve():
+                self.dropped += 1
+                future = futures.Future()
+                future.set_exception(
+                    PusherQueueFullError('The publish queue is full'),
+                )
+                return future
+            try:
+                future = self._executor.submit(
+                    publish_method,
+                    targets,
+                    publish_body,
+                )
+            except BaseException:
+                self._release()
+                raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _reserve(self):
+        """Take a place in the queue, following the overflow policy.
+        Returns False if the publish should be dropped. Must be called with
+        the condition held."""
+        if self._closed:
+            raise RuntimeError('Cannot publish to a closed PublishQueue')
+        if self._pending >= self.maxsize:
+            if self.overflow == OVERFLOW_DROP:
+                return False
+            if self.overflow == OVERFLOW_RAISE:
+                raise PusherQueueFullError('The publish queue is full')
+            if not _wait_for(
+                    self._condition,
+                    lambda: self._closed or self._pending < self.maxsize,
+                    self.block_timeout,
+            ):
+                raise PusherQueueFullError(
+                    'Timed out waiting for space in the publish queue',
+                )
+            if self._closed:
+                raise RuntimeError('Cannot publish to a closed PublishQueue')
+        self._pending += 1
+        return True
+
+    def _release(self):
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify_all()
+
+    def _on_done(self, _future):
+        self._release()
+
+    def flush(self, timeout=None):
+        """Wait until every publish added so far has been sent.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds (by default
+                there is no limit)
+
+        Returns:
+            True if the queue is empty, False if the timeout expired first
+        """
+        with self._condition:
+            return _wait_for(
+                self._condition,
+                lambda: self._pending == 0,
+                timeout,
+            )
+
+    def close(self, wait=True):
+        """Stop accepting publishes and shut down the worker threads.
+
+        Publishes already in the queue are still sent.
+
+        Args:
+            wait (bool): if True, wait until they have been sent
+        """
+        with self._condition:
+            self._closed = True
+            # Wake callers blocked on a full queue, so that they fail
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+
+
+class _Batch(object):  # pylint: disable=too-few-public-methods
+    """Publishes of the same body waiting to be sent together"""
+
+    __slots__ = ('template', 'deadline', 'user_ids', 'publishes')
+
+    def __init__(self, template, deadline):
+        self.template = template
+        self.deadline = deadline
+        # The distinct user ids of all publishes in the batch
+        self.user_ids = set()
+        # (future, user ids) for each publish in the batch
+        self.publishes = []
+
+
+class PublishCoalescer(object):  # pylint: disable=too-many-instance-attributes
+    """Combines publishes of the same body to different users into a single
+    request
+
+    When many publish_to_users calls with the same publish body are made
+    within a short window of each other (e.g. one per user, all triggered by
+    the same event), sending each one separately wastes requests. A
+    PublishCoalescer holds each publish for up to window seconds, and sends
+    all publishes of the same body in that window as one publish to all of
+    their users, of up to max_batch_size users. Users targeted by more than
+    one publish in a batch are only sent the notification once. A batch is
+    sent early as soon as it is full.
+
+    Each call returns a concurrent.futures.Future for the response of the
+    combined publish, so every caller in a batch gets the same publishId.
+    Publishes are validated when they are added, and a publish whose future
+    is cancelled before its batch is sent is left out of the batch.
+
+    Publish bodies are the same if they encode to the same JSON, so bodies
+    that should be coalesced should be built the same way (or passed as the
+    same PublishTemplate).
+
+    The coalescer should be closed when it is no longer needed, with close()
+    or by using it as a context manager. Publishes already added are still
+    sent.
+
+    Args:
+        client (PushNotifications): client used to send the publishes
+        window (float): maximum time in seconds a publish waits for others
+            with the same body
+        max_batch_size (int): maximum number of user ids per request (at
+            most 1000)
+        workers (int): number of worker threads sending batches
+    """
+
+    def __init__(
+            self,
+            client,
+            window=DEFAULT_COALESCE_WINDOW,
+            max_batch_size=MAX_NUMBER_OF_USER_IDS,
+            workers=DEFAULT_BULK_CONCURRENCY,
+    ):
+        if not isinstance(client, PushNotifications):
+            raise TypeError('client must be a PushNotifications')
+        if window < 0:
+            raise ValueError('window must not be negative')
+        if not isinstance(max_batch_size, six.integer_types):
+            raise TypeError('max_batch_size must be an integer')
+        if not 1 <= max_batch_size <= MAX_NUMBER_OF_USER_IDS:
+            raise ValueError(
+                'max_batch_size must be between 1 and {}'.format(
+                    MAX_NUMBER_OF_USER_IDS,
+                ),
+            )
+        _validate_concurrency(workers, 'workers')
+
+        self.client = client
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self._condition = threading.Condition()
+        # Every batch has the same window, so the oldest batch (the first to
+        # be inserted) is always the next one due.
+        self._batches = collections.OrderedDict()
+        self._sending = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name='PublishCoalescer',
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def publish_to_users(self, user_ids, publish_body):
+        """Add a publish of publish_body to the specified users.
+
+        See :func:`PushNotifications.publish_to_users` for the arguments and
+        validation errors.
+
+        Returns:
+            A Future for the response of the publish the users were sent in
+
+        Raises:
+            RuntimeError: if the coalescer is closed
+            ValueError: if there are more distinct user ids than
+                max_batch_size, as they could not be sent in one publish
+        """
+        _validate_user_targets(user_ids)
+        _validate_publish_body(publish_body)
+        if not isinstance(publish_body, PublishTemplate):
+            publish_body = PublishTemplate(publish_body, self.client.serializer)
+        user_ids = _unique(user_ids)
+        if len(user_ids) > self.max_batch_size:
+            raise ValueError(
+                'Cannot coalesce a publish to more than max_batch_size ({}) '
+                'users'.format(self.max_batch_size),
+            )
+        future = futures.Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Cannot publish to a closed PublishCoalescer')
+            batch = self._batches.get(publish_body)
+            if batch is not None:
+                new_user_count = sum(
+                    1 for user_id in user_ids if user_id not in batch.user_ids
+                )
+                if len(batch.user_ids) + new_user_count > self.max_batch_size:
+                    self._send(self._batches.pop(publish_body))
+                    batch = None
+            if batch is None:
+                batch = _Batch(publish_body, monotonic() + self.window)
+                self._batches[publish_body] = batch
+                self._condition.notify_all()
+            batch.publishes.append((future, user_ids))
+            batch.user_ids.update(user_ids)
+            if len(batch.user_ids) >= self.max_batch_size:
+                self._send(self._batches.pop(publish_body))
+
+        return future
+
+    def _run(self):
+        """Send batches when their window closes"""
+        with self._condition:
+            while not self._closed:
+                if not self._batches:
+                    self._condition.wait()
+                    continue
+                batch = next(iter(self._batches.values()))
+                remaining = batch.deadline - monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._send(self._batches.pop(batch.template))
+
+    def _send(self, batch):
+        """Must be called with the condition held"""
+        self._sending += 1
+        self._executor.submit(self._publish_batch, batch)
+
+    def _publish_batch(self, batch):
+        try:
+            publishes = [
+                (future, user_ids)
+                for future, user_ids in batch.publishes
+                if future.set_running_or_notify_cancel()
+            ]
+            if not publishes:
+                return
+            # pylint: disable=protected-access
+            audience = UserAudience._from_validated(_unique(
+                user_id
+                for _, user_ids in publishes
+                for user_id in user_ids
+            ))
+            try:
+                response = self.client.publish_to_users(
+                    audience,
+                    batch.template,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                for future, _ in publishes:
+                    future.set_exception(e)
+            else:
+                for future, _ in publishes:
+                    future.set_result(response)
+        finally:
+            with self._condition:
+                self._sending -= 1
+                self._condition.notify_all()
+
+    def _send_all(self):
+        """Must be called with the condition held"""
+        while self._batches:
+            self._send(self._batches.popitem(last=False)[1])
+
+    def flush(self, timeout=None):
+        """Send all waiting publishes now, and wait until they have been sent.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds (by default
+                there is no limit)
+
+        Returns:
+            True if everything was sent, False if the timeout expired first
+        """
+        with self._condition:
+            self._send_all()
+            return _wait_for(
+                self._condition,
+                lambda: self._sending == 0,
+                timeout,
+            )
+
+    def close(self, wait=True):
+        """Stop accepting publishes, send all waiting publishes now and shut
+        down the worker threads.
+
+        Args:
+            wait (bool): if True, wait until the publishes have been sent
+        """
+        with self._condition:
+            self._closed = True
+            self._send_all()
+            self._condition.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=wait)
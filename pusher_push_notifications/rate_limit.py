@@ -0,0 +1,170 @@
+"""Client side rate limiting for requests to the Pusher Push Notifications
+service"""
+
+import os
+import struct
+import threading
+import time
+
+import six
+
+from ._compat import monotonic
+
+# Bucket state stored in FileTokenBucket files: tokens, last update time
+_FILE_STATE = struct.Struct('<dd')
+
+
+class TokenBucket(object):
+    """Token bucket rate limiter, shared between threads
+
+    The bucket holds up to capacity tokens and is refilled at rate tokens per
+    second. Every request takes a token, waiting for one to become available
+    if the bucket is empty. This smooths the request rate to at most rate
+    requests per second, with bursts of up to capacity requests.
+
+    Args:
+        rate (float): tokens added per second
+        capacity (float): maximum number of tokens in the bucket (defaults
+            to rate, i.e. a one second burst)
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+        if capacity is None:
+            capacity = rate
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = self._now()
+
+    def _now(self):
+        return monotonic()
+
+    def _refill_and_take(self, tokens, stored_tokens, updated_at, now):
+        """Returns (new token count, seconds to wait). Tokens are only taken
+        if no wait is required."""
+        available = min(
+            self.capacity,
+            stored_tokens + max(0.0, now - updated_at) * self.rate,
+        )
+        if available >= tokens:
+            return available - tokens, 0.0
+        return available, (tokens - available) / self.rate
+
+    def _take(self, tokens):
+        with self._lock:
+            now = self._now()
+            self._tokens, wait = self._refill_and_take(
+                tokens,
+                self._tokens,
+                self._updated_at,
+                now,
+            )
+            self._updated_at = now
+            return wait
+
+    def try_acquire(self, tokens=1):
+        """Take tokens from the bucket without waiting.
+
+        Returns:
+            True if the tokens were taken, False if there were not enough
+        """
+        return self._take(tokens) == 0
+
+    def acquire(self, tokens=1):
+        """Take tokens from the bucket, waiting until enough are available.
+
+        Returns:
+            The time spent waiting, in seconds
+        """
+        if tokens > self.capacity:
+            raise ValueError('Cannot acquire more tokens than the capacity')
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if wait == 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket rate limiter, shared between processes
+
+    The bucket state is kept in a small file, guarded by an advisory lock, so
+    every process (e.g. pre-forked web workers) that creates a FileTokenBucket
+    with the same path draws from the same budget. Only available on
+    platforms that support fcntl (i.e. not Windows).
+
+    Args:
+        path (string): path of the file holding the bucket state. It is
+            created if it does not exist.
+        rate (float): tokens added per second
+        capacity (float): maximum number of tokens in the bucket (defaults
+            to rate, i.e. a one second burst)
+    """
+
+    def __init__(self, path, rate, capacity=None):
+        try:
+            import fcntl  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            six.raise_from(
+                NotImplementedError(
+                    'FileTokenBucket is not supported on this platform',
+                ),
+                e,
+            )
+        self._fcntl = fcntl
+        self.path = path
+        self._file = None
+        self._pid = None
+        TokenBucket.__init__(self, rate, capacity)
+
+    def _now(self):
+        # Must be comparable between processes
+        return time.time()
+
+    def _get_file(self):
+        # File locks are shared by all processes that inherit the same open
+        # file, so forked processes must open the file again.
+        if self._file is None or self._pid != os.getpid():
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._file = os.fdopen(fd, 'r+b', 0)
+            self._pid = os.getpid()
+        return self._file
+
+    def _take(self, tokens):
+        with self._lock:
+            state_file = self._get_file()
+            self._fcntl.flock(state_file.fileno(), self._fcntl.LOCK_EX)
+            try:
+                now = self._now()
+                state_file.seek(0)
+                state = state_file.read(_FILE_STATE.size)
+                if len(state) == _FILE_STATE.size:
+                    stored_tokens, updated_at = _FILE_STATE.unpack(state)
+                else:
+                    stored_tokens, updated_at = self.capacity, now
+                new_tokens, wait = self._refill_and_take(
+                    tokens,
+                    stored_tokens,
+                    updated_at,
+                    now,
+                )
+                state_file.seek(0)
+                state_file.write(_FILE_STATE.pack(new_tokens, now))
+                return wait
+            finally:
+                self._fcntl.flock(state_file.fileno(), self._fcntl.LOCK_UN)
+
+    def close(self):
+        """Close the state file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
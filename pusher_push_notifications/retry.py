@@ -0,0 +1,160 @@
+"""Retry policy for requests to the Pusher Push Notifications service"""
+
+import calendar
+import email.utils
+import random
+import time
+
+import six
+
+from ._compat import monotonic
+
+DEFAULT_RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+def parse_retry_after(value):
+    """Parse the value of a Retry-After header.
+
+    Args:
+        value (string): header value, either a number of seconds or an
+            HTTP date
+
+    Returns:
+        The number of seconds to wait (float), or None if the value is
+        missing or cannot be parsed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    if parsed[9] is None:
+        # Dates without a timezone are GMT in HTTP
+        parsed = parsed[:9] + (0,)
+    return max(0.0, email.utils.mktime_tz(parsed) - calendar.timegm(time.gmtime()))
+
+
+class RetryPolicy(object):
+    """Policy for retrying failed requests with exponential backoff
+
+    Delays use "full jitter": the n-th retry waits a random time between zero
+    and min(backoff_max, backoff_base * 2 ** n) seconds, so that many clients
+    failing at the same moment do not retry in lockstep. If the server sends a
+    Retry-After header the delay is at least that long.
+
+    Each call gets its own budget: a request is not retried if doing so would
+    take the total time spent on the call over retry_budget seconds.
+
+    Note that a publish which fails with a connection error or a 5xx may
+    still have been delivered, so retrying publishes can occasionally result
+    in duplicate notifications.
+
+    Args:
+        max_retries (int): maximum number of retries per call
+        backoff_base (float): base delay in seconds
+        backoff_max (float): maximum delay in seconds between two attempts
+        retry_budget (float): maximum total time in seconds a call may take
+            when retrying
+        retry_statuses (iterable): HTTP status codes that should be retried
+        retry_connection_errors (bool): whether connection errors and
+            timeouts should be retried
+        respect_retry_after (bool): whether to honor Retry-After headers
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            max_retries=3,
+            backoff_base=0.1,
+            backoff_max=10.0,
+            retry_budget=30.0,
+            retry_statuses=DEFAULT_RETRY_STATUSES,
+            retry_connection_errors=True,
+            respect_retry_after=True,
+    ):
+        if not isinstance(max_retries, six.integer_types):
+            raise TypeError('max_retries must be an integer')
+        if max_retries < 0:
+            raise ValueError('max_retries cannot be negative')
+        if backoff_base < 0 or backoff_max < 0:
+            raise ValueError('backoff delays cannot be negative')
+        if retry_budget < 0:
+            raise ValueError('retry_budget cannot be negative')
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.respect_retry_after = respect_retry_after
+
+    def backoff(self, retry_number):
+        """Random full jitter delay in seconds before the given retry
+        (counting from zero)"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** retry_number))
+        return random.uniform(0, ceiling)
+
+    def new_call(self):
+        """Start tracking the retries of a single call"""
+        return RetryState(self)
+
+
+class RetryState(object):
+    """Retry bookkeeping for a single call made under a RetryPolicy"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.retries = 0
+        self._started_at = monotonic()
+
+    def delay_after(self, response=None):
+        """Decide whether to retry after an attempt. This does no IO, so
+        the synchronous and asyncio clients both use it.
+
+        Args:
+            response (transport.Response): the response to the attempt, or
+                None if it failed with a connection error or timeout
+
+        Returns:
+            The delay in seconds before retrying, or None if the response
+            should be returned (or the error raised)
+        """
+        policy = self.policy
+        if response is None:
+            if not policy.retry_connection_errors:
+                return None
+            return self.next_delay()
+        if response.status_code not in policy.retry_statuses:
+            return None
+        return self.next_delay(
+            retry_after=parse_retry_after(response.headers.get('retry-after')),
+        )
+
+    def next_delay(self, retry_after=None):
+        """Work out how long to wait before retrying.
+
+        Args:
+            retry_after (float): delay requested by the server, if any
+
+        Returns:
+            The delay in seconds, or None if the call should not be retried
+        """
+        policy = self.policy
+        if self.retries >= policy.max_retries:
+            return None
+
+        delay = policy.backoff(self.retries)
+        if retry_after is not None and policy.respect_retry_after:
+            delay = max(delay, retry_after)
+
+        elapsed = monotonic() - self._started_at
+        if elapsed + delay > policy.retry_budget:
+            return None
+
+        self.retries += 1
+        return delay
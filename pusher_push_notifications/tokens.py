@@ -0,0 +1,137 @@
+"""Helpers for generating Beams auth tokens"""
+
+import base64
+import collections
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import six
+
+# Header used by PyJWT 2 for HS256 tokens (compact JSON, sorted keys)
+_TOKEN_HEADER = b'{"alg":"HS256","typ":"JWT"}'
+
+
+class TokenCache(object):
+    """Bounded, thread safe LRU cache of auth tokens
+
+    A cached token is returned until less than refresh_threshold seconds
+    remain before its expiry (the exp claim, compared with the system clock),
+    after which a new token should be generated.
+
+    Args:
+        maxsize (int): maximum number of tokens to keep. The least recently
+            used token is evicted when the cache is full.
+        refresh_threshold (float): minimum remaining lifetime in seconds for
+            a cached token to be returned
+    """
+
+    def __init__(self, maxsize, refresh_threshold):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        if refresh_threshold < 0:
+            raise ValueError('refresh_threshold must not be negative')
+
+        self.maxsize = maxsize
+        self.refresh_threshold = refresh_threshold
+        self._lock = threading.Lock()
+        self._tokens = collections.OrderedDict()
+
+    def get(self, key):
+        """Return the cached token for key, or None if there is no token with
+        enough lifetime remaining"""
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+            token, expiry = entry
+            if expiry - time.time() < self.refresh_threshold:
+                del self._tokens[key]
+                return None
+            # Move to the most recently used end
+            del self._tokens[key]
+            self._tokens[key] = entry
+            return token
+
+    def put(self, key, token, expiry):
+        """Cache a newly generated token for key
+
+        Args:
+            key (string): the key (e.g. the user id)
+            token (string): the token
+            expiry (int): the exp claim of the token (a unix timestamp)
+        """
+        with self._lock:
+            self._tokens.pop(key, None)
+            self._tokens[key] = (token, expiry)
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached tokens"""
+        with self._lock:
+            self._tokens.clear()
+
+    def __len__(self):
+        return len(self._tokens)
+
+
+def _base64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+class HS256Signer(object):  # pylint: disable=too-few-public-methods
+    """Fast signer for Beams auth tokens (HS256 JSON Web Tokens)
+
+    Everything that is the same for every token is computed once: the HMAC
+    key state, the encoded header and the claims up to the subject. Only the
+    subject and expiry are encoded per token. Tokens are byte-for-byte
+    identical to those produced by PyJWT 2 for the claims
+    {"iss": issuer, "sub": subject, "exp": expiry}.
+
+    Args:
+        secret_key (string): key used to sign tokens
+        issuer (string): value of the iss claim
+    """
+
+    def __init__(self, secret_key, issuer):
+        self._hmac = hmac.new(
+            six.ensure_binary(secret_key),
+            digestmod=hashlib.sha256,
+        )
+        self._header = _base64url_encode(_TOKEN_HEADER) + b'.'
+        self._claims_prefix = '{{"iss":{},"sub":'.format(json.dumps(issuer))
+
+    def sign(self, subject, expiry):
+        """Generate a token
+
+        Args:
+            subject (string): value of the sub claim (the user id)
+            expiry (int): value of the exp claim (a unix timestamp)
+
+        Returns:
+            The token (string)
+        """
+        claims = '{}{},"exp":{}}}'.format(
+            self._claims_prefix,
+            json.dumps(subject),
+            expiry,
+        )
+        signing_input = self._header + _base64url_encode(claims.encode('utf-8'))
+
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        signature = _base64url_encode(mac.digest())
+
+        return (signing_input + b'.' + signature).decode('ascii')
+
+
+def sign_tokens(secret_key, issuer, expiry, subjects):
+    """Sign a token for each subject, all with the same expiry.
+
+    Module level so that it can be run in a process pool.
+    """
+    signer = HS256Signer(secret_key, issuer)
+    return [signer.sign(subject, expiry) for subject in subjects]
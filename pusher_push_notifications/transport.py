@@ -0,0 +1,282 @@
+"""Transports for sending requests to the Pusher Push Notifications service
+
+The clients build every request and interpret every response themselves, so a
+transport only has to send a Request and return the Response. Any object
+implementing the Transport interface can be passed to PushNotifications, e.g.
+to use another HTTP library, or InMemoryTransport to run code that publishes
+without any network I/O.
+"""
+
+import os
+import threading
+
+import requests
+import urllib3
+
+from ._compat import monotonic
+
+
+class Request(object):  # pylint: disable=too-few-public-methods
+    """An HTTP request to send
+
+    Attributes:
+        method (string): the HTTP method
+        url (string): the full URL
+        headers (dict): the request headers
+        body (bytes): the encoded request body, or None
+    """
+
+    __slots__ = ('method', 'url', 'headers', 'body')
+
+    def __init__(self, method, url, headers, body=None):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+    def __repr__(self):
+        return 'Request({!r}, {!r})'.format(self.method, self.url)
+
+
+class Response(object):  # pylint: disable=too-few-public-methods
+    """An HTTP response received by a transport
+
+    Attributes:
+        status_code (int): the HTTP status code
+        headers (dict): the response headers. Must support lookups by lower
+            case name (e.g. a dict with lower case keys).
+        body (bytes): the raw response body
+        timings (dict): optional timings measured by the transport, in
+            seconds: 'connect' (time spent opening connections, 0 if a
+            pooled connection was reused) and 'ttfb' (time from sending the
+            request until the response headers were received)
+    """
+
+    __slots__ = ('status_code', 'headers', 'body', 'timings')
+
+    def __init__(self, status_code, headers=None, body=b'', timings=None):
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {}
+        self.body = body
+        self.timings = timings if timings is not None else {}
+
+    def __repr__(self):
+        return 'Response({!r})'.format(self.status_code)
+
+
+class Transport(object):
+    """Base class for transports
+
+    Transports must be safe to use from several threads at once. They are
+    synchronous (send blocks until the response is received), so they are
+    only used by PushNotifications: AsyncPushNotifications sends its requests
+    with aiohttp.
+
+    Attributes:
+        retryable_errors (tuple): exception types raised by send that may
+            succeed if the request is retried (e.g. connection errors). These
+            are retried by the client's retry policy.
+    """
+
+    retryable_errors = ()
+
+    def send(self, request):
+        """Send a request
+
+        Args:
+            request (Request): the request to send
+
+        Returns:
+            The Response
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """Release any resources (e.g. connections) held by the transport"""
+
+
+def _get_proxies_from_env():
+    return {
+        'http': os.environ.get('HTTP_PROXY') or os.environ.get('http_proxy'),
+        'https': os.environ.get('HTTPS_PROXY') or os.environ.get('https_proxy'),
+    }
+
+
+# Time spent connecting by the current thread, see _timed_connection
+_connect_times = threading.local()
+
+
+def _timed_connection(connection_class):
+    """Subclass of a urllib3 connection class that adds the time spent
+    connecting (including any TLS handshake) to _connect_times.total"""
+
+    class TimedConnection(connection_class):  # pylint: disable=too-few-public-methods
+        """Connection that records the time it spends connecting"""
+
+        def connect(self):
+            """Connect, adding the time taken to _connect_times.total"""
+            start = monotonic()
+            try:
+                connection_class.connect(self)
+            finally:
+                _connect_times.total = (
+                    getattr(_connect_times, 'total', 0.0)
+                    + monotonic()
+                    - start
+                )
+
+    return TimedConnection
+
+
+class _TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _timed_connection(urllib3.connection.HTTPConnection)
+
+
+class _TimedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _timed_connection(urllib3.connection.HTTPSConnection)
+
+
+def _origin(url):
+    """The scheme and host of a URL, e.g. 'https://example.com'"""
+    end = url.find('/', url.find('//') + 2)
+    return url if end == -1 else url[:end]
+
+
+class RequestsTransport(Transport):
+    """Transport using requests (the default)
+
+    Each thread gets its own requests session, and all of them share one
+    transport adapter (and so one connection pool). Alternatively, a session
+    can be assigned to the session attribute, which is then used by every
+    thread.
+
+    Responses include the time to first byte and, with the default
+    HTTPAdapter, the time spent connecting (which is not measured for
+    connections through a proxy).
+
+    Args:
+        adapter (requests.adapters.BaseAdapter): adapter used to send
+            requests (defaults to a requests.adapters.HTTPAdapter)
+    """
+
+    retryable_errors = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+    )
+
+    def __init__(self, adapter=None):
+        # requests sessions are not guaranteed to be thread safe, but the
+        # urllib3 pool manager underneath the adapter is. Sharing one adapter
+        # between per-thread sessions lets every thread reuse the same
+        # connections.
+        self.adapter = adapter or requests.adapters.HTTPAdapter()
+        self._thread_local = threading.local()
+        self._shared_session = None
+        self._proxies = {}
+        self._times_connections = isinstance(
+            self.adapter,
+            requests.adapters.HTTPAdapter,
+        )
+        if self._times_connections:
+            self.adapter.poolmanager.pool_classes_by_scheme = {
+                'http': _TimedHTTPConnectionPool,
+                'https': _TimedHTTPSConnectionPool,
+            }
+
+    @property
+    def session(self):
+        """The requests session used by the current thread"""
+        if self._shared_session is not None:
+            return self._shared_session
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            # We've had multiple support requests about this library not
+            # working on PythonAnywhere (a popular python deployment platform)
+            # They require that proxy servers be loaded from the environment
+            # when making requests (on their free plan).
+            # This reintroduces the proxy support that is the default in
+            # requests anyway.
+            session.proxies = _get_proxies_from_env()
+            self._thread_local.session = session
+        return session
+
+    @session.setter
+    def session(self, session):
+        """Use the given session from every thread, instead of a session per
+        thread"""
+        self._shared_session = session
+        # Proxies depend on the session's settings
+        self._proxies = {}
+
+    def _proxies_for(self, url):
+        # Resolving proxies scans the whole environment, which can take
+        # longer than everything else involved in sending a request. They
+        # only depend on the host, so they are resolved once per host.
+        origin = _origin(url)
+        proxies = self._proxies.get(origin)
+        if proxies is None:
+            proxies = self.session.merge_environment_settings(
+                url, {}, None, None, None,
+            )['proxies']
+            self._proxies[origin] = proxies
+        return proxies
+
+    def send(self, request):
+        # The request is built from known good parts, so it is prepared
+        # directly rather than with requests.Request.prepare, which parses and
+        # re-encodes all of them.
+        prepared_request = requests.PreparedRequest()
+        prepared_request.method = request.method
+        prepared_request.url = request.url
+        prepared_request.headers = requests.structures.CaseInsensitiveDict(
+            request.headers,
+        )
+        prepared_request.body = request.body
+
+        if self._times_connections:
+            _connect_times.total = 0.0
+        response = self.session.send(
+            prepared_request,
+            proxies=self._proxies_for(request.url),
+        )
+        # requests stops timing when the headers have been received
+        timings = {'ttfb': response.elapsed.total_seconds()}
+        if self._times_connections:
+            timings['connect'] = _connect_times.total
+        return Response(
+            response.status_code,
+            response.headers,
+            response.content,
+            timings,
+        )
+
+    def close(self):
+        self.adapter.close()
+
+
+def _publish_response(request):  # pylint: disable=unused-argument
+    return Response(
+        200,
+        {'content-type': 'application/json'},
+        b'{"publishId":"pubid-in-memory"}',
+    )
+
+
+class InMemoryTransport(Transport):
+    """Transport that answers requests in process, without any network I/O
+
+    Useful for tests, benchmarks and load tests of code that uses the client.
+
+    Args:
+        handler (callable): called with each Request, returning the Response.
+            By default every request succeeds with a publish response.
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler or _publish_response
+
+    def send(self, request):
+        return self.handler(request)
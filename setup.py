@@ -36,9 +36,14 @@ setup(
     description='Pusher Push Notifications Python server SDK',
     include_package_data=True,
     install_requires=install_requires,
+    extras_require={
+        'async': ['aiohttp>=3.6,<4; python_version >= "3.5"'],
+        'http2': ['httpx[http2]>=0.18,<1; python_version >= "3.6"'],
+        'otel': ['opentelemetry-api>=1.0,<2; python_version >= "3.6"'],
+    },
     python_requires=">=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*",
     long_description=long_description,
     name='pusher_push_notifications',
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['tests', 'benchmarks']),
     version=__version__,
 )
@@ -0,0 +1,236 @@
+"""Unit tests for the asyncio client
+
+Run through test_aio, as this module can only be imported on Python 3.5+
+"""
+
+import asyncio
+import json
+import unittest
+
+from pusher_push_notifications import (
+    OrjsonSerializer,
+    RetryPolicy,
+    PusherAuthError,
+    PusherBadResponseError,
+    PusherServerError,
+    PusherValidationError,
+)
+from pusher_push_notifications.aio import AsyncPushNotifications
+
+
+class FakeResponse(object):
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def read(self):
+        return self._body
+
+
+class FakeSession(object):
+    def __init__(self, status=200, body=b'{"publishId": "1234"}', responses=None):
+        self.status = status
+        self.body = body
+        self.responses = list(responses or [])
+        self.request_history = []
+        self.closed = False
+
+    def request(self, method, url, data=None, headers=None):
+        self.request_history.append({
+            'method': method,
+            'url': url,
+            'data': data,
+            'headers': headers,
+        })
+        if self.responses:
+            return self.responses.pop(0)
+        return FakeResponse(self.status, self.body)
+
+    async def close(self):
+        self.closed = True
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+class TestAsyncPushNotifications(unittest.TestCase):
+    def test_constructor_should_validate_params(self):
+        with self.assertRaises(TypeError) as e:
+            AsyncPushNotifications(instance_id=False, secret_key='1234')
+        self.assertIn('instance_id must be a string', str(e.exception))
+
+    def test_constructor_should_validate_connection_limit(self):
+        with self.assertRaises(TypeError):
+            AsyncPushNotifications('INSTANCE_ID', '1234', connection_limit='1')
+        with self.assertRaises(ValueError):
+            AsyncPushNotifications('INSTANCE_ID', '1234', connection_limit=-1)
+
+    def test_publish_to_interests_should_make_correct_http_request(self):
+        session = FakeSession()
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=session,
+        )
+        publish_body = {'apns': {'aps': {'alert': 'Hello World!'}}}
+
+        response = run(pn_client.publish_to_interests(
+            interests=['donuts'],
+            publish_body=publish_body,
+        ))
+
+        req = session.request_history[0]
+        self.assertEqual(req['method'], 'POST')
+        self.assertEqual(
+            req['url'],
+            'https://instance_id.pushnotifications.pusher.com'
+            '/publish_api/v1/instances/INSTANCE_ID/publishes/interests',
+        )
+        self.assertEqual(req['headers']['authorization'], 'Bearer SECRET_KEY')
+        self.assertEqual(req['headers']['content-type'], 'application/json')
+        self.assertDictEqual(
+            json.loads(req['data'].decode('utf-8')),
+            {
+                'interests': ['donuts'],
+                'apns': {'aps': {'alert': 'Hello World!'}},
+            },
+        )
+        self.assertDictEqual(response, {'publishId': '1234'})
+        self.assertNotIn('interests', publish_body)
+
+    def test_publish_to_users_should_make_correct_http_request(self):
+        session = FakeSession()
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=session,
+        )
+
+        response = run(pn_client.publish_to_users(
+            user_ids=['alice'],
+            publish_body={'apns': {'aps': {'alert': 'Hello World!'}}},
+        ))
+
+        req = session.request_history[0]
+        self.assertTrue(req['url'].endswith('/publishes/users'))
+        self.assertEqual(
+            json.loads(req['data'].decode('utf-8'))['users'],
+            ['alice'],
+        )
+        self.assertDictEqual(response, {'publishId': '1234'})
+
+    def test_should_use_serializer(self):
+        session = FakeSession()
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=session,
+            serializer=OrjsonSerializer(),
+        )
+
+        response = run(pn_client.publish_to_users(
+            user_ids=['alice'],
+            publish_body={'apns': {'aps': {'alert': 'Hello World!'}}},
+        ))
+
+        req = session.request_history[0]
+        self.assertEqual(
+            req['data'],
+            b'{"apns":{"aps":{"alert":"Hello World!"}},"users":["alice"]}',
+        )
+        self.assertDictEqual(response, {'publishId': '1234'})
+
+    def test_publish_to_users_should_validate_like_sync_client(self):
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=FakeSession(),
+        )
+        with self.assertRaises(ValueError) as e:
+            run(pn_client.publish_to_users(
+                user_ids=['user-' + str(i) for i in range(0, 1001)],
+                publish_body={},
+            ))
+        self.assertIn(
+            'Number of user ids (1001) exceeds maximum',
+            str(e.exception),
+        )
+
+    def test_delete_user_should_make_correct_http_request(self):
+        session = FakeSession(body=b'')
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=session,
+        )
+
+        run(pn_client.delete_user('alice'))
+
+        req = session.request_history[0]
+        self.assertEqual(req['method'], 'DELETE')
+        self.assertTrue(
+            req['url'].endswith('/customer_api/v1/instances/INSTANCE_ID/users/alice'),
+        )
+        self.assertIsNone(req['data'])
+
+    def test_should_map_http_errors(self):
+        cases = [
+            (400, PusherValidationError),
+            (401, PusherAuthError),
+            (500, PusherServerError),
+        ]
+        for status, error_class in cases:
+            pn_client = AsyncPushNotifications(
+                'INSTANCE_ID',
+                'SECRET_KEY',
+                session=FakeSession(
+                    status=status,
+                    body=b'{"error": "Oh no", "description": "blah"}',
+                ),
+            )
+            with self.assertRaises(error_class) as e:
+                run(pn_client.delete_user('alice'))
+            self.assertIn('Oh no: blah', str(e.exception))
+
+    def test_publish_should_handle_not_json_success(self):
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=FakeSession(body=b'<notjson></notjson>'),
+        )
+        with self.assertRaises(PusherBadResponseError):
+            run(pn_client.publish_to_users(['alice'], {}))
+
+    def test_close_should_not_close_session_passed_in(self):
+        session = FakeSession()
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=session,
+        )
+        run(pn_client.close())
+        self.assertFalse(session.closed)
+
+    def test_should_retry_with_retry_policy(self):
+        session = FakeSession(responses=[
+            FakeResponse(503, b'', headers={'retry-after': '0'}),
+        ])
+        pn_client = AsyncPushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            session=session,
+            retry_policy=RetryPolicy(backoff_base=0),
+        )
+
+        response = run(pn_client.publish_to_users(['alice'], {}))
+
+        self.assertEqual(len(session.request_history), 2)
+        self.assertDictEqual(response, {'publishId': '1234'})
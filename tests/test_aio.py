@@ -0,0 +1,10 @@
+"""Unit tests for the asyncio client
+
+The tests are in aio_cases, which uses async syntax, so that test runners on
+Python 2 can still import this module.
+"""
+
+import sys
+
+if sys.version_info >= (3, 5):
+    from aio_cases import TestAsyncPushNotifications  # pylint: disable=unused-import
@@ -0,0 +1,152 @@
+"""Unit tests for pre-validated audiences"""
+
+import unittest
+
+import requests_mock
+
+from pusher_push_notifications import (
+    InterestSet,
+    PublishTemplate,
+    PushNotifications,
+    UserAudience,
+)
+
+
+class TestAudiences(unittest.TestCase):
+    def test_interest_set_should_validate_on_creation(self):
+        with self.assertRaises(ValueError) as e:
+            InterestSet(['donuts', 'bad|interest'])
+        self.assertIn('contains a forbidden character', str(e.exception))
+
+    def test_interest_set_should_fail_if_empty(self):
+        with self.assertRaises(ValueError) as e:
+            InterestSet([])
+        self.assertIn('must target at least one interest', str(e.exception))
+
+    def test_user_audience_should_validate_on_creation(self):
+        with self.assertRaises(TypeError) as e:
+            UserAudience(['alice', False])
+        self.assertIn('User id False is not a string', str(e.exception))
+
+    def test_user_audience_should_fail_if_string_passed(self):
+        with self.assertRaises(TypeError) as e:
+            UserAudience('alice')
+        self.assertIn('user_ids must be a list', str(e.exception))
+
+    def test_audiences_should_remove_duplicates_in_order(self):
+        interests = InterestSet(['b', 'a', 'b', 'c', 'a'])
+        self.assertEqual(interests.targets, ('b', 'a', 'c'))
+        self.assertEqual(list(interests), ['b', 'a', 'c'])
+        self.assertEqual(len(interests), 3)
+        self.assertIn('a', interests)
+
+    def test_audiences_should_be_hashable_and_comparable(self):
+        self.assertEqual(UserAudience(['alice']), UserAudience(['alice']))
+        self.assertEqual(
+            hash(UserAudience(['alice'])),
+            hash(UserAudience(['alice'])),
+        )
+        self.assertNotEqual(UserAudience(['alice']), InterestSet(['alice']))
+        self.assertEqual(len(set([
+            UserAudience(['alice', 'bob']),
+            UserAudience(['alice', 'bob']),
+            UserAudience(['bob']),
+        ])), 2)
+
+    def test_audiences_should_be_immutable(self):
+        with self.assertRaises(AttributeError):
+            UserAudience(['alice']).extra = True
+
+    def test_chunks_should_split_into_audiences(self):
+        user_ids = ['user-' + str(i) for i in range(0, 2500)]
+        chunks = list(UserAudience(user_ids).chunks())
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        self.assertIsInstance(chunks[0], UserAudience)
+        self.assertEqual(
+            [user_id for chunk in chunks for user_id in chunk],
+            user_ids,
+        )
+
+    def test_chunks_should_accept_smaller_size(self):
+        chunks = list(InterestSet(['a', 'b', 'c']).chunks(2))
+        self.assertEqual([list(chunk) for chunk in chunks], [['a', 'b'], ['c']])
+
+    def test_chunks_should_fail_if_size_invalid(self):
+        audience = UserAudience(['user-' + str(i) for i in range(0, 1500)])
+        with self.assertRaises(TypeError):
+            audience.chunks('10')
+        with self.assertRaises(ValueError):
+            audience.chunks(0)
+        with self.assertRaises(ValueError):
+            InterestSet(['a', 'b', 'c']).chunks(-1)
+        with self.assertRaises(ValueError):
+            audience.chunks(2000)
+
+    def test_publish_template_should_encode_audience(self):
+        template = PublishTemplate({})
+        self.assertEqual(
+            template.encode('users', UserAudience(['alice', 'bob'])),
+            b'{"users": ["alice", "bob"]}',
+        )
+
+
+class TestPushNotificationsAudiences(unittest.TestCase):
+    def test_publish_to_interests_should_accept_interest_set(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={
+                    'publishId': '1234',
+                },
+            )
+            pn_client.publish_to_interests(
+                interests=InterestSet(['donuts', 'cakes']),
+                publish_body={'apns': {'aps': {'alert': 'Hello World!'}}},
+            )
+            req = http_mock.request_history[0]
+
+        self.assertEqual(req.json()['interests'], ['donuts', 'cakes'])
+
+    def test_publish_to_interests_should_fail_if_interest_set_too_big(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        interests = InterestSet(['interest-' + str(i) for i in range(0, 101)])
+        with self.assertRaises(ValueError) as e:
+            pn_client.publish_to_interests(interests, {})
+        self.assertIn(
+            'Number of interests (101) exceeds maximum',
+            str(e.exception),
+        )
+
+    def test_publish_to_users_bulk_should_accept_user_audience(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        audience = UserAudience(['user-' + str(i) for i in range(0, 1500)])
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={
+                    'publishId': '1234',
+                },
+            )
+            result = pn_client.publish_to_users_bulk(audience, {})
+            requests_made = http_mock.request_history
+
+        self.assertTrue(result.ok)
+        self.assertEqual(len(requests_made), 2)
+        self.assertEqual(
+            [user_id for req in requests_made for user_id in req.json()['users']],
+            list(audience),
+        )
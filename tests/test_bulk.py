@@ -0,0 +1,230 @@
+"""Unit tests for bulk publishing"""
+
+import json
+import unittest
+
+import requests_mock
+
+from pusher_push_notifications import (
+    BulkPublishResult,
+    InMemoryTransport,
+    PushNotifications,
+    PusherServerError,
+    Response,
+)
+
+
+class TransportError(Exception):
+    pass
+
+
+def failing_transport(key, failing_target):
+    """Transport raising TransportError for publishes to failing_target"""
+    def handler(request):
+        if failing_target in json.loads(request.body.decode('utf-8'))[key]:
+            raise TransportError('connection reset')
+        return Response(200, {}, b'{"publishId": "1234"}')
+
+    return InMemoryTransport(handler)
+
+
+class TestPushNotificationsBulk(unittest.TestCase):
+    def test_publish_to_users_bulk_should_split_into_chunks(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        user_ids = ['user-' + str(i) for i in range(0, 2500)]
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={
+                    'publishId': '1234',
+                },
+            )
+            result = pn_client.publish_to_users_bulk(
+                user_ids=user_ids,
+                publish_body={
+                    'apns': {
+                        'aps': {
+                            'alert': 'Hello World!',
+                        },
+                    },
+                },
+                concurrency=3,
+            )
+            requests_made = http_mock.request_history
+
+        self.assertIsInstance(result, BulkPublishResult)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.publish_ids, ['1234', '1234', '1234'])
+        self.assertEqual(
+            [len(chunk.targets) for chunk in result.chunks],
+            [1000, 1000, 500],
+        )
+        self.assertEqual(len(requests_made), 3)
+        sent_user_ids = sorted(
+            user_id
+            for req in requests_made
+            for user_id in req.json()['users']
+        )
+        self.assertEqual(sent_user_ids, sorted(user_ids))
+
+    def test_publish_to_users_bulk_should_report_failed_chunks(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+
+        def respond(request, context):
+            if 'user-0' in request.json()['users']:
+                context.status_code = 500
+                return {'error': 'Server error', 'description': 'blah'}
+            context.status_code = 200
+            return {'publishId': '1234'}
+
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                json=respond,
+            )
+            result = pn_client.publish_to_users_bulk(
+                user_ids=['user-' + str(i) for i in range(0, 1500)],
+                publish_body={},
+            )
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.publish_ids, ['1234'])
+        self.assertEqual(len(result.failures), 1)
+        failure = result.failures[0]
+        self.assertEqual(len(failure.targets), 1000)
+        self.assertIsInstance(failure.error, PusherServerError)
+        self.assertIsNone(failure.publish_id)
+
+    def test_publish_to_users_bulk_should_report_any_transport_error(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=failing_transport('users', 'user-1000'),
+        )
+        result = pn_client.publish_to_users_bulk(
+            user_ids=['user-' + str(i) for i in range(0, 3000)],
+            publish_body={},
+            concurrency=2,
+        )
+
+        self.assertEqual(result.publish_ids, ['1234', '1234'])
+        self.assertEqual(len(result.failures), 1)
+        self.assertEqual(result.failures[0].targets[0], 'user-1000')
+        self.assertIsInstance(result.failures[0].error, TransportError)
+
+    def test_publish_to_users_bulk_should_validate_all_user_ids_up_front(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        user_ids = ['user-' + str(i) for i in range(0, 1500)]
+        user_ids.append('A' * 165)
+        with requests_mock.Mocker() as http_mock:
+            with self.assertRaises(ValueError) as e:
+                pn_client.publish_to_users_bulk(user_ids, {})
+            self.assertEqual(len(http_mock.request_history), 0)
+        self.assertIn('longer than the maximum of 164 chars', str(e.exception))
+
+    def test_publish_to_users_bulk_should_fail_if_no_users_passed(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        with self.assertRaises(ValueError) as e:
+            pn_client.publish_to_users_bulk([], {})
+        self.assertIn('must target at least one user', str(e.exception))
+
+    def test_publish_to_users_bulk_should_fail_if_concurrency_invalid(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        with self.assertRaises(ValueError) as e:
+            pn_client.publish_to_users_bulk(['alice'], {}, concurrency=0)
+        self.assertIn('concurrency must be at least 1', str(e.exception))
+
+    def test_publish_to_interests_bulk_should_dedup_and_split_into_chunks(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        interests = ['interest-' + str(i) for i in range(0, 250)]
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={
+                    'publishId': '1234',
+                },
+            )
+            result = pn_client.publish_to_interests_bulk(
+                interests=interests + interests[:50],
+                publish_body={
+                    'apns': {
+                        'aps': {
+                            'alert': 'Hello World!',
+                        },
+                    },
+                },
+            )
+            requests_made = http_mock.request_history
+
+        self.assertTrue(result.ok)
+        self.assertEqual(
+            [chunk.targets for chunk in result.chunks],
+            [interests[0:100], interests[100:200], interests[200:250]],
+        )
+        self.assertEqual(len(requests_made), 3)
+        sent_interests = sorted(
+            interest
+            for req in requests_made
+            for interest in req.json()['interests']
+        )
+        self.assertEqual(sent_interests, sorted(interests))
+
+    def test_publish_to_interests_bulk_should_report_any_transport_error(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=failing_transport('interests', 'interest-0'),
+        )
+        result = pn_client.publish_to_interests_bulk(
+            interests=['interest-' + str(i) for i in range(0, 250)],
+            publish_body={},
+        )
+
+        self.assertEqual(result.publish_ids, ['1234', '1234'])
+        self.assertEqual(len(result.failures), 1)
+        self.assertIsInstance(result.failures[0].error, TransportError)
+
+    def test_publish_to_interests_bulk_should_validate_interests_up_front(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        interests = ['interest-' + str(i) for i in range(0, 150)]
+        interests.append('bad|interest')
+        with requests_mock.Mocker() as http_mock:
+            with self.assertRaises(ValueError) as e:
+                pn_client.publish_to_interests_bulk(interests, {})
+            self.assertEqual(len(http_mock.request_history), 0)
+        self.assertIn('contains a forbidden character', str(e.exception))
+
+    def test_publish_to_interests_bulk_should_fail_if_no_interests_passed(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        with self.assertRaises(ValueError) as e:
+            pn_client.publish_to_interests_bulk([], {})
+        self.assertIn('must target at least one interest', str(e.exception))
@@ -0,0 +1,134 @@
+"""Unit tests for the local fake Beams server"""
+
+import random
+import time
+import unittest
+
+from pusher_push_notifications import (
+    PushNotifications,
+    PusherAuthError,
+    PusherMissingInstanceError,
+    PusherServerError,
+    PusherTooManyRequestsError,
+    PusherValidationError,
+    RetryPolicy,
+)
+from pusher_push_notifications.fake_server import (
+    FakeBeamsServer,
+    fixed_latency,
+    parse_latency,
+)
+
+
+def make_client(server, **kwargs):
+    return PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        endpoint=server.endpoint,
+        **kwargs
+    )
+
+
+class TestFakeBeamsServer(unittest.TestCase):
+    def test_should_answer_publishes_and_deletes(self):
+        with FakeBeamsServer() as server:
+            pn_client = make_client(server)
+            first = pn_client.publish_to_users(['alice', 'bob'], {})
+            second = pn_client.publish_to_interests(['donuts'], {})
+            pn_client.delete_user('alice')
+            stats = server.stats
+
+        self.assertNotEqual(first['publishId'], second['publishId'])
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['status_codes'], {200: 3})
+        self.assertEqual(stats['publishes'], 2)
+        self.assertEqual(stats['targets'], 3)
+
+    def test_should_check_instance_id_and_secret_key(self):
+        with FakeBeamsServer(
+                instance_id='INSTANCE_ID',
+                secret_key='SECRET_KEY',
+        ) as server:
+            with self.assertRaises(PusherAuthError):
+                PushNotifications(
+                    'INSTANCE_ID',
+                    'WRONG_KEY',
+                    endpoint=server.endpoint,
+                ).delete_user('alice')
+            with self.assertRaises(PusherMissingInstanceError):
+                PushNotifications(
+                    'OTHER_INSTANCE',
+                    'SECRET_KEY',
+                    endpoint=server.endpoint,
+                ).delete_user('alice')
+            make_client(server).delete_user('alice')
+
+    def test_should_validate_publishes(self):
+        with FakeBeamsServer() as server:
+            pn_client = make_client(server)
+            with self.assertRaises(PusherValidationError) as e:
+                # Bypass the client side validation
+                pn_client._make_request(
+                    method='POST',
+                    path='/publish_api/v1/instances/{instance_id}/publishes/users',
+                    path_params={'instance_id': 'INSTANCE_ID'},
+                    body={'users': []},
+                )
+        self.assertIn('at least one of users', str(e.exception))
+
+    def test_should_inject_errors(self):
+        with FakeBeamsServer(error_rate=1) as server:
+            with self.assertRaises(PusherServerError):
+                make_client(server).delete_user('alice')
+
+    def test_should_inject_too_many_requests(self):
+        with FakeBeamsServer(too_many_requests_rate=1, retry_after=0) as server:
+            pn_client = make_client(
+                server,
+                retry_policy=RetryPolicy(max_retries=2, backoff_base=0),
+            )
+            with self.assertRaises(PusherTooManyRequestsError):
+                pn_client.delete_user('alice')
+            self.assertEqual(server.stats['status_codes'], {429: 3})
+
+    def test_should_rate_limit(self):
+        with FakeBeamsServer(rate_limit=2) as server:
+            pn_client = make_client(server)
+            pn_client.delete_user('alice')
+            pn_client.delete_user('alice')
+            with self.assertRaises(PusherTooManyRequestsError):
+                pn_client.delete_user('alice')
+
+    def test_should_rate_limit_below_one_request_per_second(self):
+        with FakeBeamsServer(rate_limit=0.5) as server:
+            pn_client = make_client(server)
+            pn_client.delete_user('alice')
+            with self.assertRaises(PusherTooManyRequestsError):
+                pn_client.delete_user('alice')
+
+    def test_should_add_latency(self):
+        with FakeBeamsServer(latency=fixed_latency(0.05)) as server:
+            pn_client = make_client(server)
+            start = time.time()
+            pn_client.delete_user('alice')
+            self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_reset_stats(self):
+        with FakeBeamsServer() as server:
+            make_client(server).delete_user('alice')
+            server.reset_stats()
+            self.assertEqual(server.stats['requests'], 0)
+
+    def test_constructor_should_fail_if_rate_invalid(self):
+        with self.assertRaises(ValueError) as e:
+            FakeBeamsServer(error_rate=1.5)
+        self.assertIn('error_rate must be between 0 and 1', str(e.exception))
+
+    def test_parse_latency(self):
+        self.assertEqual(parse_latency('fixed:20')(None), 0.02)
+        latency = parse_latency('uniform:5,10')(random.Random())
+        self.assertTrue(0.005 <= latency <= 0.01)
+        with self.assertRaises(ValueError):
+            parse_latency('normal:10')
+        with self.assertRaises(ValueError):
+            parse_latency('uniform:10')
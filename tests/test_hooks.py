@@ -0,0 +1,246 @@
+"""Unit tests for request hooks"""
+
+import unittest
+import warnings
+
+from pusher_push_notifications import (
+    InMemoryTransport,
+    PushNotifications,
+    PusherServerError,
+    RequestHooks,
+    Response,
+    RetryPolicy,
+    Transport,
+)
+from pusher_push_notifications.fake_server import FakeBeamsServer
+
+try:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+    from opentelemetry.trace import SpanKind, StatusCode
+except ImportError:
+    TracerProvider = None
+
+PUBLISH_USERS_PATH = '/publish_api/v1/instances/{instance_id}/publishes/users'
+
+
+class RecordingHooks(RequestHooks):
+    """Records (event, attempt, status code, error) for every call"""
+
+    def __init__(self):
+        self.events = []
+        self.infos = []
+
+    def _record(self, event, info, *args):
+        self.events.append((event, info.attempt, info.status_code) + args)
+        self.infos.append(info)
+
+    def on_request_start(self, info):
+        self._record('start', info)
+
+    def on_response(self, info):
+        self._record('response', info)
+
+    def on_retry(self, info, delay):
+        self._record('retry', info, delay)
+
+    def on_error(self, info, error):
+        self._record('error', info, type(error))
+
+
+class FailingTransport(Transport):
+    """Answers with each of the given status codes in turn"""
+
+    def __init__(self, status_codes):
+        self.status_codes = list(status_codes)
+
+    def send(self, request):
+        return Response(
+            self.status_codes.pop(0),
+            {},
+            b'{"error": "Internal", "description": "Failed"}',
+        )
+
+
+class BrokenTransport(Transport):
+    retryable_errors = (IOError,)
+
+    def send(self, request):
+        raise IOError('Connection refused')
+
+
+class TestRequestHooks(unittest.TestCase):
+    def test_hooks_should_be_called_with_request_details(self):
+        hooks = RecordingHooks()
+        bodies = []
+
+        def handler(request):
+            bodies.append(request.body)
+            return Response(200, {}, b'{"publishId": "1234"}')
+
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(handler),
+            hooks=hooks,
+        )
+        pn_client.publish_to_users(['alice'], {'a': 1})
+
+        self.assertEqual(hooks.events, [
+            ('start', 1, None),
+            ('response', 1, 200),
+        ])
+        info = hooks.infos[-1]
+        self.assertEqual(info.method, 'POST')
+        self.assertEqual(info.path, PUBLISH_USERS_PATH)
+        self.assertEqual(
+            info.url,
+            'https://instance_id.pushnotifications.pusher.com'
+            '/publish_api/v1/instances/INSTANCE_ID/publishes/users',
+        )
+        self.assertEqual(info.request_bytes, len(bodies[0]))
+        self.assertEqual(info.response_bytes, len(b'{"publishId": "1234"}'))
+        self.assertEqual(info.queue_wait, 0.0)
+        self.assertGreaterEqual(info.total, 0)
+        self.assertGreaterEqual(info.elapsed, info.total)
+        # The in memory transport does not measure these
+        self.assertIsNone(info.connect)
+        self.assertIsNone(info.ttfb)
+
+    def test_hooks_should_be_told_about_retries_and_errors(self):
+        hooks = RecordingHooks()
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=FailingTransport([500, 500]),
+            retry_policy=RetryPolicy(max_retries=1, backoff_base=0),
+            hooks=[hooks],
+        )
+        with self.assertRaises(PusherServerError):
+            pn_client.publish_to_users(['alice'], {})
+
+        self.assertEqual(hooks.events, [
+            ('start', 1, None),
+            ('response', 1, 500),
+            ('retry', 1, 500, 0),
+            ('start', 2, None),
+            ('response', 2, 500),
+            ('error', 2, 500, PusherServerError),
+        ])
+
+    def test_hooks_should_be_told_about_transport_errors(self):
+        hooks = RecordingHooks()
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=BrokenTransport(),
+            hooks=[hooks],
+        )
+        with self.assertRaises(IOError):
+            pn_client.delete_user('alice')
+
+        self.assertEqual(hooks.events, [
+            ('start', 1, None),
+            ('error', 1, None, IOError),
+        ])
+        self.assertEqual(
+            hooks.infos[-1].path,
+            '/customer_api/v1/instances/{instance_id}/users/{user_id}',
+        )
+        self.assertIsInstance(hooks.infos[-1].error, IOError)
+
+    def test_failing_hooks_should_warn_without_failing_the_request(self):
+        class FailingHooks(RequestHooks):
+            def on_response(self, info):
+                raise ValueError('oops')
+
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(),
+            hooks=[FailingHooks()],
+        )
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response = pn_client.publish_to_users(['alice'], {})
+
+        self.assertEqual(response, {'publishId': 'pubid-in-memory'})
+        self.assertEqual(len(caught), 1)
+        self.assertIs(caught[0].category, RuntimeWarning)
+        self.assertIn('oops', str(caught[0].message))
+
+    def test_hooks_should_be_validated(self):
+        with self.assertRaises(TypeError):
+            PushNotifications('INSTANCE_ID', 'SECRET_KEY', hooks=object())
+        with self.assertRaises(TypeError):
+            PushNotifications('INSTANCE_ID', 'SECRET_KEY', hooks=[object()])
+
+    def test_requests_transport_should_report_connect_and_ttfb(self):
+        hooks = RecordingHooks()
+        with FakeBeamsServer() as server:
+            pn_client = PushNotifications(
+                'INSTANCE_ID',
+                'SECRET_KEY',
+                endpoint=server.endpoint,
+                hooks=[hooks],
+            )
+            pn_client.publish_to_users(['alice'], {})
+            first = hooks.infos[-1]
+            first_connect = first.connect
+            pn_client.publish_to_users(['alice'], {})
+            second = hooks.infos[-1]
+            pn_client.close()
+
+        self.assertGreater(first_connect, 0)
+        # The second request reuses the pooled connection
+        self.assertEqual(second.connect, 0)
+        self.assertGreater(second.ttfb, 0)
+        self.assertGreaterEqual(second.total, second.ttfb)
+
+
+@unittest.skipIf(TracerProvider is None, 'opentelemetry-sdk is not installed')
+class TestOpenTelemetryHooks(unittest.TestCase):
+    def setUp(self):
+        from pusher_push_notifications.otel import OpenTelemetryHooks
+
+        self.exporter = InMemorySpanExporter()
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        self.hooks = OpenTelemetryHooks(tracer_provider=tracer_provider)
+
+    def test_should_record_a_span_per_request(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(),
+            hooks=[self.hooks],
+        )
+        pn_client.publish_to_users(['alice'], {})
+
+        span, = self.exporter.get_finished_spans()
+        self.assertEqual(span.name, 'POST ' + PUBLISH_USERS_PATH)
+        self.assertEqual(span.kind, SpanKind.CLIENT)
+        self.assertEqual(span.attributes['http.request.method'], 'POST')
+        self.assertEqual(span.attributes['url.template'], PUBLISH_USERS_PATH)
+        self.assertEqual(span.attributes['http.response.status_code'], 200)
+        self.assertNotEqual(span.status.status_code, StatusCode.ERROR)
+
+    def test_should_record_failed_attempts_as_errors(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=BrokenTransport(),
+            retry_policy=RetryPolicy(max_retries=1, backoff_base=0),
+            hooks=[self.hooks],
+        )
+        with self.assertRaises(IOError):
+            pn_client.publish_to_users(['alice'], {})
+
+        first, second = self.exporter.get_finished_spans()
+        for span in (first, second):
+            self.assertEqual(span.status.status_code, StatusCode.ERROR)
+            self.assertEqual(span.attributes['error.type'], 'OSError')
+        self.assertEqual(second.attributes['http.request.resend_count'], 1)
@@ -0,0 +1,162 @@
+"""Unit tests for the HTTP/2 transport"""
+
+import json
+import socket
+import threading
+import unittest
+
+import requests
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+from pusher_push_notifications import PushNotifications
+from pusher_push_notifications.http2 import HTTP2Adapter, httpx
+
+
+class H2Server(object):
+    """Minimal local HTTP/2 server (plain text, prior knowledge) that answers
+    every request with a publish response, recording what it receives"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._socket = socket.socket()
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(5)
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        self._socket.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client_socket, _ = self._socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.connections += 1
+            thread = threading.Thread(target=self._serve, args=(client_socket,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, client_socket):
+        connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False),
+        )
+        connection.initiate_connection()
+        client_socket.sendall(connection.data_to_send())
+        streams = {}
+        while True:
+            data = client_socket.recv(65535)
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    streams[event.stream_id] = (dict(event.headers), [])
+                elif isinstance(event, h2.events.DataReceived):
+                    streams[event.stream_id][1].append(event.data)
+                    connection.acknowledge_received_data(
+                        event.flow_controlled_length,
+                        event.stream_id,
+                    )
+                elif isinstance(event, h2.events.StreamEnded):
+                    headers, body = streams.pop(event.stream_id)
+                    with self._lock:
+                        self.requests.append((headers, b''.join(body)))
+                    response_body = b'{"publishId": "1234"}'
+                    connection.send_headers(event.stream_id, [
+                        (':status', str(self.status)),
+                        ('content-type', 'application/json'),
+                        ('content-length', str(len(response_body))),
+                    ])
+                    connection.send_data(
+                        event.stream_id,
+                        response_body,
+                        end_stream=True,
+                    )
+            client_socket.sendall(connection.data_to_send())
+        client_socket.close()
+
+
+@unittest.skipIf(h2 is None, 'h2 is not installed')
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestHTTP2Adapter(unittest.TestCase):
+    def setUp(self):
+        self.server = H2Server()
+        self.url = 'http://127.0.0.1:{}/publish'.format(self.server.port)
+        self.session = requests.Session()
+        self.adapter = HTTP2Adapter(prior_knowledge=True)
+        self.session.mount('http://', self.adapter)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.close()
+
+    def test_should_send_requests_over_http2(self):
+        response = self.session.post(
+            self.url,
+            json={'users': ['alice']},
+            headers={'connection': 'close'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'publishId': '1234'})
+        self.assertEqual(response.headers['Content-Type'], 'application/json')
+        headers, body = self.server.requests[0]
+        self.assertEqual(headers[b':method'], b'POST')
+        self.assertEqual(headers[b':path'], b'/publish')
+        self.assertNotIn(b'connection', headers)
+        self.assertEqual(json.loads(body.decode('utf-8')), {'users': ['alice']})
+
+    def test_concurrent_requests_should_share_one_connection(self):
+        self.session.post(self.url, json={})
+
+        def post():
+            # Sessions are not thread safe, but the adapter is
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.post(self.url, json={})
+
+        threads = [threading.Thread(target=post) for _ in range(0, 10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.server.requests), 11)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_connection_errors_should_raise_requests_errors(self):
+        url = 'http://127.0.0.1:{}/publish'.format(_unused_port())
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.session.post(url, json={})
+
+
+def _unused_port():
+    unused = socket.socket()
+    unused.bind(('127.0.0.1', 0))
+    port = unused.getsockname()[1]
+    unused.close()
+    return port
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestPushNotificationsHTTP2(unittest.TestCase):
+    def test_should_use_http2_adapter(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY', http2=True)
+        self.assertIsInstance(
+            pn_client.session.get_adapter('https://example.com'),
+            HTTP2Adapter,
+        )
+        pn_client.close()
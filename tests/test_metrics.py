@@ -0,0 +1,153 @@
+"""Unit tests for the metrics collector"""
+
+import threading
+import unittest
+
+from pusher_push_notifications import (
+    InMemoryTransport,
+    MetricsCollector,
+    PushNotifications,
+    PusherAuthError,
+    Response,
+    RetryPolicy,
+)
+from pusher_push_notifications.metrics import (
+    PUBLISHES,
+    PUBLISH_RECIPIENTS,
+    REQUEST_DURATION,
+    REQUEST_ERRORS,
+    REQUESTS,
+    RETRIES,
+)
+
+USERS_PATH = (
+    ('path', '/publish_api/v1/instances/{instance_id}/publishes/users'),
+)
+DELETE_PATH = (
+    ('path', '/customer_api/v1/instances/{instance_id}/users/{user_id}'),
+)
+
+
+def make_client(metrics, handler=None, **kwargs):
+    return PushNotifications(
+        'INSTANCE_ID',
+        'SECRET_KEY',
+        transport=InMemoryTransport(handler),
+        hooks=[metrics],
+        **kwargs
+    )
+
+
+class TestMetricsCollector(unittest.TestCase):
+    def test_should_count_publishes_and_recipients(self):
+        metrics = MetricsCollector()
+        pn_client = make_client(metrics)
+        pn_client.publish_to_users(['alice', 'bob'], {})
+        pn_client.publish_to_users(['carol'], {})
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            snapshot[REQUESTS],
+            {USERS_PATH + (('status', '200'),): 2},
+        )
+        self.assertEqual(snapshot[PUBLISHES], {USERS_PATH: 2})
+        self.assertEqual(snapshot[PUBLISH_RECIPIENTS], {USERS_PATH: 3})
+        histogram = snapshot[REQUEST_DURATION][USERS_PATH]
+        self.assertEqual(histogram['count'], 2)
+        self.assertEqual(len(histogram['counts']), len(metrics.buckets) + 1)
+
+    def test_should_count_errors_by_class_and_retries(self):
+        metrics = MetricsCollector()
+        statuses = [503, 401]
+
+        def handler(request):
+            return Response(statuses.pop(0), {}, b'{}')
+
+        pn_client = make_client(
+            metrics,
+            handler,
+            retry_policy=RetryPolicy(backoff_base=0),
+        )
+        with self.assertRaises(PusherAuthError):
+            pn_client.delete_user('alice')
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot[RETRIES], {DELETE_PATH: 1})
+        self.assertEqual(
+            snapshot[REQUEST_ERRORS],
+            {DELETE_PATH + (('error', 'PusherAuthError'),): 1},
+        )
+        self.assertEqual(snapshot[PUBLISHES], {})
+
+    def test_should_combine_metrics_from_all_threads(self):
+        metrics = MetricsCollector()
+        pn_client = make_client(metrics)
+
+        def publish():
+            for _ in range(0, 10):
+                pn_client.publish_to_users(['alice'], {})
+
+        threads = [threading.Thread(target=publish) for _ in range(0, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(metrics.snapshot()[PUBLISHES], {USERS_PATH: 50})
+
+    def test_should_fold_metrics_of_finished_threads(self):
+        metrics = MetricsCollector()
+        pn_client = make_client(metrics)
+        for _ in range(0, 20):
+            pn_client.publish_to_users_bulk(
+                ['user-' + str(i) for i in range(0, 3000)],
+                {},
+                concurrency=3,
+            )
+
+        self.assertEqual(metrics.snapshot()[PUBLISHES], {USERS_PATH: 60})
+        # Only the current thread and the last bulk publish's workers (which
+        # may not have exited yet) keep their own metrics
+        self.assertLessEqual(len(metrics._shards), 4)
+
+    def test_reset_should_clear_metrics(self):
+        metrics = MetricsCollector()
+        pn_client = make_client(metrics)
+        pn_client.publish_to_users(['alice'], {})
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()[PUBLISHES], {})
+
+        pn_client.publish_to_users(['alice'], {})
+        self.assertEqual(metrics.snapshot()[PUBLISHES], {USERS_PATH: 1})
+
+    def test_should_export_prometheus_text(self):
+        metrics = MetricsCollector(buckets=[1, 0.5])
+        pn_client = make_client(metrics)
+        pn_client.publish_to_users(['alice', 'bob'], {})
+
+        text = metrics.to_prometheus()
+        label = 'path="/publish_api/v1/instances/{instance_id}/publishes/users"'
+        self.assertIn('# TYPE pusher_beams_requests_total counter\n', text)
+        self.assertIn(
+            'pusher_beams_requests_total{' + label + ',status="200"} 1\n',
+            text,
+        )
+        self.assertIn(
+            'pusher_beams_publish_recipients_total{' + label + '} 2\n',
+            text,
+        )
+        self.assertIn(
+            '# TYPE pusher_beams_request_duration_seconds histogram\n',
+            text,
+        )
+        for bound in ('0.5', '1.0', '+Inf'):
+            self.assertIn(
+                'pusher_beams_request_duration_seconds_bucket{'
+                + label + ',le="' + bound + '"} 1\n',
+                text,
+            )
+        self.assertIn(
+            'pusher_beams_request_duration_seconds_count{' + label + '} 1\n',
+            text,
+        )
+        self.assertTrue(text.endswith('\n'))
@@ -0,0 +1,100 @@
+"""Unit tests for per stage profiling"""
+
+import unittest
+
+import six
+
+from pusher_push_notifications import (
+    InMemoryTransport,
+    PushNotifications,
+    PusherServerError,
+    Response,
+    StageProfiler,
+)
+
+PUBLISH_STAGES = [
+    'validate', 'copy', 'encode', 'build', 'network', 'decode', 'total',
+]
+
+
+class TestStageProfiler(unittest.TestCase):
+    def test_should_aggregate_timings_per_stage(self):
+        profiler = StageProfiler()
+        for milliseconds in range(1, 101):
+            profiler.record('publish_to_users', 'encode', milliseconds / 1000.0)
+
+        stats = profiler.stats()[('publish_to_users', 'encode')]
+        self.assertEqual(stats['count'], 100)
+        self.assertAlmostEqual(stats['mean'], 0.0505)
+        self.assertAlmostEqual(stats['p50'], 0.050)
+        self.assertAlmostEqual(stats['p99'], 0.099)
+
+    def test_percentiles_should_use_the_most_recent_samples(self):
+        profiler = StageProfiler(max_samples=2)
+        for seconds in (10.0, 1.0, 1.0):
+            profiler.record('delete_user', 'network', seconds)
+
+        stats = profiler.stats()[('delete_user', 'network')]
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(stats['mean'], 4.0)
+        self.assertEqual(stats['p99'], 1.0)
+
+    def test_should_time_each_stage_of_a_publish(self):
+        profiler = StageProfiler()
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(),
+            profiler=profiler,
+        )
+        pn_client.publish_to_users(['alice'], {})
+        pn_client.publish_to_interests(['donuts'], {})
+        pn_client.delete_user('alice')
+
+        stats = profiler.stats()
+        self.assertEqual(
+            [stage for operation, stage in stats
+             if operation == 'publish_to_users'],
+            PUBLISH_STAGES,
+        )
+        self.assertIn(('publish_to_interests', 'copy'), stats)
+        self.assertIn(('delete_user', 'network'), stats)
+        self.assertNotIn(('delete_user', 'copy'), stats)
+        self.assertTrue(all(s['count'] == 1 for s in stats.values()))
+
+    def test_failed_calls_should_only_record_completed_stages(self):
+        profiler = StageProfiler()
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(lambda request: Response(500)),
+            profiler=profiler,
+        )
+        with self.assertRaises(PusherServerError):
+            pn_client.publish_to_users(['alice'], {})
+
+        stages = [stage for _, stage in profiler.stats()]
+        self.assertEqual(stages, PUBLISH_STAGES[:5])
+
+    def test_profiling_can_be_enabled_and_reset_at_runtime(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(),
+        )
+        pn_client.publish_to_users(['alice'], {})
+        pn_client.profiler = StageProfiler()
+        pn_client.publish_to_users(['alice'], {})
+
+        output = six.StringIO()
+        pn_client.profiler.dump(output)
+        self.assertIn('publish_to_users.network', output.getvalue())
+
+        pn_client.profiler.reset()
+        self.assertEqual(pn_client.profiler.stats(), {})
+
+    def test_profiler_should_be_validated(self):
+        with self.assertRaises(TypeError):
+            PushNotifications('INSTANCE_ID', 'SECRET_KEY', profiler=object())
+        with self.assertRaises(ValueError):
+            StageProfiler(max_samples=0)
@@ -0,0 +1,359 @@
+"""Unit tests for background publishing"""
+
+import threading
+import unittest
+
+import requests_mock
+
+from pusher_push_notifications import (
+    PushNotifications,
+    PusherQueueFullError,
+    PusherValidationError,
+)
+from pusher_push_notifications.publish_queue import (
+    PublishCoalescer,
+    PublishQueue,
+)
+
+
+def make_client():
+    return PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+
+
+class BlockingResponder(object):
+    """requests_mock callback that blocks every request until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def __call__(self, request, context):
+        self.release.wait(5)
+        context.status_code = 200
+        return '{"publishId": "1234"}'
+
+
+class TestPublishQueue(unittest.TestCase):
+    def test_should_publish_in_background(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            with PublishQueue(make_client(), workers=2) as queue:
+                future_a = queue.publish_to_users(['alice'], {'a': 1})
+                future_b = queue.publish_to_interests(['donuts'], {'b': 2})
+                self.assertDictEqual(future_a.result(5), {'publishId': '1234'})
+                self.assertDictEqual(future_b.result(5), {'publishId': '1234'})
+            bodies = sorted(
+                (req.json() for req in http_mock.request_history),
+                key=len,
+            )
+
+        self.assertIn({'a': 1, 'users': ['alice']}, bodies)
+        self.assertIn({'b': 2, 'interests': ['donuts']}, bodies)
+
+    def test_should_validate_when_publish_is_added(self):
+        with PublishQueue(make_client()) as queue:
+            with self.assertRaises(ValueError) as e:
+                queue.publish_to_users(['A' * 165], {})
+            self.assertIn('longer than the maximum', str(e.exception))
+            with self.assertRaises(TypeError):
+                queue.publish_to_interests(['donuts'], 'not a dict')
+            with self.assertRaises(ValueError):
+                queue.publish_to_users(['alice'], {'a': float('nan')})
+            self.assertEqual(len(queue), 0)
+
+    def test_should_snapshot_publish_body(self):
+        publish_body = {'a': 1}
+        responder = BlockingResponder()
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=responder,
+            )
+            with PublishQueue(make_client(), workers=1) as queue:
+                future = queue.publish_to_users(['alice'], publish_body)
+                publish_body['a'] = 2
+                responder.release.set()
+                future.result(5)
+            req = http_mock.request_history[0]
+
+        self.assertEqual(req.json(), {'a': 1, 'users': ['alice']})
+
+    def test_publish_errors_should_be_set_on_future(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=400,
+                json={'error': 'Invalid request', 'description': 'blah'},
+            )
+            with PublishQueue(make_client()) as queue:
+                future = queue.publish_to_users(['alice'], {})
+                with self.assertRaises(PusherValidationError):
+                    future.result(5)
+
+    def test_should_raise_when_full(self):
+        responder = BlockingResponder()
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=responder,
+            )
+            queue = PublishQueue(
+                make_client(),
+                maxsize=2,
+                workers=1,
+                overflow='raise',
+            )
+            queue.publish_to_users(['alice'], {})
+            queue.publish_to_users(['bob'], {})
+            with self.assertRaises(PusherQueueFullError):
+                queue.publish_to_users(['carol'], {})
+            responder.release.set()
+            self.assertTrue(queue.flush(5))
+            queue.close()
+            self.assertEqual(len(http_mock.request_history), 2)
+
+    def test_should_drop_when_full(self):
+        responder = BlockingResponder()
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=responder,
+            )
+            queue = PublishQueue(
+                make_client(),
+                maxsize=1,
+                workers=1,
+                overflow='drop',
+            )
+            accepted = queue.publish_to_users(['alice'], {})
+            dropped = queue.publish_to_users(['bob'], {})
+            with self.assertRaises(PusherQueueFullError):
+                dropped.result(0)
+            self.assertEqual(queue.dropped, 1)
+            responder.release.set()
+            self.assertDictEqual(accepted.result(5), {'publishId': '1234'})
+            queue.close()
+
+    def test_should_block_when_full(self):
+        responder = BlockingResponder()
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=responder,
+            )
+            queue = PublishQueue(
+                make_client(),
+                maxsize=1,
+                workers=1,
+                block_timeout=0.05,
+            )
+            queue.publish_to_users(['alice'], {})
+            with self.assertRaises(PusherQueueFullError) as e:
+                queue.publish_to_users(['bob'], {})
+            self.assertIn('Timed out', str(e.exception))
+
+            queue.block_timeout = None
+            threading.Timer(0.05, responder.release.set).start()
+            future = queue.publish_to_users(['carol'], {})
+            self.assertDictEqual(future.result(5), {'publishId': '1234'})
+            queue.close()
+            self.assertEqual(len(http_mock.request_history), 2)
+
+    def test_flush_should_time_out(self):
+        responder = BlockingResponder()
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=responder,
+            )
+            queue = PublishQueue(make_client(), workers=1)
+            queue.publish_to_users(['alice'], {})
+            self.assertFalse(queue.flush(0.05))
+            self.assertEqual(len(queue), 1)
+            responder.release.set()
+            self.assertTrue(queue.flush(5))
+            self.assertEqual(len(queue), 0)
+            queue.close()
+
+    def test_close_should_send_queued_publishes(self):
+        responder = BlockingResponder()
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=responder,
+            )
+            queue = PublishQueue(make_client(), workers=1)
+            publishes = [
+                queue.publish_to_users([user_id], {})
+                for user_id in ['alice', 'bob', 'carol']
+            ]
+            responder.release.set()
+            queue.close()
+            self.assertTrue(all(future.done() for future in publishes))
+            self.assertEqual(len(http_mock.request_history), 3)
+
+        with self.assertRaises(RuntimeError):
+            queue.publish_to_users(['dave'], {})
+
+    def test_constructor_should_validate_params(self):
+        with self.assertRaises(TypeError) as e:
+            PublishQueue('client')
+        self.assertIn('client must be a PushNotifications', str(e.exception))
+        with self.assertRaises(ValueError) as e:
+            PublishQueue(make_client(), maxsize=0)
+        self.assertIn('maxsize must be at least 1', str(e.exception))
+        with self.assertRaises(ValueError) as e:
+            PublishQueue(make_client(), workers=0)
+        self.assertIn('workers must be at least 1', str(e.exception))
+        with self.assertRaises(ValueError) as e:
+            PublishQueue(make_client(), overflow='ignore')
+        self.assertIn("overflow must be one of", str(e.exception))
+
+
+class TestPublishCoalescer(unittest.TestCase):
+    def test_should_combine_publishes_of_same_body(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            with PublishCoalescer(make_client(), window=0.05) as coalescer:
+                publishes = [
+                    coalescer.publish_to_users([user_id], {'a': 1})
+                    for user_id in ['alice', 'bob', 'carol']
+                ]
+                other = coalescer.publish_to_users(['alice'], {'a': 2})
+                for future in publishes + [other]:
+                    self.assertDictEqual(future.result(5), {'publishId': '1234'})
+            bodies = [req.json() for req in http_mock.request_history]
+
+        self.assertEqual(len(bodies), 2)
+        self.assertIn({'a': 1, 'users': ['alice', 'bob', 'carol']}, bodies)
+        self.assertIn({'a': 2, 'users': ['alice']}, bodies)
+
+    def test_should_send_full_batches_early(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            coalescer = PublishCoalescer(
+                make_client(),
+                window=60,
+                max_batch_size=2,
+            )
+            publishes = [
+                coalescer.publish_to_users([user_id], {})
+                for user_id in ['a', 'b', 'c', 'd', 'e']
+            ]
+            publishes[3].result(5)
+            self.assertFalse(publishes[4].done())
+            self.assertTrue(coalescer.flush(5))
+            self.assertTrue(publishes[4].done())
+            coalescer.close()
+            users = sorted(
+                req.json()['users'] for req in http_mock.request_history
+            )
+
+        self.assertEqual(users, [['a', 'b'], ['c', 'd'], ['e']])
+
+    def test_should_send_each_user_once_per_batch(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            coalescer = PublishCoalescer(
+                make_client(),
+                window=60,
+                max_batch_size=3,
+            )
+            publishes = [
+                coalescer.publish_to_users(user_ids, {})
+                for user_ids in [['a', 'b', 'a'], ['b'], ['c'], ['d']]
+            ]
+            # b is already in the batch, so c fills it and it is sent
+            self.assertEqual(publishes[1].result(5), {'publishId': '1234'})
+            publishes[2].result(5)
+            self.assertFalse(publishes[3].done())
+            self.assertTrue(coalescer.flush(5))
+            coalescer.close()
+            users = [req.json()['users'] for req in http_mock.request_history]
+
+        self.assertEqual(sorted(users), [['a', 'b', 'c'], ['d']])
+
+    def test_should_reject_publishes_larger_than_a_batch(self):
+        with PublishCoalescer(make_client(), max_batch_size=2) as coalescer:
+            with self.assertRaises(ValueError):
+                coalescer.publish_to_users(['a', 'b', 'c'], {})
+
+    def test_errors_should_be_set_on_every_future(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=400,
+                json={'error': 'Invalid request', 'description': 'blah'},
+            )
+            with PublishCoalescer(make_client()) as coalescer:
+                publishes = [
+                    coalescer.publish_to_users([user_id], {})
+                    for user_id in ['alice', 'bob']
+                ]
+                for future in publishes:
+                    with self.assertRaises(PusherValidationError):
+                        future.result(5)
+            self.assertEqual(len(http_mock.request_history), 1)
+
+    def test_cancelled_publishes_should_not_be_sent(self):
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            with PublishCoalescer(make_client(), window=60) as coalescer:
+                cancelled = coalescer.publish_to_users(['alice'], {})
+                kept = coalescer.publish_to_users(['bob'], {})
+                self.assertTrue(cancelled.cancel())
+            self.assertDictEqual(kept.result(0), {'publishId': '1234'})
+            req = http_mock.request_history[0]
+
+        self.assertEqual(req.json()['users'], ['bob'])
+
+    def test_should_validate_when_publish_is_added(self):
+        with PublishCoalescer(make_client()) as coalescer:
+            with self.assertRaises(TypeError) as e:
+                coalescer.publish_to_users('alice', {})
+            self.assertIn('user_ids must be a list', str(e.exception))
+        with self.assertRaises(RuntimeError):
+            coalescer.publish_to_users(['alice'], {})
+
+    def test_constructor_should_validate_params(self):
+        with self.assertRaises(ValueError) as e:
+            PublishCoalescer(make_client(), max_batch_size=1001)
+        self.assertIn(
+            'max_batch_size must be between 1 and 1000',
+            str(e.exception),
+        )
+        with self.assertRaises(ValueError) as e:
+            PublishCoalescer(make_client(), window=-1)
+        self.assertIn('window must not be negative', str(e.exception))
@@ -0,0 +1,128 @@
+"""Unit tests for pre-encoded publish templates"""
+
+import json
+import unittest
+
+import requests_mock
+
+from pusher_push_notifications import (
+    PublishTemplate,
+    PushNotifications,
+)
+from pusher_push_notifications.serializers import JSONSerializer
+
+
+class TestPublishTemplate(unittest.TestCase):
+    def test_encode_should_add_audience(self):
+        template = PublishTemplate({
+            'apns': {
+                'aps': {
+                    'alert': 'Hello World!',
+                },
+            },
+        })
+        self.assertDictEqual(
+            json.loads(template.encode('users', ['alice', 'bob']).decode('utf-8')),
+            {
+                'users': ['alice', 'bob'],
+                'apns': {
+                    'aps': {
+                        'alert': 'Hello World!',
+                    },
+                },
+            },
+        )
+
+    def test_encode_should_match_encoding_a_dict(self):
+        publish_body = {'apns': {'aps': {'alert': u'H\u00e9llo'}}}
+        template = PublishTemplate(publish_body)
+        expected = dict(publish_body, interests=['donuts'])
+        self.assertEqual(
+            json.loads(template.encode('interests', ['donuts']).decode('utf-8')),
+            expected,
+        )
+
+    def test_encode_should_allow_trailing_whitespace(self):
+        class PrettyJSONSerializer(JSONSerializer):
+            def dumps(self, value):
+                return json.dumps(value, indent=2).encode('utf-8') + b'\n'
+
+        template = PublishTemplate({'web': {}}, PrettyJSONSerializer())
+        self.assertEqual(
+            json.loads(template.encode('users', ['alice']).decode('utf-8')),
+            {'users': ['alice'], 'web': {}},
+        )
+
+    def test_constructor_should_fail_if_body_is_not_encoded_as_object(self):
+        class ListJSONSerializer(JSONSerializer):
+            def dumps(self, value):
+                return json.dumps(list(value.items())).encode('utf-8')
+
+        with self.assertRaises(ValueError):
+            PublishTemplate({'web': {}}, ListJSONSerializer())
+
+    def test_encode_should_handle_empty_body(self):
+        template = PublishTemplate({})
+        self.assertEqual(
+            json.loads(template.encode('users', ['alice']).decode('utf-8')),
+            {'users': ['alice']},
+        )
+
+    def test_encode_should_replace_existing_audience(self):
+        template = PublishTemplate({'users': ['mallory'], 'web': {}})
+        self.assertEqual(
+            json.loads(template.encode('users', ['alice']).decode('utf-8')),
+            {'users': ['alice'], 'web': {}},
+        )
+
+    def test_templates_of_same_body_should_be_equal(self):
+        template = PublishTemplate({'a': 1, 'users': ['alice']})
+        self.assertEqual(template, PublishTemplate({'a': 1}))
+        self.assertEqual(hash(template), hash(PublishTemplate({'a': 1})))
+        self.assertNotEqual(template, PublishTemplate({'a': 2}))
+
+    def test_should_fail_if_body_not_dict(self):
+        with self.assertRaises(TypeError) as e:
+            PublishTemplate(False)
+        self.assertIn('publish_body must be a dictionary', str(e.exception))
+
+    def test_publish_to_users_should_accept_template(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        template = PublishTemplate({
+            'apns': {
+                'aps': {
+                    'alert': 'Hello World!',
+                },
+            },
+        })
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={
+                    'publishId': '1234',
+                },
+            )
+            response = pn_client.publish_to_users(
+                user_ids=['alice'],
+                publish_body=template,
+            )
+            req = http_mock.request_history[0]
+
+        self.assertEqual(req.headers['content-type'], 'application/json')
+        self.assertDictEqual(
+            req.json(),
+            {
+                'users': ['alice'],
+                'apns': {
+                    'aps': {
+                        'alert': 'Hello World!',
+                    },
+                },
+            },
+        )
+        self.assertDictEqual(response, {'publishId': '1234'})
@@ -1,7 +1,12 @@
 """Unit tests for Pusher Push Notifications Python server SDK"""
 
+import os
+import threading
 import unittest
 
+import requests
+import requests_mock
+
 from pusher_push_notifications import (
     PushNotifications,
 )
@@ -75,3 +80,198 @@ class TestPushNotifications(unittest.TestCase):
             pn_client.endpoint,
             'example.com/push',
         )
+
+    def test_endpoint_should_accept_scheme(self):
+        pn_client = PushNotifications(
+            instance_id='INSTANCE_ID',
+            secret_key='1234',
+            endpoint='http://localhost:8080',
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json='',
+            )
+            pn_client.delete_user('alice')
+            req = http_mock.request_history[0]
+
+        self.assertEqual(
+            req.url,
+            'http://localhost:8080/customer_api/v1/instances/INSTANCE_ID'
+            '/users/alice',
+        )
+        self.assertEqual(req.headers['host'], 'localhost:8080')
+
+    def test_requests_should_use_updated_client_params(self):
+        pn_client = PushNotifications(
+            instance_id='INSTANCE_ID',
+            secret_key='1234',
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json='',
+            )
+            pn_client.delete_user('alice')
+            pn_client.instance_id = 'NEW_INSTANCE_ID'
+            pn_client.secret_key = '5678'
+            pn_client.delete_user('alice')
+            pn_client.endpoint = 'http://localhost:8080'
+            pn_client.delete_user('alice')
+            requests_made = http_mock.request_history
+
+        self.assertEqual(requests_made[0].headers['authorization'], 'Bearer 1234')
+        self.assertEqual(
+            requests_made[1].url,
+            'https://new_instance_id.pushnotifications.pusher.com'
+            '/customer_api/v1/instances/NEW_INSTANCE_ID/users/alice',
+        )
+        self.assertEqual(requests_made[1].headers['authorization'], 'Bearer 5678')
+        self.assertEqual(requests_made[2].headers['host'], 'localhost:8080')
+
+    def test_setters_should_validate_client_params(self):
+        pn_client = PushNotifications(
+            instance_id='INSTANCE_ID',
+            secret_key='1234',
+        )
+        with self.assertRaises(ValueError):
+            pn_client.instance_id = ''
+        with self.assertRaises(TypeError):
+            pn_client.secret_key = None
+        with self.assertRaises(TypeError):
+            pn_client.endpoint = 1
+        self.assertEqual(pn_client.secret_key, '1234')
+
+    def test_constructor_should_fail_if_pool_maxsize_not_int(self):
+        with self.assertRaises(TypeError) as e:
+            PushNotifications(
+                instance_id='1234',
+                secret_key='1234',
+                pool_maxsize='64',
+            )
+        self.assertIn('pool_maxsize must be an integer', str(e.exception))
+
+    def test_constructor_should_fail_if_pool_connections_less_than_one(self):
+        with self.assertRaises(ValueError) as e:
+            PushNotifications(
+                instance_id='1234',
+                secret_key='1234',
+                pool_connections=0,
+            )
+        self.assertIn('pool_connections must be at least 1', str(e.exception))
+
+    def test_sessions_should_be_per_thread_and_share_connection_pool(self):
+        pn_client = PushNotifications(
+            instance_id='1234',
+            secret_key='1234',
+            pool_maxsize=64,
+        )
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(pn_client.session),
+        )
+        thread.start()
+        thread.join()
+
+        self.assertIs(pn_client.session, pn_client.session)
+        self.assertIsNot(pn_client.session, sessions[0])
+        self.assertIs(
+            pn_client.session.get_adapter('https://example.com'),
+            sessions[0].get_adapter('https://example.com'),
+        )
+        self.assertEqual(
+            pn_client.session.get_adapter('https://example.com')._pool_maxsize,
+            64,
+        )
+
+    def test_assigned_session_should_be_used_by_every_thread(self):
+        pn_client = PushNotifications(
+            instance_id='1234',
+            secret_key='1234',
+        )
+        session = requests.Session()
+        adapter = requests_mock.Adapter()
+        adapter.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            json={'publishId': '1234'},
+        )
+        session.mount('https://', adapter)
+        pn_client.session = session
+
+        responses = []
+        thread = threading.Thread(
+            target=lambda: responses.append(
+                pn_client.publish_to_users(['alice'], {}),
+            ),
+        )
+        thread.start()
+        thread.join()
+
+        self.assertIs(pn_client.session, session)
+        self.assertEqual(responses, [{'publishId': '1234'}])
+        self.assertEqual(adapter.call_count, 1)
+
+    def test_keep_alive_false_should_send_connection_close(self):
+        pn_client = PushNotifications(
+            instance_id='1234',
+            secret_key='1234',
+            keep_alive=False,
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json='',
+            )
+            pn_client.delete_user('alice')
+            req = http_mock.request_history[0]
+
+        self.assertEqual(req.headers['connection'], 'close')
+
+    def test_requests_should_use_proxies_from_environment(self):
+        os.environ['HTTPS_PROXY'] = 'http://proxy.example.com:3128'
+        try:
+            pn_client = PushNotifications(
+                instance_id='1234',
+                secret_key='1234',
+            )
+            with requests_mock.Mocker() as http_mock:
+                http_mock.register_uri(
+                    requests_mock.ANY,
+                    requests_mock.ANY,
+                    status_code=200,
+                    json='',
+                )
+                pn_client.delete_user('alice')
+                req = http_mock.request_history[0]
+        finally:
+            del os.environ['HTTPS_PROXY']
+
+        self.assertEqual(req.proxies['https'], 'http://proxy.example.com:3128')
+
+    def test_requests_should_quote_path_params(self):
+        pn_client = PushNotifications(
+            instance_id='1234',
+            secret_key='1234',
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json='',
+            )
+            pn_client.delete_user('alice bob?{x}')
+            req = http_mock.request_history[0]
+
+        self.assertEqual(
+            req.url,
+            'https://1234.pushnotifications.pusher.com'
+            '/customer_api/v1/instances/1234/users/alice%20bob%3F%7Bx%7D',
+        )
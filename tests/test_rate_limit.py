@@ -0,0 +1,94 @@
+"""Unit tests for client side rate limiting"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests_mock
+
+from pusher_push_notifications import (
+    FileTokenBucket,
+    PushNotifications,
+    TokenBucket,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_should_allow_burst_up_to_capacity(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    def test_acquire_should_wait_for_refill(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        self.assertEqual(bucket.acquire(), 0)
+        waited = bucket.acquire()
+        self.assertTrue(0 < waited <= 0.02)
+
+    def test_should_fail_if_rate_invalid(self):
+        with self.assertRaises(ValueError) as e:
+            TokenBucket(rate=0)
+        self.assertIn('rate must be greater than 0', str(e.exception))
+
+    def test_should_fail_if_acquiring_more_than_capacity(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, capacity=1).acquire(2)
+
+
+class TestFileTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bucket')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_buckets_with_same_path_should_share_budget(self):
+        bucket_a = FileTokenBucket(self.path, rate=0.001, capacity=2)
+        bucket_b = FileTokenBucket(self.path, rate=0.001, capacity=2)
+        self.assertTrue(bucket_a.try_acquire())
+        self.assertTrue(bucket_b.try_acquire())
+        self.assertFalse(bucket_a.try_acquire())
+        self.assertFalse(bucket_b.try_acquire())
+        bucket_a.close()
+        bucket_b.close()
+
+
+class TestPushNotificationsRateLimits(unittest.TestCase):
+    def test_should_use_separate_budgets_per_api(self):
+        publish_bucket = TokenBucket(rate=0.001, capacity=5)
+        customer_bucket = TokenBucket(rate=0.001, capacity=5)
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            publish_rate_limiter=publish_bucket,
+            customer_rate_limiter=customer_bucket,
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            pn_client.publish_to_users(['alice'], {})
+            pn_client.publish_to_interests(['donuts'], {})
+            pn_client.delete_user('alice')
+
+        self.assertAlmostEqual(publish_bucket._tokens, 3, places=2)
+        self.assertAlmostEqual(customer_bucket._tokens, 4, places=2)
+
+    def test_constructor_should_fail_if_rate_limiter_invalid(self):
+        with self.assertRaises(TypeError) as e:
+            PushNotifications(
+                'INSTANCE_ID',
+                'SECRET_KEY',
+                customer_rate_limiter=10,
+            )
+        self.assertIn(
+            'customer_rate_limiter must be a TokenBucket',
+            str(e.exception),
+        )
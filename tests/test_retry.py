@@ -0,0 +1,154 @@
+"""Unit tests for retrying failed requests"""
+
+import unittest
+
+import requests
+import requests_mock
+
+from pusher_push_notifications import (
+    PushNotifications,
+    PusherServerError,
+    PusherTooManyRequestsError,
+    PusherValidationError,
+    Response,
+    RetryPolicy,
+)
+from pusher_push_notifications.retry import parse_retry_after
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_should_use_full_jitter_below_cap(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=5)
+        for retry_number in range(0, 10):
+            delay = policy.backoff(retry_number)
+            self.assertTrue(0 <= delay <= min(5, 2 ** retry_number))
+
+    def test_retry_state_should_stop_after_max_retries(self):
+        retry_state = RetryPolicy(max_retries=2, backoff_base=0).new_call()
+        self.assertEqual(retry_state.next_delay(), 0)
+        self.assertEqual(retry_state.next_delay(), 0)
+        self.assertIsNone(retry_state.next_delay())
+
+    def test_retry_state_should_honor_retry_after(self):
+        retry_state = RetryPolicy(backoff_base=0).new_call()
+        self.assertEqual(retry_state.next_delay(retry_after=2.5), 2.5)
+
+    def test_retry_state_should_give_up_when_budget_exceeded(self):
+        retry_state = RetryPolicy(backoff_base=0, retry_budget=1).new_call()
+        self.assertIsNone(retry_state.next_delay(retry_after=60))
+
+    def test_delay_after_should_only_retry_retryable_outcomes(self):
+        retry_state = RetryPolicy(backoff_base=0).new_call()
+        self.assertIsNone(retry_state.delay_after(Response(200)))
+        self.assertIsNone(retry_state.delay_after(Response(400)))
+        self.assertEqual(retry_state.delay_after(Response(503)), 0)
+        self.assertEqual(
+            retry_state.delay_after(Response(429, {'retry-after': '2'})),
+            2.0,
+        )
+        self.assertEqual(retry_state.delay_after(), 0)
+        self.assertEqual(retry_state.retries, 3)
+
+    def test_delay_after_should_not_retry_errors_if_disabled(self):
+        retry_state = RetryPolicy(retry_connection_errors=False).new_call()
+        self.assertIsNone(retry_state.delay_after())
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+    def test_constructor_should_fail_if_retry_policy_invalid(self):
+        with self.assertRaises(TypeError) as e:
+            PushNotifications('INSTANCE_ID', 'SECRET_KEY', retry_policy=3)
+        self.assertIn('retry_policy must be a RetryPolicy', str(e.exception))
+
+
+class TestPushNotificationsRetries(unittest.TestCase):
+    def test_should_retry_retryable_statuses(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            retry_policy=RetryPolicy(backoff_base=0),
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                [
+                    {'status_code': 503, 'json': {}},
+                    {'status_code': 429, 'json': {}, 'headers': {'Retry-After': '0'}},
+                    {'status_code': 200, 'json': {'publishId': '1234'}},
+                ],
+            )
+            response = pn_client.publish_to_users(['alice'], {})
+            self.assertEqual(len(http_mock.request_history), 3)
+
+        self.assertDictEqual(response, {'publishId': '1234'})
+
+    def test_should_retry_connection_errors(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            retry_policy=RetryPolicy(backoff_base=0),
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                [
+                    {'exc': requests.exceptions.ConnectionError},
+                    {'status_code': 200, 'json': ''},
+                ],
+            )
+            pn_client.delete_user('alice')
+            self.assertEqual(len(http_mock.request_history), 2)
+
+    def test_should_raise_once_retries_exhausted(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            retry_policy=RetryPolicy(max_retries=2, backoff_base=0),
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=500,
+                json={'error': 'Server error', 'description': 'blah'},
+            )
+            with self.assertRaises(PusherServerError):
+                pn_client.delete_user('alice')
+            self.assertEqual(len(http_mock.request_history), 3)
+
+    def test_should_not_retry_other_errors(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            retry_policy=RetryPolicy(backoff_base=0),
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=400,
+                json={'error': 'Invalid request', 'description': 'blah'},
+            )
+            with self.assertRaises(PusherValidationError):
+                pn_client.delete_user('alice')
+            self.assertEqual(len(http_mock.request_history), 1)
+
+    def test_should_not_retry_without_retry_policy(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=429,
+                json={'error': 'Too many requests', 'description': 'blah'},
+            )
+            with self.assertRaises(PusherTooManyRequestsError) as e:
+                pn_client.delete_user('alice')
+            self.assertEqual(len(http_mock.request_history), 1)
+        self.assertIsInstance(e.exception, PusherValidationError)
@@ -0,0 +1,143 @@
+"""Unit tests for pluggable JSON serializers"""
+
+import json
+import unittest
+
+import requests_mock
+
+from pusher_push_notifications import (
+    JSONSerializer,
+    OrjsonSerializer,
+    PublishTemplate,
+    PushNotifications,
+    PusherValidationError,
+)
+
+
+class RecordingSerializer(JSONSerializer):
+    def __init__(self):
+        self.dumped = []
+        self.loaded = []
+
+    def dumps(self, value):
+        self.dumped.append(value)
+        return super(RecordingSerializer, self).dumps(value)
+
+    def loads(self, data):
+        self.loaded.append(data)
+        return super(RecordingSerializer, self).loads(data)
+
+
+class TestSerializers(unittest.TestCase):
+    def test_json_serializer_should_round_trip(self):
+        serializer = JSONSerializer()
+        value = {'a': [1, 2.5, None, True], 'b': u'\u00fcn\u00efc\u00f6de'}
+        self.assertEqual(serializer.loads(serializer.dumps(value)), value)
+        self.assertIsInstance(serializer.dumps(value), bytes)
+
+    def test_json_serializer_should_reject_nan(self):
+        with self.assertRaises(ValueError):
+            JSONSerializer().dumps({'a': float('nan')})
+
+    def test_orjson_serializer_should_match_json_serializer(self):
+        try:
+            serializer = OrjsonSerializer()
+        except ImportError:
+            self.skipTest('orjson is not installed')
+        value = {'a': [1, 2.5, None, True], 'b': u'\u00fcn\u00efc\u00f6de'}
+        self.assertEqual(
+            json.loads(serializer.dumps(value).decode('utf-8')),
+            value,
+        )
+        self.assertEqual(serializer.loads(JSONSerializer().dumps(value)), value)
+
+    def test_publish_template_should_use_serializer(self):
+        serializer = RecordingSerializer()
+        template = PublishTemplate({'a': 1}, serializer)
+        self.assertEqual(
+            json.loads(template.encode('users', ['alice']).decode('utf-8')),
+            {'a': 1, 'users': ['alice']},
+        )
+        self.assertEqual(serializer.dumped, [{'a': 1}, ['alice'], 'users'])
+
+
+class TestPushNotificationsSerializer(unittest.TestCase):
+    def test_should_encode_and_decode_with_serializer(self):
+        serializer = RecordingSerializer()
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            serializer=serializer,
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            response = pn_client.publish_to_users(['alice'], {'a': 1})
+            req = http_mock.request_history[0]
+
+        self.assertDictEqual(response, {'publishId': '1234'})
+        self.assertEqual(req.json(), {'a': 1, 'users': ['alice']})
+        self.assertEqual(serializer.dumped, [{'a': 1, 'users': ['alice']}])
+        self.assertEqual(serializer.loaded, [b'{"publishId": "1234"}'])
+
+    def test_should_decode_errors_with_serializer(self):
+        serializer = RecordingSerializer()
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            serializer=serializer,
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=400,
+                json={'error': 'Invalid request', 'description': 'blah'},
+            )
+            with self.assertRaises(PusherValidationError) as e:
+                pn_client.delete_user('alice')
+
+        self.assertIn('Invalid request: blah', str(e.exception))
+        self.assertEqual(len(serializer.loaded), 1)
+
+    def test_should_publish_with_orjson(self):
+        try:
+            serializer = OrjsonSerializer()
+        except ImportError:
+            self.skipTest('orjson is not installed')
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            serializer=serializer,
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={'publishId': '1234'},
+            )
+            result = pn_client.publish_to_users_bulk(
+                ['user-' + str(i) for i in range(0, 1500)],
+                {'web': {'notification': {'title': 'Hello'}}},
+            )
+            bodies = [req.json() for req in http_mock.request_history]
+
+        self.assertEqual(result.publish_ids, ['1234', '1234'])
+        self.assertEqual([len(body['users']) for body in bodies], [1000, 500])
+        self.assertEqual(
+            bodies[0]['web'],
+            {'notification': {'title': 'Hello'}},
+        )
+
+    def test_constructor_should_fail_if_serializer_invalid(self):
+        with self.assertRaises(TypeError) as e:
+            PushNotifications('INSTANCE_ID', 'SECRET_KEY', serializer=object())
+        self.assertIn(
+            'serializer must have dumps and loads methods',
+            str(e.exception),
+        )
@@ -0,0 +1,227 @@
+"""Unit tests for auth token helpers"""
+
+import datetime
+import time
+import unittest
+
+import jwt
+import six
+
+from pusher_push_notifications import (
+    AUTH_TOKEN_DURATION,
+    HS256Signer,
+    PushNotifications,
+    TokenCache,
+)
+
+
+class TestTokenCache(unittest.TestCase):
+    def test_should_return_cached_token(self):
+        cache = TokenCache(maxsize=10, refresh_threshold=50)
+        cache.put('alice', 'token-a', time.time() + 100)
+        self.assertEqual(cache.get('alice'), 'token-a')
+        self.assertIsNone(cache.get('bob'))
+
+    def test_should_not_return_token_past_refresh_threshold(self):
+        cache = TokenCache(maxsize=10, refresh_threshold=50)
+        cache.put('alice', 'token-a', time.time() + 40)
+        self.assertIsNone(cache.get('alice'))
+        self.assertEqual(len(cache), 0)
+
+    def test_should_not_return_expired_token(self):
+        cache = TokenCache(maxsize=10, refresh_threshold=0)
+        cache.put('alice', 'token-a', time.time() - 1)
+        self.assertIsNone(cache.get('alice'))
+
+    def test_should_evict_least_recently_used(self):
+        expiry = time.time() + 100
+        cache = TokenCache(maxsize=2, refresh_threshold=0)
+        cache.put('alice', 'token-a', expiry)
+        cache.put('bob', 'token-b', expiry)
+        cache.get('alice')
+        cache.put('carol', 'token-c', expiry)
+        self.assertEqual(cache.get('alice'), 'token-a')
+        self.assertIsNone(cache.get('bob'))
+        self.assertEqual(cache.get('carol'), 'token-c')
+
+    def test_should_fail_if_refresh_threshold_invalid(self):
+        with self.assertRaises(ValueError):
+            TokenCache(maxsize=2, refresh_threshold=-1)
+
+
+class TestPushNotificationsTokenCache(unittest.TestCase):
+    def test_generate_token_should_reuse_cached_token(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            token_cache_size=100,
+        )
+        first = pn_client.generate_token('alice')
+        self.assertIs(pn_client.generate_token('alice')['token'], first['token'])
+        self.assertIsNot(
+            pn_client.generate_token('bob')['token'],
+            first['token'],
+        )
+
+    def test_generate_token_should_sign_with_new_secret_key(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            token_cache_size=100,
+        )
+        pn_client.generate_token('alice')
+        pn_client.secret_key = 'NEW_SECRET_KEY'
+        decoded_token = jwt.decode(
+            pn_client.generate_token('alice')['token'],
+            'NEW_SECRET_KEY',
+            algorithms='HS256',
+        )
+        self.assertEqual(decoded_token['sub'], 'alice')
+
+    def test_generate_token_should_use_new_instance_id(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        pn_client.instance_id = 'NEW_INSTANCE_ID'
+        decoded_token = jwt.decode(
+            pn_client.generate_token('alice')['token'],
+            'SECRET_KEY',
+            algorithms='HS256',
+        )
+        self.assertEqual(
+            decoded_token['iss'],
+            'https://NEW_INSTANCE_ID.pushnotifications.pusher.com',
+        )
+
+    def test_generate_token_should_refresh_past_threshold(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            token_cache_size=100,
+            token_refresh_threshold=datetime.timedelta(days=1),
+        )
+        first = pn_client.generate_token('alice')
+        self.assertIsNot(pn_client.generate_token('alice')['token'], first['token'])
+
+    def test_tokens_should_expire_after_a_day_in_any_timezone(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        token = pn_client.generate_token('alice')['token']
+        expiry = jwt.decode(token, 'SECRET_KEY', algorithms='HS256')['exp']
+        self.assertAlmostEqual(
+            expiry - time.time(),
+            AUTH_TOKEN_DURATION.total_seconds(),
+            delta=60,
+        )
+
+    def test_constructor_should_fail_if_refresh_threshold_too_long(self):
+        with self.assertRaises(ValueError):
+            PushNotifications(
+                'INSTANCE_ID',
+                'SECRET_KEY',
+                token_cache_size=100,
+                token_refresh_threshold=datetime.timedelta(days=2),
+            )
+
+    def test_generate_token_should_not_cache_by_default(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        first = pn_client.generate_token('alice')
+        self.assertIsNot(pn_client.generate_token('alice')['token'], first['token'])
+
+    def test_constructor_should_fail_if_refresh_threshold_not_timedelta(self):
+        with self.assertRaises(TypeError) as e:
+            PushNotifications(
+                'INSTANCE_ID',
+                'SECRET_KEY',
+                token_cache_size=100,
+                token_refresh_threshold=3600,
+            )
+        self.assertIn(
+            'token_refresh_threshold must be a timedelta',
+            str(e.exception),
+        )
+
+
+class TestHS256Signer(unittest.TestCase):
+    # PyJWT 1 orders the header differently, so its tokens are only the same
+    # once decoded
+    @unittest.skipIf(
+        int(jwt.__version__.split('.')[0]) < 2,
+        'tokens are only byte-for-byte identical to PyJWT 2',
+    )
+    def test_tokens_should_match_pyjwt(self):
+        issuer = 'https://INSTANCE_ID.pushnotifications.pusher.com'
+        signer = HS256Signer('SECRET_KEY', issuer)
+        for user_id in ['alice', u'\u00fcn\u00efc\u00f6de "user"\\', 'A' * 164]:
+            expected = jwt.encode(
+                {
+                    'iss': issuer,
+                    'sub': user_id,
+                    'exp': 1700000000,
+                },
+                'SECRET_KEY',
+                algorithm='HS256',
+            )
+            self.assertEqual(
+                signer.sign(user_id, 1700000000),
+                six.ensure_text(expected),
+            )
+
+    def test_tokens_should_verify_with_pyjwt(self):
+        signer = HS256Signer('SECRET_KEY', 'issuer')
+        decoded_token = jwt.decode(
+            signer.sign('alice', int(time.time()) + 60),
+            'SECRET_KEY',
+            algorithms='HS256',
+        )
+        self.assertEqual(decoded_token['sub'], 'alice')
+        self.assertEqual(decoded_token['iss'], 'issuer')
+
+
+class TestPushNotificationsGenerateTokens(unittest.TestCase):
+    def test_generate_tokens_should_yield_tokens_in_order(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        user_ids = ['user-' + str(i) for i in range(0, 25)]
+
+        results = list(pn_client.generate_tokens(iter(user_ids), chunk_size=10))
+
+        self.assertEqual([user_id for user_id, _ in results], user_ids)
+        for user_id, token in results:
+            decoded_token = jwt.decode(token, 'SECRET_KEY', algorithms='HS256')
+            self.assertEqual(decoded_token['sub'], user_id)
+
+    def test_generate_tokens_should_sign_in_worker_processes(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        user_ids = ['user-' + str(i) for i in range(0, 25)]
+
+        results = list(pn_client.generate_tokens(
+            user_ids,
+            workers=2,
+            chunk_size=4,
+        ))
+
+        self.assertEqual([user_id for user_id, _ in results], user_ids)
+        for user_id, token in results:
+            decoded_token = jwt.decode(token, 'SECRET_KEY', algorithms='HS256')
+            self.assertEqual(decoded_token['sub'], user_id)
+            self.assertEqual(
+                decoded_token['iss'],
+                'https://INSTANCE_ID.pushnotifications.pusher.com',
+            )
+
+    def test_generate_tokens_should_validate_user_ids(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        with self.assertRaises(ValueError) as e:
+            list(pn_client.generate_tokens(['alice', 'A' * 165]))
+        self.assertIn('longer than the maximum of 164 chars', str(e.exception))
+
+    def test_generate_tokens_should_fail_if_workers_invalid(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        with self.assertRaises(ValueError) as e:
+            pn_client.generate_tokens(['alice'], workers=0)
+        self.assertIn('workers must be at least 1', str(e.exception))
+
+    def test_generate_tokens_should_fail_if_chunk_size_invalid(self):
+        pn_client = PushNotifications('INSTANCE_ID', 'SECRET_KEY')
+        with self.assertRaises(TypeError) as e:
+            pn_client.generate_tokens(['alice'], chunk_size='10')
+        self.assertIn('chunk_size must be an integer', str(e.exception))
+        with self.assertRaises(ValueError):
+            pn_client.generate_tokens(['alice'], chunk_size=0)
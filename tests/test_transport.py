@@ -0,0 +1,141 @@
+"""Unit tests for pluggable transports"""
+
+import json
+import unittest
+
+from pusher_push_notifications import (
+    InMemoryTransport,
+    PushNotifications,
+    PusherServerError,
+    PusherValidationError,
+    Response,
+    RetryPolicy,
+    Transport,
+)
+from pusher_push_notifications.transport import _origin
+
+
+class FlakyError(Exception):
+    pass
+
+
+class FlakyTransport(Transport):
+    """Raises FlakyError for the first `failures` requests"""
+
+    retryable_errors = (FlakyError,)
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def send(self, request):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise FlakyError()
+        return Response(200, {}, b'{"publishId": "1234"}')
+
+
+class TestTransports(unittest.TestCase):
+    def test_in_memory_transport_should_answer_publishes(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(),
+        )
+        response = pn_client.publish_to_users(['alice'], {})
+        self.assertDictEqual(response, {'publishId': 'pubid-in-memory'})
+
+    def test_transport_should_receive_built_request(self):
+        requests_sent = []
+
+        def handler(request):
+            requests_sent.append(request)
+            return Response(200, {}, b'{"publishId": "1234"}')
+
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(handler),
+        )
+        pn_client.publish_to_interests(['donuts'], {'a': 1})
+        pn_client.delete_user('alice')
+
+        publish, delete = requests_sent
+        self.assertEqual(publish.method, 'POST')
+        self.assertEqual(
+            publish.url,
+            'https://instance_id.pushnotifications.pusher.com'
+            '/publish_api/v1/instances/INSTANCE_ID/publishes/interests',
+        )
+        self.assertEqual(publish.headers['authorization'], 'Bearer SECRET_KEY')
+        self.assertEqual(publish.headers['content-type'], 'application/json')
+        self.assertEqual(
+            publish.headers['content-length'],
+            str(len(publish.body)),
+        )
+        self.assertEqual(
+            json.loads(publish.body.decode('utf-8')),
+            {'a': 1, 'interests': ['donuts']},
+        )
+        self.assertEqual(delete.method, 'DELETE')
+        self.assertTrue(delete.url.endswith('/users/alice'))
+        self.assertIsNone(delete.body)
+        self.assertEqual(delete.headers['content-length'], '0')
+
+    def test_error_responses_should_raise(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(lambda request: Response(
+                400,
+                {},
+                b'{"error": "Invalid request", "description": "blah"}',
+            )),
+        )
+        with self.assertRaises(PusherValidationError) as e:
+            pn_client.publish_to_users(['alice'], {})
+        self.assertIn('Invalid request: blah', str(e.exception))
+
+    def test_malformed_error_responses_should_raise(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(lambda request: Response(500, {}, b'[]')),
+        )
+        with self.assertRaises(PusherServerError) as e:
+            pn_client.delete_user('alice')
+        self.assertIn('Unknown error: no description', str(e.exception))
+
+    def test_should_retry_transport_retryable_errors(self):
+        transport = FlakyTransport(failures=2)
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=transport,
+            retry_policy=RetryPolicy(backoff_base=0),
+        )
+        response = pn_client.publish_to_users(['alice'], {})
+        self.assertDictEqual(response, {'publishId': '1234'})
+        self.assertEqual(transport.calls, 3)
+
+    def test_should_not_retry_without_retry_policy(self):
+        transport = FlakyTransport(failures=1)
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=transport,
+        )
+        with self.assertRaises(FlakyError):
+            pn_client.publish_to_users(['alice'], {})
+
+    def test_constructor_should_fail_if_transport_invalid(self):
+        with self.assertRaises(TypeError) as e:
+            PushNotifications('INSTANCE_ID', 'SECRET_KEY', transport=object())
+        self.assertIn('transport must be a Transport', str(e.exception))
+
+    def test_origin(self):
+        self.assertEqual(
+            _origin('https://example.com:8080/publish_api/v1'),
+            'https://example.com:8080',
+        )
+        self.assertEqual(_origin('http://example.com'), 'http://example.com')
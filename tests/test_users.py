@@ -8,12 +8,15 @@ import jwt
 import requests_mock
 
 from pusher_push_notifications import (
+    DeleteUsersResult,
+    InMemoryTransport,
     PushNotifications,
     PusherAuthError,
     PusherMissingInstanceError,
     PusherServerError,
     PusherValidationError,
     PusherBadResponseError,
+    Response,
 )
 
 
@@ -134,6 +137,43 @@ class TestPushNotificationsUsers(unittest.TestCase):
             },
         )
 
+    def test_publish_to_users_should_not_modify_publish_body(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        publish_body = {
+            'apns': {
+                'aps': {
+                    'alert': 'Hello World!',
+                },
+            },
+        }
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+                json={
+                    'publishId': '1234',
+                },
+            )
+            pn_client.publish_to_users(
+                user_ids=['alice'],
+                publish_body=publish_body,
+            )
+
+        self.assertDictEqual(
+            publish_body,
+            {
+                'apns': {
+                    'aps': {
+                        'alert': 'Hello World!',
+                    },
+                },
+            },
+        )
+
     def test_publish_to_users_should_fail_if_user_ids_not_list(self):
         pn_client = PushNotifications(
             'INSTANCE_ID',
@@ -571,3 +611,88 @@ class TestPushNotificationsUsers(unittest.TestCase):
                 text='<notjson></notjson>',
             )
             pn_client.delete_user('alice')
+
+    def test_delete_users_should_report_each_outcome(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        statuses = {'bob': 404, 'carol': 500}
+
+        def respond(request, context):
+            user_id = request.path.rsplit('/', 1)[-1]
+            context.status_code = statuses.get(user_id, 200)
+            return ''
+
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                text=respond,
+            )
+            result = pn_client.delete_users(
+                ['alice', 'bob', 'carol', 'dave', 'alice'],
+                concurrency=3,
+            )
+            deleted = sorted(
+                req.path.rsplit('/', 1)[-1]
+                for req in http_mock.request_history
+            )
+
+        self.assertIsInstance(result, DeleteUsersResult)
+        self.assertEqual(deleted, ['alice', 'bob', 'carol', 'dave'])
+        self.assertEqual(result.succeeded, ['alice', 'dave'])
+        self.assertEqual(result.not_found, ['bob'])
+        self.assertEqual(list(result.failed), ['carol'])
+        self.assertIsInstance(result.failed['carol'], PusherServerError)
+        self.assertFalse(result.ok)
+
+    def test_delete_users_should_report_any_transport_error(self):
+        class TransportError(Exception):
+            pass
+
+        def handler(request):
+            if request.url.endswith('/bob'):
+                raise TransportError('connection reset')
+            return Response(200)
+
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY',
+            transport=InMemoryTransport(handler),
+        )
+        result = pn_client.delete_users(['alice', 'bob', 'carol'])
+
+        self.assertEqual(result.succeeded, ['alice', 'carol'])
+        self.assertEqual(list(result.failed), ['bob'])
+        self.assertIsInstance(result.failed['bob'], TransportError)
+
+    def test_delete_users_should_validate_every_id_first(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        with requests_mock.Mocker() as http_mock:
+            http_mock.register_uri(
+                requests_mock.ANY,
+                requests_mock.ANY,
+                status_code=200,
+            )
+            with self.assertRaises(TypeError):
+                pn_client.delete_users(['alice', 123])
+            with self.assertRaises(ValueError):
+                pn_client.delete_users(['alice', 'a' * 165])
+            with self.assertRaises(TypeError):
+                pn_client.delete_users('alice')
+            with self.assertRaises(ValueError):
+                pn_client.delete_users(['alice'], concurrency=0)
+            self.assertEqual(http_mock.call_count, 0)
+
+    def test_delete_users_should_accept_no_users(self):
+        pn_client = PushNotifications(
+            'INSTANCE_ID',
+            'SECRET_KEY'
+        )
+        result = pn_client.delete_users([])
+        self.assertEqual(result.succeeded, [])
+        self.assertTrue(result.ok)
@@ -0,0 +1,69 @@
+"""Unit tests for interest and user id validation"""
+
+import random
+import string
+import unittest
+
+from pusher_push_notifications import (
+    _are_valid_interests,
+    _are_valid_user_ids,
+    _validate_each_interest,
+    _validate_interests,
+    _validate_user_ids,
+)
+
+
+def _accepted_by_each(validate_each, items):
+    try:
+        validate_each(items)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class TestBatchValidation(unittest.TestCase):
+    def test_are_valid_interests_should_never_accept_invalid_interests(self):
+        alphabet = string.ascii_letters + string.digits + '_=@,.;-|\x00\n '
+        rng = random.Random(1234)
+        for _ in range(0, 2000):
+            interests = [
+                ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            if _are_valid_interests(interests):
+                self.assertTrue(
+                    _accepted_by_each(_validate_each_interest, interests),
+                    interests,
+                )
+
+    def test_are_valid_interests_should_accept_valid_interests(self):
+        self.assertTrue(_are_valid_interests(['donuts', 'a-b_c=d@e,f.g;h']))
+        self.assertTrue(_are_valid_interests(['', 'A' * 164]))
+
+    def test_are_valid_interests_should_reject_invalid_interests(self):
+        self.assertFalse(_are_valid_interests(['donuts', 'bad|interest']))
+        self.assertFalse(_are_valid_interests(['donuts', 'A' * 165]))
+        self.assertFalse(_are_valid_interests(['donuts', 'a\x00b']))
+        self.assertFalse(_are_valid_interests(['donuts', False]))
+
+    def test_validate_interests_should_report_first_invalid_interest(self):
+        with self.assertRaises(ValueError) as e:
+            _validate_interests(['donuts', 'bad|interest', 'A' * 165])
+        self.assertIn(
+            'Interest "bad|interest" contains a forbidden character',
+            str(e.exception),
+        )
+
+    def test_validate_interests_should_keep_accepting_trailing_newline(self):
+        # INTEREST_REGEX ends with $, which matches before a trailing newline
+        _validate_interests(['donuts\n'])
+
+    def test_are_valid_user_ids(self):
+        self.assertTrue(_are_valid_user_ids(['alice', 'A' * 164]))
+        self.assertFalse(_are_valid_user_ids(['alice', 'A' * 165]))
+        self.assertFalse(_are_valid_user_ids(['alice', 1]))
+
+    def test_validate_user_ids_should_report_first_invalid_user_id(self):
+        with self.assertRaises(TypeError) as e:
+            _validate_user_ids(['alice', None, 'A' * 165])
+        self.assertIn('User id None is not a string', str(e.exception))